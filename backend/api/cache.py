@@ -0,0 +1,128 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from collections import OrderedDict
+import asyncio
+import threading
+import time
+
+T = TypeVar("T")
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store an entry, evicting the least recently used ones beyond maxsize"""
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls with the same key into one in-flight call.
+
+    By default the call runs to completion even if every waiter is
+    cancelled. With cancel_abandoned it is cancelled as soon as its last
+    waiter is, so work nobody is waiting for stops.
+    """
+
+    def __init__(self, cancel_abandoned: bool = False):
+        self.cancel_abandoned = cancel_abandoned
+        self.calls = 0
+        self.shared = 0
+        self.abandoned = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn, or wait for the already running call with the same key"""
+        waiter, _ = self.join(key, fn)
+        return await waiter
+
+    def join(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[Awaitable[T], bool]:
+        """
+        Like do, but registers the caller immediately.
+
+        Returns (waiter, shared): an awaitable for the result, which must be
+        awaited, and whether it joined a call that was already in flight.
+        """
+        future = self._inflight.get(key)
+        shared = future is not None
+        if shared:
+            self.shared += 1
+        else:
+            self.calls += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        return self._wait(future), shared
+
+    async def _wait(self, future: asyncio.Future) -> Any:
+        try:
+            # Shield so one cancelled waiter does not cancel the call for everyone
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and self._waiters[future] == 1 and not future.done():
+                self.abandoned += 1
+                future.cancel()
+            raise
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter has gone away
+        if not future.cancelled():
+            future.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._inflight)
+        }
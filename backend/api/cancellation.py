@@ -0,0 +1,43 @@
+from typing import Callable, Optional
+import threading
+import time
+
+class SimulationCancelled(Exception):
+    """Raised at a lap or simulation boundary once a simulation's token is cancelled"""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"Simulation cancelled: {reason}")
+        self.reason = reason
+
+class CancellationToken:
+    """
+    Thread-safe flag that simulations poll at lap and simulation boundaries.
+
+    cancel() may be called from any thread (the event loop, a job manager);
+    the simulation raises SimulationCancelled at its next check. An optional
+    deadline cancels the token with reason "timeout" once it passes.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.deadline = clock() + timeout if timeout is not None else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and self.clock() >= self.deadline:
+            self.cancel("timeout")
+            return True
+        return False
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise SimulationCancelled(self.reason)
@@ -0,0 +1,125 @@
+from typing import Any, Callable, Dict, Optional, TypeVar
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class ExecutorSaturated(Exception):
+    """Raised when too much simulation work is already running or queued"""
+
+    def __init__(self, in_flight: int, retry_after: float):
+        super().__init__(f"Simulation executor saturated ({in_flight} jobs in flight)")
+        self.in_flight = in_flight
+        self.retry_after = retry_after
+
+class SimulationExecutor:
+    """
+    Runs CPU-bound simulation work off the event loop with bounded queueing.
+
+    At most max_workers jobs run at once and max_queue more may wait; beyond
+    that, submissions fail immediately with ExecutorSaturated rather than
+    queueing without bound. The kind, worker count and queue depth come from
+    SIMULATION_EXECUTOR ("thread" or "process"), SIMULATION_WORKERS and
+    SIMULATION_MAX_QUEUE. Threads are the default because Lambda does not
+    support the semaphores multiprocessing needs; process pools only accept
+    picklable module-level functions and arguments.
+    """
+
+    def __init__(self, kind: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None, retry_after: Optional[float] = None):
+        self.kind = (kind or os.getenv("SIMULATION_EXECUTOR", "thread")).lower()
+        if self.kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {self.kind}")
+        self.max_workers = max_workers or int(os.getenv("SIMULATION_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_queue = int(os.getenv("SIMULATION_MAX_QUEUE", str(self.max_workers * 4))) if max_queue is None else max_queue
+        self.retry_after = float(os.getenv("SIMULATION_RETRY_AFTER", "1")) if retry_after is None else retry_after
+        self.completed = 0
+        self.rejected = 0
+        self._in_flight = 0
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_in_flight(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> Executor:
+        # Created on first use so importing the app does not start workers
+        if self._pool is None:
+            if self.kind == "process":
+                # Not fork: the server process runs threads, and a child forked while one holds a lock can deadlock
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context(method))
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="simulation")
+        return self._pool
+
+    async def run(self, fn: Callable[..., T], *args: Any,
+                  cancel_token: Optional[CancellationToken] = None, **kwargs: Any) -> T:
+        """
+        Run fn(*args, **kwargs) on the pool, or raise ExecutorSaturated if it is full.
+
+        A job counts as in flight until its worker is actually free, not just
+        until the caller stops waiting. With a cancel_token, thread pools pass
+        it to fn as cancel_token and cancel it when the awaiting task is
+        cancelled, so abandoned work stops at its next check. A token cannot
+        cross into a process pool; there, abandoned jobs are only dropped if
+        they have not started.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.rejected += 1
+                logger.warning("Simulation executor saturated", extra={"in_flight": self._in_flight})
+                raise ExecutorSaturated(self._in_flight, self.retry_after)
+            self._in_flight += 1
+            pool = self._get_pool()
+
+        if cancel_token is not None and self.kind == "thread":
+            kwargs["cancel_token"] = cancel_token
+        try:
+            future = pool.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if cancel_token is not None:
+                cancel_token.cancel("abandoned")
+            raise
+
+    def _release(self, future: Any = None):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+simulation_executor = SimulationExecutor()
@@ -0,0 +1,412 @@
+from typing import Any, Callable, Dict, List, Optional
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict, replace
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from .cancellation import CancellationToken, SimulationCancelled
+from .simulation import compare_strategies, compute_strategy_frontier, group_batch_by_track, simulate_track_batch
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED}
+
+class JobCancelled(SimulationCancelled):
+    """Raised inside a running job once cancellation has been requested"""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"job {job_id} cancelled")
+        self.job_id = job_id
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str = JOB_QUEUED
+    progress: float = 0.0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    expires_at: float = 0.0
+    cancel_requested: bool = False
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["params"]
+        if not include_result:
+            del data["result"]
+        return data
+
+# --- Result stores ---
+
+class JobStore(ABC):
+    """Persistence for jobs; implementations must be safe to share between threads"""
+
+    @abstractmethod
+    def put(self, job: Job):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> Optional[Job]:
+        """Apply field changes to a stored job and return the updated job"""
+
+    def purge_expired(self, now: float) -> int:
+        """Delete expired jobs, returning how many were removed"""
+        return 0
+
+class MemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def put(self, job: Job):
+        with self._lock:
+            self._jobs[job.job_id] = replace(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = self._jobs[job_id] = replace(job, **fields)
+            return replace(job)
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.expires_at <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+class SQLiteJobStore(JobStore):
+    """Jobs as JSON rows in a local SQLite file, shared by every worker thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, expires_at REAL, data TEXT)"
+        )
+        self._lock = threading.Lock()
+
+    def _write(self, job: Job):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, expires_at, data) VALUES (?, ?, ?)",
+            (job.job_id, job.expires_at, json.dumps(asdict(job)))
+        )
+
+    def _read(self, job_id: str) -> Optional[Job]:
+        row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+    def put(self, job: Job):
+        with self._lock:
+            self._write(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._read(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Job]:
+        with self._lock:
+            job = self._read(job_id)
+            if job is None:
+                return None
+            job = replace(job, **fields)
+            self._write(job)
+            return job
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,)).rowcount
+
+class DynamoDBJobStore(JobStore):
+    """
+    Jobs in a DynamoDB table keyed by job_id.
+
+    The job is stored as a JSON string (avoiding Decimal conversion) next to
+    an integer expires_at attribute, which the table's TTL setting should use
+    so expired jobs are deleted by DynamoDB itself. Results must fit in
+    DynamoDB's 400KB item limit.
+    """
+
+    def __init__(self, table_name: str, region: Optional[str] = None):
+        import boto3
+        self.table = boto3.resource("dynamodb", region_name=region).Table(table_name)
+
+    def put(self, job: Job):
+        self.table.put_item(Item={
+            "job_id": job.job_id,
+            "expires_at": int(job.expires_at),
+            "data": json.dumps(asdict(job))
+        })
+
+    def get(self, job_id: str) -> Optional[Job]:
+        item = self.table.get_item(Key={"job_id": job_id}).get("Item")
+        return Job(**json.loads(item["data"])) if item else None
+
+    def update(self, job_id: str, **fields: Any) -> Optional[Job]:
+        # Only one worker runs a job, so read-modify-write is safe apart from
+        # cancel requests, which only ever set a flag the worker re-reads
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job = replace(job, **fields)
+        self.put(job)
+        return job
+
+# --- Queues ---
+
+class LocalJobQueue:
+    """In-process queue drained by daemon worker threads, started on first use"""
+
+    def __init__(self, runner: Callable[[str], None], workers: int = 1):
+        self.runner = runner
+        self.workers = workers
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, job_id: str):
+        with self._lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+        self._queue.put(job_id)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self.runner(job_id)
+            except Exception:
+                logger.exception("Job worker failed", extra={"job_id": job_id})
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Wait until every queued job has been processed"""
+        self._queue.join()
+
+class SQSJobQueue:
+    """Sends job ids to SQS; a Lambda consuming the queue calls handle_sqs_event"""
+
+    def __init__(self, queue_url: str, region: Optional[str] = None):
+        import boto3
+        self.queue_url = queue_url
+        self.client = boto3.client("sqs", region_name=region)
+
+    def enqueue(self, job_id: str):
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps({"job_id": job_id}))
+
+# --- Job kinds ---
+
+def _run_compare(params: Dict[str, Any], report: Callable[[float], None],
+                 cancel_token: CancellationToken) -> Dict[str, Any]:
+    return compare_strategies(
+        params["strategies"],
+        params.get("weather", "dry"),
+        params.get("track_id", "silverstone"),
+        params.get("num_simulations", 5),
+        progress=lambda done, total: report(done / total),
+        cancel_token=cancel_token
+    )
+
+def _run_batch(params: Dict[str, Any], report: Callable[[float], None],
+               cancel_token: CancellationToken) -> Dict[str, Any]:
+    items = params["items"]
+    results: List[Dict[str, Any]] = [{} for _ in items]
+    done = 0
+    for track_id, indices in group_batch_by_track(items).items():
+        for result in simulate_track_batch(track_id, [(i, items[i]) for i in indices], cancel_token):
+            results[result["index"]] = result
+        done += len(indices)
+        report(done / len(items))
+    return {"results": results}
+
+def _run_frontier(params: Dict[str, Any], report: Callable[[float], None],
+                  cancel_token: CancellationToken) -> Dict[str, Any]:
+    return compute_strategy_frontier(
+        params.get("strategies"),
+        params.get("weather", "dry"),
+        params.get("track_id", "silverstone"),
+        params.get("num_simulations", 5),
+        cancel_token,
+        progress=lambda done, total: report(done / total)
+    )
+
+# Handlers take (params, report, cancel_token); report(fraction) records progress
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], Callable[[float], None], CancellationToken], Any]] = {
+    "compare": _run_compare,
+    "batch": _run_batch,
+    "frontier": _run_frontier
+}
+
+class JobManager:
+    """Submits, runs, polls and cancels jobs over a pluggable store and queue"""
+
+    def __init__(self, store: JobStore, job_queue: Any = None, workers: int = 1,
+                 ttl: float = 3600.0, clock: Callable[[], float] = time.time):
+        self.store = store
+        self.queue = job_queue or LocalJobQueue(self.run_job, workers)
+        self.ttl = ttl
+        self.clock = clock
+        # Tokens of jobs running in this process, so cancel() reaches them between laps
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._tokens_lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        now = self.clock()
+        self.store.purge_expired(now)
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            kind=kind,
+            params=params,
+            created_at=now,
+            updated_at=now,
+            expires_at=now + self.ttl
+        )
+        self.store.put(job)
+        self.queue.enqueue(job.job_id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self.store.get(job_id)
+        if job is None or job.expires_at <= self.clock():
+            return None
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued job at once, or ask a running job to stop.
+
+        A job running in this process stops at its next lap; one running
+        elsewhere (an SQS worker) sees the stored flag at its next progress
+        update.
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        if job.status == JOB_QUEUED:
+            return self._update(job_id, status=JOB_CANCELLED, cancel_requested=True)
+        with self._tokens_lock:
+            token = self._tokens.get(job_id)
+        if token is not None:
+            token.cancel("job cancelled")
+        return self._update(job_id, cancel_requested=True)
+
+    def _update(self, job_id: str, **fields: Any) -> Optional[Job]:
+        now = self.clock()
+        return self.store.update(job_id, updated_at=now, **fields)
+
+    def run_job(self, job_id: str):
+        """Run one job to completion; called by queue workers"""
+        job = self.store.get(job_id)
+        if job is None or job.status != JOB_QUEUED:
+            return
+        if job.cancel_requested:
+            self._update(job_id, status=JOB_CANCELLED)
+            return
+        token = CancellationToken()
+        with self._tokens_lock:
+            self._tokens[job_id] = token
+        self._update(job_id, status=JOB_RUNNING)
+
+        def report(fraction: float):
+            current = self._update(job_id, progress=round(min(max(fraction, 0.0), 1.0), 4))
+            if current is None or current.cancel_requested:
+                raise JobCancelled(job_id)
+
+        try:
+            result = JOB_HANDLERS[job.kind](job.params, report, token)
+        except SimulationCancelled:
+            self._update(job_id, status=JOB_CANCELLED)
+            return
+        except Exception as e:
+            logger.exception("Job failed", extra={"job_id": job_id, "kind": job.kind})
+            self._update(job_id, status=JOB_FAILED, error=str(e))
+            return
+        finally:
+            with self._tokens_lock:
+                self._tokens.pop(job_id, None)
+
+        # Results are kept for ttl seconds after the job finishes
+        self._update(job_id, status=JOB_SUCCEEDED, progress=1.0, result=result,
+                     expires_at=self.clock() + self.ttl)
+
+def create_job_manager() -> JobManager:
+    """
+    Build a job manager from the environment.
+
+    JOB_STORE selects memory (default), sqlite (JOB_DB_PATH) or dynamodb
+    (JOBS_TABLE); JOB_QUEUE selects local worker threads (default,
+    JOB_WORKERS of them) or sqs (JOBS_QUEUE_URL). JOB_RESULT_TTL sets how
+    long finished jobs are kept. SQS workers run in another process, so
+    they need a store every invocation can reach: only dynamodb is accepted
+    with sqs, since memory and a local SQLite file are private to one process
+    or instance.
+    """
+    store_kind = os.getenv("JOB_STORE", "memory").lower()
+    queue_kind = os.getenv("JOB_QUEUE", "local").lower()
+    if queue_kind == "sqs" and store_kind != "dynamodb":
+        raise ValueError("JOB_QUEUE=sqs needs JOB_STORE=dynamodb; SQS workers cannot see this instance's memory or files")
+    if store_kind == "sqlite":
+        store: JobStore = SQLiteJobStore(os.getenv("JOB_DB_PATH", os.path.join(tempfile.gettempdir(), "f1-jobs.sqlite3")))
+    elif store_kind == "dynamodb":
+        store = DynamoDBJobStore(os.environ["JOBS_TABLE"])
+    else:
+        store = MemoryJobStore()
+
+    job_queue = None
+    if queue_kind == "sqs":
+        job_queue = SQSJobQueue(os.environ["JOBS_QUEUE_URL"])
+
+    return JobManager(
+        store,
+        job_queue,
+        workers=int(os.getenv("JOB_WORKERS", "1")),
+        ttl=float(os.getenv("JOB_RESULT_TTL", "3600"))
+    )
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager, created on first use"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = create_job_manager()
+        return _job_manager
+
+def handle_sqs_event(event: Dict[str, Any], context: Any = None):
+    """Lambda entry point for a worker function subscribed to the jobs queue"""
+    manager = get_job_manager()
+    for record in event.get("Records", []):
+        manager.run_job(json.loads(record["body"])["job_id"])
@@ -0,0 +1,156 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import threading
+import time
+
+T = TypeVar("T")
+
+Transport = Callable[[str], Awaitable[str]]
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is skipping remote calls"""
+    pass
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker around a failing upstream.
+
+    After failure_threshold consecutive failures the breaker opens and rejects
+    calls for reset_timeout seconds, then lets a single trial call through.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Check whether a call may go to the upstream right now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                # Only one trial call at a time while half-open
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+            self._trial_in_flight = False
+
+    def record_cancelled(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+class LLMClient:
+    """Concurrency-limited LLM client with a per-call deadline and a circuit breaker"""
+
+    def __init__(self, transport: Transport, max_concurrency: int = 4, timeout: float = 8.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.transport = transport
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores bind to an event loop on Python 3.9, so keep one per loop
+        loop_id = id(asyncio.get_running_loop())
+        semaphore = self._semaphores.get(loop_id)
+        if semaphore is None:
+            semaphore = self._semaphores[loop_id] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Send a prompt upstream, raising on timeout, upstream errors or an open circuit.
+
+        The deadline starts once a concurrency slot is free, so only the
+        upstream's own latency can time a call out and count against the
+        breaker; callers bound the wait for a slot themselves (see hedge).
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM upstream circuit is open")
+
+        self.calls += 1
+        try:
+            async with self._semaphore():
+                text = await asyncio.wait_for(self.transport(prompt), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.errors += 1
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            # Cancelled by the caller, which says nothing about the upstream
+            self.breaker.record_cancelled()
+            raise
+
+        self.breaker.record_success()
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "max_concurrency": self.max_concurrency,
+            "breaker": self.breaker.stats()
+        }
+
+async def hedge(primary: Callable[[], Awaitable[T]], fallback: Callable[[], T], budget: float) -> T:
+    """Return the primary result if it arrives within budget seconds, else the fallback.
+
+    The primary call keeps running in the background after the budget is spent,
+    so it can still finish and populate any caches it writes to.
+    """
+    task = asyncio.ensure_future(primary())
+    done, _ = await asyncio.wait({task}, timeout=budget)
+    if task in done:
+        if task.exception() is None:
+            return task.result()
+        return fallback()
+
+    # Nobody awaits the task any more, so retrieve its exception to keep the loop quiet
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return fallback()
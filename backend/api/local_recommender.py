@@ -0,0 +1,168 @@
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+from itertools import permutations
+import re
+from .simulation import RaceSimulator, get_race_simulator
+from .tracks import track_db
+
+TIRE_NAMES = ("soft", "medium", "hard", "intermediate", "wet")
+DRIVER_STYLES = ("aggressive", "balanced", "conservative")
+
+# How far each pit stop may move from the submitted lap during the search
+PIT_LAP_WINDOW = 10
+# Shortest stint the search will suggest
+MIN_STINT = 5
+# Improvements smaller than this are reported as "already optimal"
+MIN_SAVING = 0.5
+
+_PIT_LAPS = re.compile(r"laps?\s+((?:\d+(?:\s*(?:,|and|&)\s*)?)+)")
+# Wet and intermediate are also compounds, so they only count as weather next to
+# a weather keyword; rain and damp never name a compound
+_WEATHER = re.compile(
+    r"\b(dry|wet|intermediate|rain|rainy|damp)\b(?=\s*(?:weather|conditions|track|race))"
+    r"|(?:weather|conditions):?\s*(dry|wet|intermediate)\b"
+    r"|\b(rain|rainy|damp)\b"
+)
+_WEATHER_WORDS = {"rain": "wet", "rainy": "wet", "damp": "intermediate"}
+# Longest track name or alias, in words, looked up in scenario text
+TRACK_NAME_MAX_WORDS = 5
+
+@dataclass
+class ParsedStrategy:
+    pit_stops: List[int]
+    tires: List[str]
+    driver_style: str
+    weather: str
+    track_id: str
+
+def parse_scenario(scenario: str) -> Optional[ParsedStrategy]:
+    """Extract pit laps, compounds, driver style, weather and track from scenario text.
+
+    Returns None unless the text names at least one compound and the pit laps.
+    """
+    text = scenario.lower()
+
+    weather = "dry"
+    weather_match = _WEATHER.search(text)
+    if weather_match:
+        word = next(group for group in weather_match.groups() if group)
+        weather = _WEATHER_WORDS.get(word, word)
+        # Keep weather words out of the compound search
+        text = text[:weather_match.start()] + text[weather_match.end():]
+
+    tires = [t.capitalize() for t in re.findall(r"\b(" + "|".join(TIRE_NAMES) + r")\b", text)]
+    pit_match = _PIT_LAPS.search(text)
+    if not tires or not pit_match:
+        return None
+    pit_stops = sorted({int(lap) for lap in re.findall(r"\d+", pit_match.group(1))})
+
+    style_match = re.search(r"\b(" + "|".join(DRIVER_STYLES) + r")\b", text)
+    driver_style = style_match.group(1) if style_match else "balanced"
+
+    return ParsedStrategy(pit_stops, tires, driver_style, weather, find_track(text) or "silverstone")
+
+def find_track(text: str) -> Optional[str]:
+    """First track id, name or alias in text, preferring the longest name at each word"""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    for start in range(len(words)):
+        for length in range(min(TRACK_NAME_MAX_WORDS, len(words) - start), 0, -1):
+            track_id = track_db.resolve_track_id(" ".join(words[start:start + length]))
+            if track_id:
+                return track_id
+    return None
+
+def optimize_pit_laps(simulator: RaceSimulator, pit_stops: List[int], tires: List[str],
+                      driver_style: str, weather: str) -> Tuple[List[int], float]:
+    """Coordinate descent over pit laps, each within PIT_LAP_WINDOW of its starting lap"""
+    total_laps = simulator.profile.total_laps
+    best = list(pit_stops)
+    best_time = simulator.expected_race_time(best, tires, driver_style, weather)
+
+    improved = True
+    while improved:
+        improved = False
+        for i, origin in enumerate(pit_stops):
+            low = max(origin - PIT_LAP_WINDOW, (best[i - 1] if i else 0) + MIN_STINT)
+            high = min(origin + PIT_LAP_WINDOW,
+                       (best[i + 1] if i + 1 < len(best) else total_laps + 1) - MIN_STINT)
+            for lap in range(low, high + 1):
+                if lap == best[i]:
+                    continue
+                candidate = best[:i] + [lap] + best[i + 1:]
+                candidate_time = simulator.expected_race_time(candidate, tires, driver_style, weather)
+                if candidate_time < best_time - 1e-9:
+                    best, best_time, improved = candidate, candidate_time, True
+
+    return best, best_time
+
+def recommend_strategy(scenario: str) -> Optional[Dict[str, Any]]:
+    """
+    Simulation-grounded recommendation for a scenario, or None if it cannot be parsed.
+
+    Searches pit-lap shifts and orderings of the submitted compounds with the
+    closed-form race time of RaceSimulator, then checks the other driver styles.
+    """
+    parsed = parse_scenario(scenario)
+    if parsed is None:
+        return None
+
+    simulator = get_race_simulator(parsed.track_id)
+    total_laps = simulator.profile.total_laps
+    # simulate_race only counts pit laps inside the race
+    pit_stops = [lap for lap in parsed.pit_stops if 1 <= lap <= total_laps]
+    tires = parsed.tires[:len(pit_stops) + 1]
+    style = parsed.driver_style
+    weather = parsed.weather
+
+    current_time = simulator.expected_race_time(pit_stops, tires, style, weather)
+    best_pits, best_tires, best_time = pit_stops, tires, current_time
+    for order in sorted(set(permutations(tires))):
+        pits, time = optimize_pit_laps(simulator, pit_stops, list(order), style, weather)
+        if time < best_time - 1e-9:
+            best_pits, best_tires, best_time = pits, list(order), time
+
+    style_times = {
+        s: simulator.expected_race_time(best_pits, best_tires, s, weather) for s in DRIVER_STYLES
+    }
+    best_style = min(style_times, key=style_times.get)
+    if style_times[best_style] > style_times[style] - MIN_SAVING:
+        best_style = style
+    final_time = style_times[best_style]
+    saving = current_time - final_time
+
+    def laps_text(laps: List[int]) -> str:
+        return ", ".join(map(str, laps)) if laps else "no stops"
+
+    if best_pits != pit_stops and best_time < current_time - MIN_SAVING:
+        pit_text = (f"Pit on laps {laps_text(best_pits)} instead of {laps_text(pit_stops)} "
+                    f"for a predicted gain of {current_time - best_time:.1f}s")
+    else:
+        pit_text = f"Current pit laps ({laps_text(pit_stops)}) are within {MIN_SAVING}s of the best timing for this plan"
+
+    if best_tires != tires:
+        tire_text = f"Run {' → '.join(best_tires)} instead of {' → '.join(tires)}"
+    else:
+        tire_text = f"Keep the {' → '.join(tires)} compound order"
+    if weather != "dry":
+        tire_text += f"; evaluated for {weather} conditions"
+
+    if best_style != style:
+        style_text = (f"Switch from {style} to {best_style}: "
+                      f"{style_times[style] - final_time:.1f}s faster over the race with this plan")
+    else:
+        style_text = f"Keep a {style} approach; no other style is more than {MIN_SAVING}s faster with this plan"
+
+    if saving >= MIN_SAVING:
+        risk_text = f"Predicted race time {final_time:.1f}s vs {current_time:.1f}s for the submitted plan, saving {saving:.1f}s"
+    else:
+        risk_text = f"Predicted race time {current_time:.1f}s; the submitted plan is already close to the best found"
+    risk_text += f" at {simulator.track.name}. Expected values exclude lap-to-lap noise"
+
+    return {
+        "pit_stop_timing": pit_text,
+        "tire_compound_strategy": tire_text,
+        "driver_approach_adjustments": style_text,
+        "potential_time_savings_or_risks": risk_text,
+        "suggested_strategy": {"pit_stops": best_pits, "tires": best_tires, "driver_style": best_style},
+        "predicted_time_delta": round(-saving, 3)
+    }
@@ -0,0 +1,107 @@
+from typing import Any, Dict, Optional
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message, level, logger and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below min_level; warnings and errors always pass"""
+
+    def __init__(self, rate: float = 1.0, min_level: int = logging.WARNING):
+        super().__init__()
+        self.rate = rate
+        self.min_level = min_level
+        # Own generator so sampling never disturbs the simulators' global random state
+        self._random = random.Random()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.min_level or self.rate >= 1.0 or self._random.random() < self.rate
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves JSON formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message and traceback now; the arguments may change after we return
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def configure_logging(level: Optional[str] = None, sample_rate: Optional[float] = None,
+                      stream: Any = None) -> QueueListener:
+    """
+    Route all logging through a non-blocking queue to a JSON stream handler.
+
+    The level comes from LOG_LEVEL (default INFO) and the sampling rate for
+    records below WARNING from LOG_SAMPLE_RATE (default 1.0). Request threads
+    only enqueue records; formatting and writing happen on a listener thread.
+    Calling it again replaces the previous configuration.
+    """
+    global _listener, _handler
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0")) if sample_rate is None else sample_rate
+
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+        # The Lambda runtime's root handler writes synchronously; ours replaces it
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+    elif _handler is not None:
+        root.removeHandler(_handler)
+    root.addHandler(handler)
+    _handler = handler
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+@atexit.register
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,8 +1,20 @@
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 import random
 import math
 from .tracks import track_db
+from .weather_system import WeatherSimulator, COMPOUND_INDEX, CONDITION_CODES
+from .track_profile import get_track_profile
+from .cancellation import CancellationToken
+
+# Time a pit stop adds to the lap, in seconds
+PIT_STOP_TIME = 25.0
+# Sector time and tire wear multipliers by driver style
+DRIVER_STYLE_PACE = {"aggressive": 0.98, "balanced": 1.0, "conservative": 1.02}
+DRIVER_STYLE_WEAR = {"aggressive": 1.2, "balanced": 1.0, "conservative": 0.8}
+# Width of the zero-mean uniform noise added to every sector time
+SECTOR_NOISE = 0.5
 
 @dataclass
 class CarState:
@@ -32,19 +44,42 @@ class OvertakingEvent:
     gap_before: float
     gap_after: float
 
+@dataclass
+class RaceState:
+    """Everything that changes during one race; owned by whoever is running it"""
+    cars: List[CarState]
+    weather: str
+    total_laps: int
+    rng: Any
+    grip_table: List[Any]
+    wear_table: List[Any]
+    current_lap: int = 0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.current_lap >= self.total_laps
+
+    def car(self, car_id: str) -> Optional[CarState]:
+        return next((c for c in self.cars if c.car_id == car_id), None)
+
 class MultiCarSimulator:
+    """
+    Multi-car race rules for one track.
+
+    The simulator holds only the track setup; each race's cars, lap and
+    random generator live in a RaceState, so one simulator can serve many
+    races on many threads at once (see get_multi_car_simulator). rng
+    arguments default to the global random module.
+    """
+
     def __init__(self, track_id: str = "silverstone"):
         self.track = track_db.get_track(track_id)
-        self.cars: List[CarState] = []
-        self.overtaking_events: List[OvertakingEvent] = []
-        self.lap_results: List[Dict[str, Any]] = []
-        
-    def initialize_cars(self, car_configs: List[Dict[str, Any]]):
-        """Initialize cars with their configurations"""
-        self.cars = []
+        self.profile = get_track_profile(track_id)
         
-        for i, config in enumerate(car_configs):
-            car = CarState(
+    def initialize_cars(self, car_configs: List[Dict[str, Any]]) -> List[CarState]:
+        """Create the starting grid from car configurations"""
+        return [
+            CarState(
                 car_id=config["car_id"],
                 driver_name=config["driver_name"],
                 position=i + 1,
@@ -62,46 +97,53 @@ class MultiCarSimulator:
                 pit_lap=None,
                 last_pit_lap=0
             )
-            self.cars.append(car)
+            for i, config in enumerate(car_configs)
+        ]
     
-    def calculate_sector_times(self, car: CarState, weather: str) -> List[float]:
+    def calculate_sector_times(self, car: CarState, weather: str, grip_level: Optional[float] = None,
+                               rng: Any = None) -> List[float]:
         """Calculate sector times based on track characteristics"""
+        rng = rng or random
         sector_times = []
         
-        for i, sector in enumerate(self.track.sectors):
+        profile = self.profile
+        condition_pace = profile.condition_pace[CONDITION_CODES[weather]] if weather in CONDITION_CODES else 1.0
+        
+        for base_time, wear_factor, fuel_factor in zip(profile.sector_base_times,
+                                                       profile.sector_wear_factors,
+                                                       profile.sector_fuel_factors):
             # Base sector time
-            sector_time = sector.base_time
+            sector_time = base_time
             
             # Tire wear impact
-            tire_wear_impact = car.tire_wear * sector.tire_wear_factor
+            tire_wear_impact = car.tire_wear * wear_factor
             sector_time += tire_wear_impact
             
             # Fuel load impact
-            fuel_impact = car.fuel_load * 0.01 * sector.fuel_consumption_factor
+            fuel_impact = car.fuel_load * 0.01 * fuel_factor
             sector_time += fuel_impact
             
             # Driver style impact
-            if car.driver_style == "aggressive":
-                sector_time *= 0.98
-            elif car.driver_style == "conservative":
-                sector_time *= 1.02
+            sector_time *= DRIVER_STYLE_PACE.get(car.driver_style, 1.0)
             
             # Weather impact
-            weather_multiplier = 1.0 + (0.1 * self.track.weather_sensitivity)
-            if weather == "wet":
-                sector_time *= weather_multiplier * 1.1
-            elif weather == "intermediate":
-                sector_time *= weather_multiplier * 1.05
+            if grip_level is not None:
+                # Per-lap grip from a forecast replaces the fixed condition multipliers
+                sector_time *= 1.0 + (1.0 - grip_level) * profile.weather_multiplier
+            elif condition_pace != 1.0:
+                sector_time *= condition_pace
             
             # Add randomness
-            sector_time += (random.random() - 0.5) * 0.5
+            sector_time += (rng.random() - 0.5) * SECTOR_NOISE
             
             sector_times.append(round(sector_time, 3))
         
         return sector_times
     
-    def calculate_overtaking_probability(self, attacking_car: CarState, defending_car: CarState) -> float:
+    def calculate_overtaking_probability(self, attacking_car: CarState, defending_car: CarState,
+                                         rng: Any = None) -> float:
         """Calculate probability of overtaking based on various factors"""
+        rng = rng or random
         base_probability = 0.1
         
         # Gap to car ahead
@@ -109,7 +151,7 @@ class MultiCarSimulator:
             base_probability += 0.2
         
         # Track overtaking difficulty
-        base_probability *= (1 - self.track.overtaking_difficulty)
+        base_probability *= self.profile.overtaking_factor
         
         # Driver style impact
         if attacking_car.driver_style == "aggressive":
@@ -122,7 +164,7 @@ class MultiCarSimulator:
         base_probability *= (1 + tire_advantage)
         
         # Random factor
-        base_probability *= random.uniform(0.8, 1.2)
+        base_probability *= rng.uniform(0.8, 1.2)
         
         return min(base_probability, 0.8)  # Cap at 80%
     
@@ -135,20 +177,21 @@ class MultiCarSimulator:
         
         return car1_advantage
     
-    def simulate_overtaking(self, lap: int) -> List[OvertakingEvent]:
+    def simulate_overtaking(self, cars: List[CarState], lap: int, rng: Any = None) -> List[OvertakingEvent]:
         """Simulate overtaking attempts for the current lap"""
+        rng = rng or random
         events = []
         
         # Check each car for overtaking opportunities
-        for i in range(len(self.cars) - 1):
-            attacking_car = self.cars[i + 1]  # Car behind
-            defending_car = self.cars[i]      # Car ahead
+        for i in range(len(cars) - 1):
+            attacking_car = cars[i + 1]  # Car behind
+            defending_car = cars[i]      # Car ahead
             
             # Only attempt overtaking if within 2 seconds
             if attacking_car.gap_to_car_ahead < 2.0:
-                probability = self.calculate_overtaking_probability(attacking_car, defending_car)
+                probability = self.calculate_overtaking_probability(attacking_car, defending_car, rng)
                 
-                if random.random() < probability:
+                if rng.random() < probability:
                     # Successful overtake
                     event = OvertakingEvent(
                         lap=lap,
@@ -165,22 +208,20 @@ class MultiCarSimulator:
                     attacking_car.gap_to_car_ahead = event.gap_after
                     
                     # Update gaps for other cars
-                    self._update_gaps()
+                    update_gaps(cars)
         
         return events
     
-    def _update_gaps(self):
-        """Update gaps between cars after position changes"""
-        for i in range(len(self.cars)):
-            if i == 0:
-                self.cars[i].gap_to_leader = 0.0
-                self.cars[i].gap_to_car_ahead = 0.0
-            else:
-                self.cars[i].gap_to_leader = self.cars[i].total_time - self.cars[0].total_time
-                self.cars[i].gap_to_car_ahead = self.cars[i].total_time - self.cars[i-1].total_time
-    
-    def simulate_lap(self, lap: int, weather: str) -> Dict[str, Any]:
-        """Simulate one lap for all cars"""
+    def simulate_lap(self, cars: List[CarState], lap: int, weather: str,
+                     grip_levels: Optional[List[float]] = None,
+                     wear_multipliers: Optional[List[float]] = None,
+                     rng: Any = None) -> Dict[str, Any]:
+        """Simulate one lap for all cars, updating them and re-sorting the list by position.
+        
+        grip_levels and wear_multipliers are optional per-compound values for this
+        lap (indexed like TIRE_COMPOUNDS), taken from a weather forecast.
+        """
+        rng = rng or random
         lap_results = {
             "lap": lap,
             "cars": [],
@@ -188,10 +229,10 @@ class MultiCarSimulator:
         }
         
         # Simulate each car's lap
-        for car in self.cars:
+        for car in cars:
             if car.is_pitting and car.pit_lap == lap:
                 # Car is pitting this lap
-                car.total_time += 25.0  # Pit stop time
+                car.total_time += PIT_STOP_TIME
                 car.tire_wear = 0.0
                 car.last_pit_lap = lap
                 car.is_pitting = False
@@ -207,13 +248,23 @@ class MultiCarSimulator:
                 car.is_pitting = True
                 car.pit_lap = lap + 1
             
+            grip_level = wear_multiplier = None
+            if grip_levels is not None:
+                compound = COMPOUND_INDEX.get(car.current_tire, COMPOUND_INDEX["Medium"])
+                grip_level = grip_levels[compound]
+                wear_multiplier = wear_multipliers[compound]
+            
             # Calculate sector times
-            car.sector_times = self.calculate_sector_times(car, weather)
+            car.sector_times = self.calculate_sector_times(car, weather, grip_level, rng)
             car.lap_time = sum(car.sector_times)
             
             # Update tire wear
-            tire_degradation = self.track.tire_degradation.get(car.current_tire, 1.0)
-            car.tire_wear += 1.0 * tire_degradation * (1.0 if car.driver_style == "balanced" else 1.2 if car.driver_style == "aggressive" else 0.8)
+            tire_degradation = self.profile.degradation_for(car.current_tire)
+            # Styles without an entry wear their tires like conservative drivers
+            wear_increase = tire_degradation * DRIVER_STYLE_WEAR.get(car.driver_style, DRIVER_STYLE_WEAR["conservative"])
+            if wear_multiplier is not None:
+                wear_increase *= wear_multiplier
+            car.tire_wear += wear_increase
             
             # Update fuel load
             car.fuel_load = lap
@@ -238,7 +289,7 @@ class MultiCarSimulator:
             })
         
         # Simulate overtaking
-        overtaking_events = self.simulate_overtaking(lap)
+        overtaking_events = self.simulate_overtaking(cars, lap, rng)
         lap_results["overtaking_events"] = [
             {
                 "lap": event.lap,
@@ -252,25 +303,104 @@ class MultiCarSimulator:
         ]
         
         # Sort cars by position (total time)
-        self.cars.sort(key=lambda x: x.total_time)
-        for i, car in enumerate(self.cars):
+        cars.sort(key=lambda x: x.total_time)
+        for i, car in enumerate(cars):
             car.position = i + 1
         
         # Update gaps
-        self._update_gaps()
+        update_gaps(cars)
         
         return lap_results
     
-    def simulate_race(self, car_configs: List[Dict[str, Any]], weather: str = "dry") -> List[Dict[str, Any]]:
-        """Simulate complete race with multiple cars"""
-        self.initialize_cars(car_configs)
-        self.lap_results = []
+    def start(self, car_configs: List[Dict[str, Any]], weather: str = "dry",
+              forecast: Optional[List[Any]] = None, rng: Any = None) -> RaceState:
+        """Put the cars on the grid and return the state for running the race with step()"""
+        total_laps = self.profile.total_laps
+        grip_table = wear_table = [None] * total_laps
+        if forecast:
+            grip_table, wear_table = WeatherSimulator().build_lap_multipliers(forecast, total_laps)
+            grip_table, wear_table = grip_table.tolist(), wear_table.tolist()
+        
+        return RaceState(
+            cars=self.initialize_cars(car_configs),
+            weather=weather,
+            total_laps=total_laps,
+            rng=rng or random,
+            grip_table=grip_table,
+            wear_table=wear_table
+        )
+    
+    def step(self, state: RaceState) -> Optional[Dict[str, Any]]:
+        """Simulate the next lap of a race, or return None once it is over"""
+        if state.is_finished:
+            return None
+        lap = state.current_lap + 1
+        lap_result = self.simulate_lap(
+            state.cars, lap, state.weather, state.grip_table[lap - 1], state.wear_table[lap - 1], state.rng
+        )
+        state.current_lap = lap
+        return lap_result
+    
+    def update_strategy(self, state: RaceState, car_id: str, strategy: Dict[str, Any]):
+        """
+        Replace a car's strategy for the rest of the race.
         
-        for lap in range(1, self.track.total_laps + 1):
-            lap_result = self.simulate_lap(lap, weather)
-            self.lap_results.append(lap_result)
+        pit_stops are the remaining stops, all after the current lap; tires
+        starts with the compound currently fitted, followed by one compound
+        per remaining stop. driver_style is optional.
+        """
+        car = state.car(car_id)
+        if car is None:
+            raise ValueError(f"Unknown car: {car_id}")
+        pit_stops = sorted(strategy["pit_stops"])
+        tires = strategy["tires"]
+        if any(lap <= state.current_lap or lap > state.total_laps for lap in pit_stops):
+            raise ValueError(f"Pit stops must be between lap {state.current_lap + 1} and {state.total_laps}")
+        if len(tires) != len(pit_stops) + 1:
+            raise ValueError("tires needs one compound more than pit_stops")
+        if tires[0] != car.current_tire:
+            raise ValueError(f"tires must start with the fitted compound ({car.current_tire})")
         
-        return self.lap_results
+        car.strategy = {
+            "pit_stops": pit_stops,
+            "tires": tires,
+            "driver_style": strategy.get("driver_style") or car.driver_style
+        }
+        car.driver_style = car.strategy["driver_style"]
+        # A stop already called for the next lap is replaced by the new plan
+        car.is_pitting = state.current_lap + 1 in pit_stops
+        car.pit_lap = state.current_lap + 1 if car.is_pitting else None
+    
+    def simulate_race(self, car_configs: List[Dict[str, Any]], weather: str = "dry",
+                      forecast: Optional[List[Any]] = None,
+                      cancel_token: Optional[CancellationToken] = None,
+                      rng: Any = None) -> List[Dict[str, Any]]:
+        """Simulate complete race with multiple cars, optionally with a per-lap weather forecast"""
+        state = self.start(car_configs, weather, forecast, rng)
+        lap_results = []
+        while not state.is_finished:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            lap_results.append(self.step(state))
+        return lap_results
+
+def update_gaps(cars: List[CarState]):
+    """Update gaps between cars after position changes"""
+    for i in range(len(cars)):
+        if i == 0:
+            cars[i].gap_to_leader = 0.0
+            cars[i].gap_to_car_ahead = 0.0
+        else:
+            cars[i].gap_to_leader = cars[i].total_time - cars[0].total_time
+            cars[i].gap_to_car_ahead = cars[i].total_time - cars[i-1].total_time
+
+def get_multi_car_simulator(track_id: str = "silverstone") -> MultiCarSimulator:
+    """Get the shared simulator for a track id or alias; it holds no race state, so threads can share it"""
+    return _build_multi_car_simulator(get_track_profile(track_id).track_id)
+
+@lru_cache(maxsize=None)
+def _build_multi_car_simulator(track_id: str) -> MultiCarSimulator:
+    return MultiCarSimulator(track_id)
 
 def create_sample_car_configs() -> List[Dict[str, Any]]:
     """Create sample car configurations for testing"""
@@ -0,0 +1,255 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import multiprocessing
+import os
+import random
+import threading
+import numpy as np
+from .cancellation import CancellationToken, SimulationCancelled
+
+T = TypeVar("T")
+
+# Processes for Monte Carlo runs; 0 keeps every run in the calling process,
+# which is also what Lambda needs (no /dev/shm or multiprocessing semaphores)
+MONTE_CARLO_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", "0"))
+# Below this many runs, process start-up and scheduling cost more than they save
+MONTE_CARLO_MIN_RUNS = int(os.getenv("MONTE_CARLO_MIN_RUNS", "50"))
+# How often the parent checks its cancel token while workers run
+CANCEL_POLL_INTERVAL = 0.1
+
+RUN_OK = "ok"
+RUN_FAILED = "failed"
+RUN_CANCELLED = "cancelled"
+
+# (field, dtype, per lap) of each result array; per-run fields have one value per run
+RESULT_FIELDS = (
+    ("lap_time", "f8", True),
+    ("tire_wear", "f8", True),
+    ("position", "i2", True),
+    ("total_time", "f8", False)
+)
+# The first bytes of a buffer hold its cancel flag; arrays start 8-byte aligned after it
+HEADER_SIZE = 8
+
+# (index, status, error detail) reported for each run
+RunStatus = Tuple[int, str, Optional[str]]
+
+def _layout(num_runs: int, num_laps: int) -> Tuple[List[Tuple[str, np.dtype, Tuple[int, ...], int]], int]:
+    layout = []
+    offset = HEADER_SIZE
+    for name, dtype, per_lap in RESULT_FIELDS:
+        dtype = np.dtype(dtype)
+        shape = (num_runs, num_laps) if per_lap else (num_runs,)
+        layout.append((name, dtype, shape, offset))
+        size = dtype.itemsize * int(np.prod(shape))
+        offset += -(-size // 8) * 8
+    return layout, offset
+
+class ResultBuffer:
+    """
+    Lap times, tire wear and positions of num_runs single-car races.
+
+    All arrays live in one block of memory. With shared=True the block is a
+    multiprocessing.shared_memory segment that worker processes attach to by
+    spec and write their runs into, so results never pass through a pipe and
+    the parent aggregates them in place. The creating process must unlink() a
+    shared buffer; everyone closes their own view. Arrays must not be used, or
+    referenced by anything returned, after close().
+    """
+
+    def __init__(self, num_runs: int, num_laps: int, shared: bool = False, name: Optional[str] = None):
+        self.num_runs = num_runs
+        self.num_laps = num_laps
+        layout, size = _layout(num_runs, num_laps)
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        if name is not None:
+            self._shm = shared_memory.SharedMemory(name=name)
+            memory = self._shm.buf
+        elif shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            memory = self._shm.buf
+        else:
+            memory = bytearray(size)
+        self._flag = np.ndarray((1,), np.uint8, memory, 0)
+        self.arrays: Dict[str, np.ndarray] = {
+            field: np.ndarray(shape, dtype, memory, offset) for field, dtype, shape, offset in layout
+        }
+
+    @property
+    def spec(self) -> Tuple[str, int, int]:
+        """Picklable (name, num_runs, num_laps) for attach() in another process"""
+        if self._shm is None:
+            raise ValueError("Only shared buffers can be attached to")
+        return self._shm.name, self.num_runs, self.num_laps
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int, int]) -> "ResultBuffer":
+        name, num_runs, num_laps = spec
+        return cls(num_runs, num_laps, name=name)
+
+    @property
+    def lap_time(self) -> np.ndarray:
+        return self.arrays["lap_time"]
+
+    @property
+    def tire_wear(self) -> np.ndarray:
+        return self.arrays["tire_wear"]
+
+    @property
+    def position(self) -> np.ndarray:
+        return self.arrays["position"]
+
+    @property
+    def total_time(self) -> np.ndarray:
+        return self.arrays["total_time"]
+
+    def record(self, index: int, laps: List[Dict[str, Any]]):
+        """Write one run's per-lap results (lap_time, tire_wear, position, optional total_time)"""
+        self.lap_time[index] = [lap["lap_time"] for lap in laps]
+        self.tire_wear[index] = [lap["tire_wear"] for lap in laps]
+        self.position[index] = [lap["position"] for lap in laps]
+        last = laps[-1]
+        self.total_time[index] = last["total_time"] if "total_time" in last else sum(lap["lap_time"] for lap in laps)
+
+    def cancel(self):
+        """Tell every process using the buffer to stop at its next lap"""
+        self._flag[0] = 1
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self._flag[0])
+
+    def raise_if_cancelled(self):
+        # Lets a worker pass the buffer to simulations as their cancel token
+        if self.cancelled:
+            raise SimulationCancelled("cancelled")
+
+    def close(self):
+        self.arrays = {}
+        self._flag = None
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
+
+def monte_carlo_workers(num_runs: int) -> int:
+    """Processes to spread num_runs over, or 0 to run them in this process"""
+    if MONTE_CARLO_WORKERS <= 0 or num_runs < MONTE_CARLO_MIN_RUNS:
+        return 0
+    # Pool workers do not start pools of their own
+    if multiprocessing.parent_process() is not None:
+        return 0
+    return MONTE_CARLO_WORKERS
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Created on first use so importing the app does not start processes. The
+    # server runs executor, logging and event loop threads, so workers are not
+    # forked from it: a fork while another thread holds a lock can deadlock the child
+    with _pools_lock:
+        if workers not in _pools:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+        return _pools[workers]
+
+def _run_runs(buffer: ResultBuffer, task: Any, runs: List[Tuple[int, Optional[int]]], cancel_token: Any) -> List[RunStatus]:
+    statuses: List[RunStatus] = []
+    for position, (index, seed) in enumerate(runs):
+        try:
+            cancel_token.raise_if_cancelled()
+            task.run(buffer, index, random.Random(seed), cancel_token)
+            statuses.append((index, RUN_OK, None))
+        except SimulationCancelled:
+            # Cancellation is final, so the remaining runs are cancelled without starting
+            statuses.extend((later, RUN_CANCELLED, None) for later, _ in runs[position:])
+            break
+        except Exception as e:
+            statuses.append((index, RUN_FAILED, str(e)))
+    return statuses
+
+def _run_chunk(spec: Tuple[str, int, int], task: Any, runs: List[Tuple[int, Optional[int]]]) -> List[RunStatus]:
+    """Worker entry point: attach to the parent's buffer, write the runs, return only their statuses"""
+    buffer = ResultBuffer.attach(spec)
+    try:
+        return _run_runs(buffer, task, runs, buffer)
+    finally:
+        buffer.close()
+
+def _run_in_processes(buffer: ResultBuffer, task: Any, runs: List[Tuple[int, Optional[int]]], workers: int,
+                      cancel_token: Optional[CancellationToken]) -> List[RunStatus]:
+    pool = _get_pool(workers)
+    # A few chunks per worker balances load without a round trip per run
+    chunk_size = max(1, -(-len(runs) // (workers * 4)))
+    chunks = [runs[start:start + chunk_size] for start in range(0, len(runs), chunk_size)]
+    pending = {
+        pool.submit(_run_chunk, buffer.spec, task.chunk([index for index, _ in chunk]), chunk)
+        for chunk in chunks
+    }
+    statuses: List[RunStatus] = []
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                statuses.extend(future.result())
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+    finally:
+        if pending:
+            buffer.cancel()
+            for future in pending:
+                future.cancel()
+            # Running chunks stop at their next lap; wait so no worker still holds the segment
+            wait(pending)
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+    return statuses
+
+def run_monte_carlo(task: Any, seeds: List[Optional[int]],
+                    aggregate: Callable[[ResultBuffer, List[RunStatus]], T],
+                    cancel_token: Optional[CancellationToken] = None,
+                    workers: Optional[int] = None) -> T:
+    """
+    Run task once per seed into a ResultBuffer and return aggregate(buffer, statuses).
+
+    task has num_laps and run(buffer, index, rng, cancel_token), which records
+    run index with buffer.record. With workers it must be picklable and have
+    chunk(indices), returning a task with only what those runs need; that is
+    what each worker receives.
+    Across processes only (index, seed) pairs go out and (index, status,
+    detail) triples come back, ordered by index. aggregate runs while the
+    buffer is open and must copy out anything it returns. workers defaults to
+    monte_carlo_workers(len(seeds)); a cancelled token raises
+    SimulationCancelled.
+    """
+    workers = monte_carlo_workers(len(seeds)) if workers is None else workers
+    runs = list(enumerate(seeds))
+    buffer = ResultBuffer(len(seeds), task.num_laps, shared=workers > 0)
+    try:
+        if workers > 0:
+            statuses = _run_in_processes(buffer, task, runs, workers, cancel_token)
+        else:
+            statuses = _run_runs(buffer, task, runs, cancel_token or CancellationToken())
+            if cancel_token is not None and cancel_token.cancelled:
+                raise SimulationCancelled(cancel_token.reason)
+        statuses.sort()
+        return aggregate(buffer, statuses)
+    finally:
+        buffer.close()
+        if workers > 0:
+            buffer.unlink()
+
+def draw_seeds(count: int, rng: Any = None) -> List[int]:
+    """Per-run seeds drawn from rng (the global random module by default), so seeding rng reproduces every run"""
+    rng = rng or random
+    return [rng.getrandbits(64) for _ in range(count)]
+
+def raise_for_failed_runs(statuses: List[RunStatus]):
+    """Raise RuntimeError for the first failed run, for aggregates that need every run"""
+    for index, status, detail in statuses:
+        if status != RUN_OK:
+            raise RuntimeError(f"Monte Carlo run {index} {status}: {detail}")
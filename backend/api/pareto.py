@@ -0,0 +1,253 @@
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, replace
+from bisect import bisect_right
+from itertools import combinations, product
+import math
+import numpy as np
+from .multi_car_simulation import DRIVER_STYLE_PACE, DRIVER_STYLE_WEAR, PIT_STOP_TIME, SECTOR_NOISE
+from .strategy_comparison import StrategyComparison, get_strategy_comparator
+from .tracks import track_db
+from .track_profile import get_track_profile
+from .weather_system import (
+    COMPOUND_INDEX, CONDITION_CODES, DEFAULT_WEATHER_PATTERN, TRACK_WEATHER_PATTERNS, WeatherSimulator, default_weather
+)
+from .cancellation import CancellationToken
+
+# Variance of the uniform sector noise in MultiCarSimulator.calculate_sector_times
+SECTOR_NOISE_VARIANCE = SECTOR_NOISE ** 2 / 12
+# Sector times are rounded to 3 decimals before being summed into the lap time
+SECTOR_ROUNDING_ERROR = 0.0005
+
+@dataclass
+class StrategyBounds:
+    index: int
+    expected_time: float
+    time_lower: float
+    time_upper: float
+    risk_lower: float
+    risk_upper: float
+    expected_variance: float
+
+@dataclass
+class ParetoFrontier:
+    names: List[str]
+    total_time: List[float]
+    risk_score: List[float]
+    time_variance: List[float]
+    strategies: List[Dict[str, Any]]
+    candidates_considered: int
+    candidates_pruned: int
+    candidates_simulated: int
+
+def dominates(a: Tuple[float, ...], b: Tuple[float, ...]) -> bool:
+    """Check whether objective vector a Pareto-dominates b (all objectives minimised)"""
+    return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+def non_dominated(points: List[Tuple[float, ...]]) -> List[int]:
+    """Return indices of the non-dominated points, ordered by the first objective"""
+    order = sorted(range(len(points)), key=lambda i: points[i])
+    front: List[int] = []
+
+    for i in order:
+        # Points are sorted, so only earlier front members can dominate this one
+        if not any(dominates(points[j], points[i]) for j in front):
+            front.append(i)
+
+    return front
+
+class StrategyFrontierEngine:
+    def __init__(self, track_id: str = "silverstone"):
+        self.profile = get_track_profile(track_id)
+        self.comparator = get_strategy_comparator(track_id)
+
+    def forecast_multipliers(self, weather: str = "dry") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-compound grip and wear multipliers the comparator's forecasts can apply.
+
+        Forecasts starting from default_weather hold their condition and grip
+        level; only the track temperature moves, and with it the temperature
+        band that sets wear. Returns (bands x compounds) grip and wear arrays
+        over the bands this track's forecasts can reach.
+        """
+        base = default_weather(weather if weather in CONDITION_CODES else "dry")
+        pattern = TRACK_WEATHER_PATTERNS.get(self.profile.track_id, DEFAULT_WEATHER_PATTERN)
+        # forecast_weather draws the track temperature as temperature + 10 with two uniform offsets
+        spread = pattern["temperature_variation"] / 2 + 2.0
+        low, high = base.temperature + 10.0 - spread, base.temperature + 10.0 + spread
+        temperatures = [low, high, min(max(low, 15.0), high)]
+        return WeatherSimulator().build_lap_multipliers(
+            [replace(base, track_temperature=temperature) for temperature in temperatures]
+        )
+
+    def estimate_expected_time(self, strategy: Dict[str, Any], weather: str = "dry",
+                               multipliers: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> float:
+        """
+        Closed-form expected race time of a single-car MultiCarSimulator run.
+
+        multipliers are per-compound (grip, wear) arrays applied every lap, as
+        a forecast would; without them the fixed condition pace is used.
+        """
+        profile = self.profile
+        pace = DRIVER_STYLE_PACE.get(strategy["driver_style"], 1.0)
+        wear_rate = DRIVER_STYLE_WEAR.get(strategy["driver_style"], DRIVER_STYLE_WEAR["conservative"])
+        condition_pace = 1.0
+        if weather in CONDITION_CODES:
+            condition_pace = profile.condition_pace[CONDITION_CODES[weather]]
+
+        base_time = profile.base_lap_time
+        wear_factor = profile.lap_wear_factor
+        fuel_factor = profile.lap_fuel_factor * 0.01
+
+        tires = strategy["tires"]
+        pit_stops = set(strategy["pit_stops"])
+        current_tire = tires[0]
+        tire_wear = 0.0
+        fuel_load = 0.0
+        total_time = 0.0
+
+        # Mirrors the pit and wear bookkeeping of MultiCarSimulator.simulate_lap
+        for lap in range(1, profile.total_laps + 1):
+            if lap in pit_stops and lap > 1:
+                total_time += PIT_STOP_TIME
+                tire_wear = 0.0
+                current_tire_index = tires.index(current_tire)
+                if current_tire_index < len(tires) - 1:
+                    current_tire = tires[current_tire_index + 1]
+
+            lap_pace, lap_wear = condition_pace, 1.0
+            if multipliers is not None:
+                compound = COMPOUND_INDEX.get(current_tire, COMPOUND_INDEX["Medium"])
+                lap_pace = 1.0 + (1.0 - multipliers[0][compound]) * profile.weather_multiplier
+                lap_wear = multipliers[1][compound]
+
+            total_time += (base_time + tire_wear * wear_factor + fuel_load * fuel_factor) * pace * lap_pace
+            tire_wear += profile.degradation_for(current_tire) * wear_rate * lap_wear
+            fuel_load = lap
+
+        return total_time
+
+    def estimate_bounds(self, index: int, strategy: Dict[str, Any], weather: str,
+                        num_simulations: int, confidence: float) -> StrategyBounds:
+        """Cheap optimistic/pessimistic bounds on the Monte Carlo objectives of a strategy"""
+        noise_terms = self.profile.total_laps * len(self.profile.sector_base_times)
+        expected_variance = noise_terms * SECTOR_NOISE_VARIANCE
+
+        # Margin on the mean of num_simulations runs, plus worst-case rounding drift
+        margin = confidence * math.sqrt(expected_variance / max(1, num_simulations))
+        margin += noise_terms * SECTOR_ROUNDING_ERROR
+        # Race time grows with wear and shrinks with grip, so the extremes over
+        # the reachable temperature bands bound every forecast's race
+        grip, wear = self.forecast_multipliers(weather)
+        fastest = self.estimate_expected_time(strategy, weather, (grip.max(axis=0), wear.min(axis=0)))
+        slowest = self.estimate_expected_time(strategy, weather, (grip.min(axis=0), wear.max(axis=0)))
+        expected_time = (fastest + slowest) / 2
+
+        structural_risk = self.comparator.calculate_structural_risk(strategy)
+        variance_upper = expected_variance * (1.0 + confidence * math.sqrt(2.0 / max(1, num_simulations - 1)))
+
+        return StrategyBounds(
+            index=index,
+            expected_time=expected_time,
+            time_lower=fastest - margin,
+            time_upper=slowest + margin,
+            risk_lower=min(structural_risk, 1.0),
+            risk_upper=min(structural_risk + min(variance_upper / 1000, 0.3), 1.0),
+            expected_variance=expected_variance
+        )
+
+    def prune_dominated(self, bounds: List[StrategyBounds]) -> List[StrategyBounds]:
+        """Drop candidates whose optimistic time/risk bounds are dominated by another candidate's pessimistic bounds"""
+        # Staircase of pessimistic (time, risk) points: time ascending, risk strictly descending
+        staircase_times: List[float] = []
+        staircase_risks: List[float] = []
+        for b in sorted(bounds, key=lambda x: (x.time_upper, x.risk_upper)):
+            if not staircase_risks or b.risk_upper < staircase_risks[-1]:
+                staircase_times.append(b.time_upper)
+                staircase_risks.append(b.risk_upper)
+
+        survivors = []
+        for b in bounds:
+            # Best guaranteed risk among candidates that are guaranteed to be no slower
+            position = bisect_right(staircase_times, b.time_lower)
+            if position and staircase_risks[position - 1] <= b.risk_lower:
+                continue
+            survivors.append(b)
+
+        return survivors
+
+    def compute_frontier(self, strategies: List[Dict[str, Any]],
+                         weather: str = "dry",
+                         num_simulations: int = 5,
+                         confidence: float = 4.0,
+                         cancel_token: Optional[CancellationToken] = None,
+                         progress: Optional[Callable[[int, int], None]] = None) -> ParetoFrontier:
+        """
+        Compute the non-dominated time/risk frontier over a set of candidate strategies.
+
+        Time variance is not a separate objective: it comes from sector noise
+        that does not depend on the strategy, so differences between sampled
+        variances are noise. It enters only through the risk score, whose
+        bounds cover it, so pruning and the frontier use the same objectives. Each
+        member's sampled variance is still reported.
+        progress, if given, is called with (candidates simulated, survivors)
+        after each Monte Carlo evaluation.
+        """
+        bounds = [
+            self.estimate_bounds(i, strategy, weather, num_simulations, confidence)
+            for i, strategy in enumerate(strategies)
+        ]
+        survivors = self.prune_dominated(bounds)
+
+        # Full Monte Carlo only for candidates that might still be on the frontier
+        evaluated: List[Tuple[int, StrategyComparison]] = []
+        for b in survivors:
+            evaluated.append(
+                (b.index, self.comparator.evaluate_strategy(strategies[b.index], weather, num_simulations, cancel_token))
+            )
+            if progress:
+                progress(len(evaluated), len(survivors))
+        points = [(s.total_time, s.risk_score) for _, s in evaluated]
+        front = [evaluated[i] for i in non_dominated(points)]
+
+        return ParetoFrontier(
+            names=[s.strategy_name for _, s in front],
+            total_time=[round(s.total_time, 3) for _, s in front],
+            risk_score=[round(s.risk_score, 4) for _, s in front],
+            time_variance=[round(s.time_variance, 4) for _, s in front],
+            strategies=[strategies[i] for i, _ in front],
+            candidates_considered=len(strategies),
+            candidates_pruned=len(strategies) - len(survivors),
+            candidates_simulated=len(survivors)
+        )
+
+def generate_candidate_strategies(track_id: str = "silverstone",
+                                  max_stops: int = 2,
+                                  pit_lap_step: int = 3,
+                                  min_stint: int = 8,
+                                  compounds: Optional[List[str]] = None,
+                                  driver_styles: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Enumerate pit lap / compound / driver style combinations for frontier search"""
+    track = track_db.get_track(track_id)
+    compounds = compounds or ["Soft", "Medium", "Hard"]
+    driver_styles = driver_styles or ["aggressive", "balanced", "conservative"]
+    pit_laps = range(min_stint, track.total_laps - min_stint + 1, pit_lap_step)
+    candidates = []
+
+    for stops in range(1, max_stops + 1):
+        for laps in combinations(pit_laps, stops):
+            # Every stint must be at least min_stint laps long
+            if any(b - a < min_stint for a, b in zip(laps, laps[1:])):
+                continue
+            for tires in product(compounds, repeat=stops + 1):
+                # Dry races require at least two different compounds
+                if len(set(tires)) < 2:
+                    continue
+                for style in driver_styles:
+                    candidates.append({
+                        "name": f"{stops}-stop {'-'.join(t[0] for t in tires)} @{'/'.join(map(str, laps))} {style}",
+                        "pit_stops": list(laps),
+                        "tires": list(tires),
+                        "driver_style": style
+                    })
+
+    return candidates
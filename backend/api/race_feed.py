@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional
+from .multi_car_simulation import RaceState, get_multi_car_simulator
+
+# Gaps are sent to the millisecond
+GAP_PRECISION = 3
+
+class RaceSession:
+    """
+    One live race, advanced lap by lap for the WebSocket feed.
+
+    Each lap is reported as a compact delta against the previous lap: gaps
+    for every car, but positions and tires only for cars whose value changed,
+    plus the cars that pitted and the overtakes that happened on the lap.
+    """
+
+    def __init__(self, track_id: str = "silverstone"):
+        self.simulator = get_multi_car_simulator(track_id)
+        self.state: Optional[RaceState] = None
+        self._positions: Dict[str, int] = {}
+        self._tires: Dict[str, str] = {}
+
+    @property
+    def current_lap(self) -> int:
+        return self.state.current_lap
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state.is_finished
+
+    def start(self, car_configs: List[Dict[str, Any]], weather: str = "dry",
+              forecast: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Put the cars on the grid and return the full starting snapshot"""
+        self.state = self.simulator.start(car_configs, weather, forecast)
+        self._positions = {car.car_id: car.position for car in self.state.cars}
+        self._tires = {car.car_id: car.current_tire for car in self.state.cars}
+        return {
+            "type": "started",
+            "track_id": self.simulator.profile.track_id,
+            "total_laps": self.simulator.profile.total_laps,
+            "weather": weather,
+            "cars": [
+                {
+                    "car_id": car.car_id,
+                    "driver_name": car.driver_name,
+                    "position": car.position,
+                    "tire": car.current_tire,
+                    "strategy": car.strategy
+                }
+                for car in self.state.cars
+            ]
+        }
+
+    def next_lap(self) -> Optional[Dict[str, Any]]:
+        """Simulate one lap and return its delta, or None once the race is over"""
+        lap_result = self.simulator.step(self.state)
+        if lap_result is None:
+            return None
+        lap = lap_result["lap"]
+        cars = self.state.cars
+
+        positions = {c.car_id: c.position for c in cars if self._positions.get(c.car_id) != c.position}
+        tires = {c.car_id: c.current_tire for c in cars if self._tires.get(c.car_id) != c.current_tire}
+        self._positions.update(positions)
+        self._tires.update(tires)
+
+        return {
+            "type": "lap",
+            "lap": lap,
+            "order": [c.car_id for c in cars] if positions else None,
+            "positions": positions,
+            "gaps": {c.car_id: round(c.gap_to_leader, GAP_PRECISION) for c in cars},
+            "lap_times": {c.car_id: round(c.lap_time, GAP_PRECISION) for c in cars},
+            "pits": [c.car_id for c in cars if c.last_pit_lap == lap],
+            "tires": tires,
+            "overtakes": [[e["overtaking_car"], e["overtaken_car"]] for e in lap_result["overtaking_events"]]
+        }
+
+    def update_strategy(self, car_id: str, strategy: Dict[str, Any]) -> Dict[str, Any]:
+        """Change a car's remaining strategy; it applies from the next simulated lap"""
+        self.simulator.update_strategy(self.state, car_id, strategy)
+        car = self.state.car(car_id)
+        return {"type": "strategy_updated", "car_id": car_id, "lap": self.current_lap, "strategy": car.strategy}
+
+    def standings(self) -> Dict[str, Any]:
+        return {
+            "type": "finished",
+            "lap": self.current_lap,
+            "results": [
+                {
+                    "car_id": car.car_id,
+                    "driver_name": car.driver_name,
+                    "position": car.position,
+                    "total_time": round(car.total_time, GAP_PRECISION),
+                    "gap_to_leader": round(car.gap_to_leader, GAP_PRECISION)
+                }
+                for car in self.state.cars
+            ]
+        }
@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Optional, Tuple
+import gzip
+import json
+import struct
+import numpy as np
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+RESPONSE_FORMATS = ("json", "columnar", "binary")
+BINARY_MAGIC = b"F1SB"
+BINARY_MEDIA_TYPE = "application/x-f1-simulation"
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_json(payload: Any) -> bytes:
+    """Encode with orjson when available, falling back to the standard library"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode()
+
+def to_columnar(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Turn a list of same-shaped row dicts into one list per field"""
+    if not rows:
+        return {}
+    return {key: [row.get(key) for row in rows] for key in rows[0]}
+
+def encode_binary(columns: Dict[str, List[Any]], meta: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Pack numeric columns as little-endian float64 arrays behind a JSON header.
+
+    Layout: b"F1SB", uint32 header length, UTF-8 JSON header with the column
+    names, row count and meta fields, then one float64 array per column.
+    Missing values are encoded as NaN.
+    """
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    header = encode_json({"columns": names, "rows": rows, "dtype": "<f8", "meta": meta or {}})
+    body = [
+        np.asarray([np.nan if v is None else v for v in columns[name]], dtype="<f8").tobytes()
+        for name in names
+    ]
+    return BINARY_MAGIC + struct.pack("<I", len(header)) + header + b"".join(body)
+
+def decode_binary(data: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Inverse of encode_binary, returning (columns, meta)"""
+    if data[:4] != BINARY_MAGIC:
+        raise ValueError("Not an F1 simulation binary payload")
+    (header_length,) = struct.unpack("<I", data[4:8])
+    header = json.loads(data[8:8 + header_length])
+    array = np.frombuffer(data, dtype=header["dtype"], offset=8 + header_length)
+    array = array.reshape(len(header["columns"]), header["rows"])
+    return dict(zip(header["columns"], array)), header["meta"]
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {encoding: quality}"""
+    offered: Dict[str, float] = {}
+    for part in (accept_encoding or "").lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name.strip():
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    return offered
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    offered = accepted_encodings(accept_encoding)
+    return offered.get(encoding, offered.get("*", 0.0)) > 0
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring brotli when installed"""
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepts_encoding(accept_encoding, encoding):
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+def fast_response(payload: Any, accept_encoding: Optional[str] = None,
+                  media_type: str = "application/json", status_code: int = 200) -> Response:
+    """
+    Serialize trusted internal output straight to a Response.
+
+    Skips Pydantic model construction and FastAPI's jsonable_encoder, and
+    compresses bodies above MIN_COMPRESS_SIZE when the client accepts it.
+    """
+    body = payload if isinstance(payload, bytes) else encode_json(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_SIZE else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+def simulation_response(payload: Dict[str, Any], laps_key: str, response_format: str = "json",
+                        accept_encoding: Optional[str] = None) -> Response:
+    """
+    Encode a response whose laps_key field holds per-lap rows.
+
+    "json" keeps the row layout, "columnar" replaces the rows with one list
+    per field, and "binary" packs the columns with encode_binary, carrying
+    the remaining fields in the header meta.
+    """
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response format: {response_format}")
+    if response_format == "json":
+        return fast_response(payload, accept_encoding)
+
+    columns = to_columnar(payload[laps_key])
+    rest = {key: value for key, value in payload.items() if key != laps_key}
+    if response_format == "columnar":
+        return fast_response({**rest, laps_key: columns, "format": "columnar"}, accept_encoding)
+    return fast_response(encode_binary(columns, rest), accept_encoding, media_type=BINARY_MEDIA_TYPE)
@@ -1,10 +1,17 @@
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 from .tracks import track_db
-from .multi_car_simulation import MultiCarSimulator, create_sample_car_configs
-from .weather_system import WeatherSimulator
-from .strategy_comparison import StrategyComparator, create_sample_strategies
+from .track_profile import get_track_profile
+from .multi_car_simulation import get_multi_car_simulator, create_sample_car_configs
+from .weather_system import WeatherSimulator, COMPOUND_INDEX, WEATHER_CONDITIONS, default_weather, forecast_weather
+from .weather_markov import get_markov_model
+from .weather_library import weather_library
+from .strategy_comparison import get_strategy_comparator, create_sample_strategies
+from .pareto import StrategyFrontierEngine, generate_candidate_strategies
+from .cancellation import CancellationToken, SimulationCancelled
+from .parallel import ResultBuffer, RunStatus, RUN_OK, monte_carlo_workers, run_monte_carlo
 
 @dataclass
 class TireCompound:
@@ -21,8 +28,19 @@ class DriverStyle:
     fuel_efficiency: float
 
 class RaceSimulator:
-    def __init__(self, track_id: str = "silverstone"):
+    """
+    Per-track lap time and tire wear model.
+
+    Holds read-only setup only; per-race state lives in simulate_race, and
+    calculate_* take an optional rng, so one simulator per track (see
+    get_race_simulator) is shared by concurrent races.
+    """
+
+    def __init__(self, track_id: str = "silverstone", rng: Optional[random.Random] = None):
         self.track = track_db.get_track(track_id)
+        self.profile = get_track_profile(track_id)
+        # Source of lap time and wear noise; the global random module unless seeded per run
+        self.rng = rng or random
         
         # Tire compound definitions
         self.tire_compounds = {
@@ -52,14 +70,17 @@ class RaceSimulator:
         self.fuel_load_impact = 0.02  # Seconds per lap per lap number
         self.pit_stop_time = 25.0  # Pit stop time in seconds
         
-        # Initialize weather and multi-car simulators
+        # Weather multipliers for forecast-driven races
         self.weather_simulator = WeatherSimulator()
-        self.multi_car_simulator = MultiCarSimulator(track_id)
-        self.strategy_comparator = StrategyComparator(track_id)
         
     def calculate_lap_time(self, lap: int, tire_wear: float, current_tire: str, 
-                          driver_style: str, weather: str, fuel_load: float) -> float:
-        """Calculate lap time based on various factors."""
+                          driver_style: str, weather: str, fuel_load: float,
+                          grip_multiplier: Optional[float] = None, rng: Any = None) -> float:
+        """Calculate lap time based on various factors.
+        
+        grip_multiplier overrides the grip of the weather string, e.g. with a
+        per-lap value from a weather forecast.
+        """
         
         # Get compound and style data
         tire = self.tire_compounds.get(current_tire, self.tire_compounds["Medium"])
@@ -85,16 +106,19 @@ class RaceSimulator:
         lap_time *= style.pace_multiplier
         
         # Weather impact
-        lap_time *= (2 - weather_data["grip_multiplier"])  # Inverse relationship
+        if grip_multiplier is None:
+            grip_multiplier = weather_data["grip_multiplier"]
+        lap_time *= (2 - grip_multiplier)  # Inverse relationship
         
         # Add some randomness (±0.5 seconds)
-        random_variation = (random.random() - 0.5) * 1.0
+        random_variation = ((rng or self.rng).random() - 0.5) * 1.0
         lap_time += random_variation
         
         return round(lap_time, 1)
     
     def calculate_tire_wear(self, current_wear: float, current_tire: str, 
-                           driver_style: str, weather: str) -> float:
+                           driver_style: str, weather: str,
+                           wear_multiplier: Optional[float] = None, rng: Any = None) -> float:
         """Calculate tire wear increase for the lap."""
         
         tire = self.tire_compounds.get(current_tire, self.tire_compounds["Medium"])
@@ -111,24 +135,81 @@ class RaceSimulator:
         wear_increase *= style.tire_wear_multiplier
         
         # Weather impact
-        wear_increase *= weather_data["wear_multiplier"]
+        if wear_multiplier is None:
+            wear_multiplier = weather_data["wear_multiplier"]
+        wear_increase *= wear_multiplier
         
         # Track-specific degradation
-        track_degradation = self.track.tire_degradation.get(current_tire, 1.0)
+        track_degradation = self.profile.degradation_for(current_tire)
         wear_increase *= track_degradation
         
         # Add some randomness
-        wear_increase += (random.random() - 0.5) * 0.3
+        wear_increase += ((rng or self.rng).random() - 0.5) * 0.3
         
         return current_wear + max(0, wear_increase)
 
-def simulate_race(strategy, weather: str = "dry", track_id: str = "silverstone") -> List[Dict[str, Any]]:
+    def expected_race_time(self, pit_stops: List[int], tires: List[str],
+                           driver_style: str = "balanced", weather: str = "dry") -> float:
+        """Closed-form expected total time of simulate_race, summed stint by stint.
+
+        The lap time and wear noise both have zero mean (wear increments are
+        always well above the noise amplitude), so the expectation follows
+        from arithmetic series over each stint.
+        """
+        total_laps = self.profile.total_laps
+        style = self.driver_styles.get(driver_style, self.driver_styles["balanced"])
+        weather_data = self.weather_conditions.get(weather, self.weather_conditions["dry"])
+        lap_scale = style.pace_multiplier * (2 - weather_data["grip_multiplier"])
+
+        pit_laps = sorted(lap for lap in set(pit_stops) if 1 <= lap <= total_laps)
+        boundaries = [1] + pit_laps + [total_laps + 1]
+        total_time = len(pit_laps) * self.pit_stop_time
+        # Fuel load is lap - 1, so the fuel term sums to 0 + 1 + ... + (total_laps - 1)
+        total_time += self.fuel_load_impact * total_laps * (total_laps - 1) / 2 * lap_scale
+
+        tire_index = 0
+        for stint, (start, end) in enumerate(zip(boundaries, boundaries[1:])):
+            if stint > 0:
+                tire_index = min(tire_index + 1, len(tires) - 1)
+            laps = end - start
+            if laps <= 0:
+                continue
+            current_tire = tires[tire_index]
+            tire = self.tire_compounds.get(current_tire, self.tire_compounds["Medium"])
+            wear_per_lap = (tire.wear_rate * style.tire_wear_multiplier * weather_data["wear_multiplier"]
+                            * self.profile.degradation_for(current_tire))
+            # Wear before the k-th lap of a stint is (k - 1) * wear_per_lap
+            wear_sum = wear_per_lap * laps * (laps - 1) / 2
+            stint_time = laps * (self.base_lap_time + (1 - tire.base_grip) * 2.0)
+            stint_time += wear_sum * tire.wear_rate * style.tire_wear_multiplier
+            total_time += stint_time * lap_scale
+
+        return total_time
+
+def get_race_simulator(track_id: str = "silverstone") -> RaceSimulator:
+    """Get the shared, unseeded simulator for a track id or alias"""
+    return _build_race_simulator(get_track_profile(track_id).track_id)
+
+@lru_cache(maxsize=None)
+def _build_race_simulator(track_id: str) -> RaceSimulator:
+    return RaceSimulator(track_id)
+
+def simulate_race(strategy, weather: str = "dry", track_id: str = "silverstone",
+                  forecast: Optional[List[Any]] = None,
+                  simulator: Optional[RaceSimulator] = None,
+                  cancel_token: Optional[CancellationToken] = None,
+                  rng: Any = None) -> List[Dict[str, Any]]:
     """
     Simulate a complete F1 race with the given strategy.
+    
+    If a per-lap weather forecast is given, its grip and wear multipliers are
+    applied lap by lap instead of the single weather condition. An existing
+    simulator for the track can be passed in to share its setup across races.
+    A cancel_token stops the race with SimulationCancelled between laps, and
+    an rng (e.g. a seeded random.Random) makes the race reproducible.
     """
-    simulator = RaceSimulator(track_id)
-    track = track_db.get_track(track_id)
-    total_laps = track.total_laps
+    simulator = simulator or get_race_simulator(track_id)
+    total_laps = simulator.profile.total_laps
     results = []
     tire_wear = 0.0
     current_tire_index = 0
@@ -145,19 +226,32 @@ def simulate_race(strategy, weather: str = "dry", track_id: str = "silverstone")
         tires = strategy.get("tires", ["Medium"])
         driver_style = strategy.get("driver_style", "balanced")
 
+    # Per-lap (lap x compound) weather multipliers, looked up inside the lap loop
+    grip_table = wear_table = None
+    if forecast:
+        grip_table, wear_table = simulator.weather_simulator.build_lap_multipliers(forecast, total_laps)
+        grip_table, wear_table = grip_table.tolist(), wear_table.tolist()
+
     for lap in range(1, total_laps + 1):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
         # Check if this is a pit stop lap
         if lap in pit_stops:
             tire_wear = 0.0
             current_tire_index = min(current_tire_index + 1, len(tires) - 1)
             total_time += simulator.pit_stop_time
         current_tire = tires[current_tire_index] if current_tire_index < len(tires) else tires[-1]
+        grip_multiplier = wear_multiplier = None
+        if grip_table is not None:
+            compound = COMPOUND_INDEX.get(current_tire, COMPOUND_INDEX["Medium"])
+            grip_multiplier = grip_table[lap - 1][compound]
+            wear_multiplier = wear_table[lap - 1][compound]
         lap_time = simulator.calculate_lap_time(
-            lap, tire_wear, current_tire, driver_style, weather, fuel_load
+            lap, tire_wear, current_tire, driver_style, weather, fuel_load, grip_multiplier, rng
         )
         total_time += lap_time
         tire_wear = simulator.calculate_tire_wear(
-            tire_wear, current_tire, driver_style, weather
+            tire_wear, current_tire, driver_style, weather, wear_multiplier, rng
         )
         fuel_load = lap
         results.append({
@@ -169,9 +263,120 @@ def simulate_race(strategy, weather: str = "dry", track_id: str = "silverstone")
         })
     return results
 
+def group_batch_by_track(items: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """
+    Group batch item indices by canonical track id, preserving request order within each group.
+    
+    Items with an unknown track id are grouped under that id as given, so
+    simulate_track_batch reports them as errors instead of racing them elsewhere.
+    """
+    groups: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        requested = item.get("track_id", "silverstone")
+        track_id = track_db.resolve_track_id(requested) or requested
+        groups.setdefault(track_id, []).append(index)
+    return groups
+
+def simulate_track_batch(track_id: str, items: List[Tuple[int, Dict[str, Any]]],
+                         cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, Any]]:
+    """
+    Simulate several races on one track with a single shared simulator.
+    
+    Args:
+        track_id: Track identifier shared by every item
+        items: (index, item) pairs; each item has a strategy, weather and optional seed
+        cancel_token: Optional token that abandons the whole group when cancelled
+    
+    Returns:
+        One result per item, tagged with its index
+    """
+    if not track_db.has_track(track_id):
+        return [{"index": index, "status": "error", "detail": "Unknown track"} for index, _ in items]
+    
+    workers = monte_carlo_workers(len(items))
+    if workers:
+        return _simulate_track_batch_in_processes(track_id, items, workers, cancel_token)
+    
+    simulator = get_race_simulator(track_id)
+    results = []
+    
+    for index, item in items:
+        try:
+            # Each item gets its own generator, so a seed reproduces the race regardless of batch contents
+            laps = simulate_race(item["strategy"], item.get("weather", "dry"), track_id,
+                                 simulator=simulator, cancel_token=cancel_token,
+                                 rng=random.Random(item.get("seed")))
+            results.append({
+                "index": index,
+                "status": "success",
+                "track_id": track_id,
+                "total_time": sum(lap["lap_time"] for lap in laps),
+                "simulation": laps
+            })
+        except SimulationCancelled:
+            raise
+        except Exception as e:
+            results.append({"index": index, "status": "error", "detail": str(e)})
+    
+    return results
+
+@dataclass
+class BatchRuns:
+    """Monte Carlo task for run_monte_carlo: run i simulates batch item i, seeded by the item"""
+    track_id: str
+    items: Dict[int, Dict[str, Any]]
+    num_laps: int
+
+    def chunk(self, indices: List[int]) -> "BatchRuns":
+        # Workers receive only their own items, not the whole batch
+        return BatchRuns(self.track_id, {i: self.items[i] for i in indices}, self.num_laps)
+
+    def run(self, buffer: ResultBuffer, index: int, rng: Any, cancel_token: Any):
+        item = self.items[index]
+        buffer.record(index, simulate_race(item["strategy"], item.get("weather", "dry"), self.track_id,
+                                           cancel_token=cancel_token, rng=rng))
+
+def _simulate_track_batch_in_processes(track_id: str, items: List[Tuple[int, Dict[str, Any]]], workers: int,
+                                       cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, Any]]:
+    """simulate_track_batch on worker processes; laps come back through shared memory, not the pipe"""
+    
+    def collect(buffer: ResultBuffer, statuses: List[RunStatus]) -> List[Dict[str, Any]]:
+        results = []
+        for run, status, detail in statuses:
+            index = items[run][0]
+            if status != RUN_OK:
+                results.append({"index": index, "status": "error", "detail": detail})
+                continue
+            laps = zip(buffer.lap_time[run].tolist(), buffer.tire_wear[run].tolist(), buffer.position[run].tolist())
+            results.append({
+                "index": index,
+                "status": "success",
+                "track_id": track_id,
+                "total_time": float(buffer.total_time[run]),
+                "simulation": [
+                    {"lap": lap, "lap_time": lap_time, "tire_wear": tire_wear, "position": position, "fuel_load": lap}
+                    for lap, (lap_time, tire_wear, position) in enumerate(laps, 1)
+                ]
+            })
+        return results
+    
+    task = BatchRuns(track_id, {run: item for run, (_, item) in enumerate(items)}, get_track_profile(track_id).total_laps)
+    seeds = [item.get("seed") for _, item in items]
+    return run_monte_carlo(task, seeds, collect, cancel_token, workers)
+
+def simulate_race_batch(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Simulate many races, sharing one simulator per track, with results in request order"""
+    results: List[Dict[str, Any]] = [{} for _ in items]
+    for track_id, indices in group_batch_by_track(items).items():
+        for result in simulate_track_batch(track_id, [(i, items[i]) for i in indices]):
+            results[result["index"]] = result
+    return results
+
 def simulate_multi_car_race(car_configs: List[Dict[str, Any]], 
                            weather: str = "dry", 
-                           track_id: str = "silverstone") -> List[Dict[str, Any]]:
+                           track_id: str = "silverstone",
+                           forecast: Optional[List[Any]] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, Any]]:
     """
     Simulate a multi-car race with overtaking and traffic management.
     
@@ -179,17 +384,21 @@ def simulate_multi_car_race(car_configs: List[Dict[str, Any]],
         car_configs: List of car configurations
         weather: Weather conditions
         track_id: Track identifier
+        forecast: Optional per-lap weather forecast, overrides weather lap by lap
+        cancel_token: Optional token checked between laps
     
     Returns:
         List of lap-by-lap simulation results with multiple cars
     """
-    simulator = MultiCarSimulator(track_id)
-    return simulator.simulate_race(car_configs, weather)
+    simulator = get_multi_car_simulator(track_id)
+    return simulator.simulate_race(car_configs, weather, forecast, cancel_token)
 
 def compare_strategies(strategies: List[Dict[str, Any]], 
                       weather: str = "dry", 
                       track_id: str = "silverstone",
-                      num_simulations: int = 5) -> Dict[str, Any]:
+                      num_simulations: int = 5,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
     """
     Compare multiple strategies and provide analysis.
     
@@ -198,12 +407,14 @@ def compare_strategies(strategies: List[Dict[str, Any]],
         weather: Weather conditions
         track_id: Track identifier
         num_simulations: Number of simulations per strategy
+        progress: Optional callback with (strategies done, total)
+        cancel_token: Optional token checked between simulations and laps
     
     Returns:
         Comparison results with analysis
     """
-    comparator = StrategyComparator(track_id)
-    result = comparator.compare_strategies(strategies, weather, num_simulations)
+    comparator = get_strategy_comparator(track_id)
+    result = comparator.compare_strategies(strategies, weather, num_simulations, progress, cancel_token)
     
     return {
         "strategies": [
@@ -230,6 +441,47 @@ def compare_strategies(strategies: List[Dict[str, Any]],
         "risk_analysis": result.risk_analysis
     }
 
+def compute_strategy_frontier(strategies: Optional[List[Dict[str, Any]]] = None,
+                              weather: str = "dry",
+                              track_id: str = "silverstone",
+                              num_simulations: int = 5,
+                              cancel_token: Optional[CancellationToken] = None,
+                              progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Compute the Pareto frontier of race time vs risk, with each member's time variance.
+    
+    Args:
+        strategies: Candidate strategies (defaults to a generated pit lap/compound grid)
+        weather: Weather conditions
+        track_id: Track identifier
+        num_simulations: Number of simulations per surviving candidate
+        cancel_token: Optional token checked between candidates, simulations and laps
+        progress: Optional callback with (candidates simulated, candidates left after pruning)
+    
+    Returns:
+        Columnar frontier sorted by total time, plus pruning statistics
+    """
+    if strategies is None:
+        strategies = generate_candidate_strategies(track_id)
+    
+    engine = StrategyFrontierEngine(track_id)
+    frontier = engine.compute_frontier(strategies, weather, num_simulations, cancel_token=cancel_token, progress=progress)
+    
+    return {
+        "frontier": {
+            "name": frontier.names,
+            "total_time": frontier.total_time,
+            "risk_score": frontier.risk_score,
+            "time_variance": frontier.time_variance
+        },
+        "strategies": frontier.strategies,
+        "stats": {
+            "candidates": frontier.candidates_considered,
+            "pruned": frontier.candidates_pruned,
+            "simulated": frontier.candidates_simulated
+        }
+    }
+
 def get_available_tracks() -> List[Dict[str, Any]]:
     """Get list of available tracks for frontend selection"""
     return track_db.get_track_list()
@@ -260,14 +512,24 @@ def get_track_details(track_id: str) -> Dict[str, Any]:
     }
 
 def generate_weather_forecast(track_id: str = "silverstone", 
-                            total_laps: int = 0) -> List[Dict[str, Any]]:
-    """Generate weather forecast for the race"""
+                            total_laps: int = 0,
+                            scenario: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Generate weather forecast for the race, or read a precomputed scenario by index.
+    
+    Scenarios span the track's race distance, so a scenario with any other
+    total_laps raises ValueError.
+    """
+    track = track_db.get_track(track_id)
     if total_laps == 0:
-        track = track_db.get_track(track_id)
         total_laps = track.total_laps
     
-    weather_simulator = WeatherSimulator()
-    forecast = weather_simulator.generate_weather_forecast(total_laps, track_id)
+    if scenario is not None:
+        if total_laps != track.total_laps:
+            raise ValueError(f"Scenarios cover {track.total_laps} laps at {track_id}, not {total_laps}")
+        forecast = weather_library.scenario(track_id, scenario)
+    else:
+        forecast, _ = forecast_weather(default_weather(), total_laps, track_id)
     
     return [
         {
@@ -283,6 +545,21 @@ def generate_weather_forecast(track_id: str = "silverstone",
         for i, weather in enumerate(forecast)
     ]
 
+def get_rain_probabilities(track_id: str = "silverstone") -> Dict[str, Any]:
+    """Get analytic per-lap rain probabilities from the track's Markov weather model"""
+    model = get_markov_model(track_id)
+    
+    return {
+        "track_id": track_id,
+        "total_laps": model.horizon,
+        "rain_before_lap": [round(model.probability_of_rain_before(lap), 4) for lap in range(1, model.horizon + 1)],
+        "condition_probabilities": {
+            condition: [round(p, 4) for p in model.state_distributions[:, code].tolist()]
+            for code, condition in enumerate(WEATHER_CONDITIONS)
+        },
+        "expected_rain_laps": round(model.expected_rain_laps(), 2)
+    }
+
 def get_sample_car_configs() -> List[Dict[str, Any]]:
     """Get sample car configurations for multi-car simulation"""
     return create_sample_car_configs()
@@ -0,0 +1,39 @@
+from typing import Any, Dict, List, Tuple
+from contextlib import contextmanager
+import threading
+import time
+
+class StartupReport:
+    """Records how long each module group took to import, for cold-start tuning"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at = None
+        self._entries: List[Tuple[str, float, bool]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str, lazy: bool = False):
+        """Time the imports in the with-block; lazy marks imports deferred past startup"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._entries.append((name, time.perf_counter() - start, lazy))
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = sorted(self._entries, key=lambda e: e[1], reverse=True)
+        return {
+            "startup_seconds": round(self.ready_at - self.started, 4) if self.ready_at else None,
+            "modules": [
+                {"module": name, "seconds": round(seconds, 4), "lazy": lazy}
+                for name, seconds, lazy in entries
+            ]
+        }
+
+startup_report = StartupReport()
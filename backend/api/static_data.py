@@ -0,0 +1,82 @@
+from typing import Any, Callable, Dict, Optional
+from dataclasses import dataclass
+import gzip
+import hashlib
+import os
+import threading
+from starlette.responses import Response
+from .serialization import encode_json, accepts_encoding, GZIP_LEVEL, MIN_COMPRESS_SIZE
+
+@dataclass(frozen=True)
+class StaticBody:
+    body: bytes
+    etag: str
+    gzipped: Optional[bytes] = None
+
+    @property
+    def gzip_etag(self) -> str:
+        # Strong ETags must differ between encodings of the same data
+        return self.etag[:-1] + '-gzip"'
+
+def make_static_body(payload: Any) -> StaticBody:
+    """Serialize payload once, with a strong ETag from the SHA-256 of the body"""
+    body = encode_json(payload)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0) if len(body) >= MIN_COMPRESS_SIZE else None
+    return StaticBody(body, etag, gzipped)
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """If-None-Match check using the weak comparison RFC 7232 requires for it"""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    candidates = {tag[2:] if tag.startswith("W/") else tag for tag in candidates}
+    return any(etag in candidates for etag in etags)
+
+class StaticDataStore:
+    """
+    Serialized bodies for reference data that only changes with a deploy.
+
+    Bodies are built once per key, either up front with preload() or on
+    first request, and served with an ETag and Cache-Control so browsers
+    and CDNs can reuse them or revalidate with a 304.
+    """
+
+    def __init__(self, max_age: Optional[int] = None):
+        self.max_age = int(os.getenv("STATIC_DATA_MAX_AGE", "3600")) if max_age is None else max_age
+        self._bodies: Dict[str, StaticBody] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, build: Callable[[], Any]) -> StaticBody:
+        entry = self._bodies.get(key)
+        if entry is None:
+            entry = make_static_body(build())
+            with self._lock:
+                entry = self._bodies.setdefault(key, entry)
+        return entry
+
+    def preload(self, builders: Dict[str, Callable[[], Any]]):
+        for key, build in builders.items():
+            self.get(key, build)
+
+    def response(self, key: str, build: Callable[[], Any], if_none_match: Optional[str] = None,
+                 accept_encoding: Optional[str] = None) -> Response:
+        entry = self.get(key, build)
+        headers = {
+            "Cache-Control": f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age * 24}",
+            "Vary": "Accept-Encoding"
+        }
+        use_gzip = entry.gzipped is not None and accepts_encoding(accept_encoding, "gzip")
+        headers["ETag"] = entry.gzip_etag if use_gzip else entry.etag
+
+        # Either encoding's tag proves the client holds the current data
+        if etag_matches(if_none_match, entry.etag, entry.gzip_etag):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry.gzipped, media_type="application/json", headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+static_data = StaticDataStore()
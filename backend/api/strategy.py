@@ -1,23 +1,75 @@
+import asyncio
 import os
 import random
-from typing import Optional
-import google.generativeai as genai
+from typing import Dict, List, Optional, Tuple
 # from dotenv import load_dotenv
 import json
+import logging
 import re
+from .cache import TTLCache, SingleFlight
+from .startup import startup_report
+from .llm_client import LLMClient, CircuitBreaker, hedge
+from .local_recommender import recommend_strategy
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 # load_dotenv()
 
-# Initialize Gemini client
+# Gemini client, built on first use so cold starts skip importing the SDK
 api_key = os.getenv("GEMINI_API_KEY")
-genai_client = genai.GenerativeModel('gemini-1.5-flash') if api_key else None
-if api_key:
-    genai.configure(api_key=api_key)
+genai_client = None
+
+def get_genai_client():
+    """Get the Gemini model client, importing and configuring the SDK on first use"""
+    global genai_client
+    if genai_client is None and api_key:
+        with startup_report.measure("google.generativeai", lazy=True):
+            import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        genai_client = genai.GenerativeModel('gemini-1.5-flash')
+    return genai_client
+
+async def _gemini_transport(prompt: str) -> str:
+    response = await get_genai_client().generate_content_async(prompt)
+    return response.text
+
+# Bounded, deadline-limited access to Gemini that stops calling it while it is failing
+llm_client = LLMClient(
+    _gemini_transport,
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+    timeout=float(os.getenv("LLM_TIMEOUT", "8")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30"))
+    )
+)
+# Seconds to wait for the model before answering with the local recommendation
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "2.5"))
+
+RECOMMENDATION_FIELDS = ["pit_stop_timing", "tire_compound_strategy", "driver_approach_adjustments", "potential_time_savings_or_risks"]
+
+# Recommendation cache keyed by normalized scenario text
+recommendation_cache = TTLCache(
+    maxsize=int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RECOMMENDATION_CACHE_TTL", "600"))
+)
+# Concurrent identical scenarios share one in-flight model call
+recommendation_flight = SingleFlight()
+
+def normalize_scenario(scenario: str) -> str:
+    """Normalize scenario text so trivially different requests share a cache entry"""
+    return " ".join(scenario.lower().split())
 
 async def get_strategy_recommendation(scenario: str) -> dict:
     """
-    Get AI-generated strategy recommendations using OpenAI GPT-4o.
+    Get AI-generated strategy recommendations using Google Gemini.
+    
+    Recommendations are cached by normalized scenario, and concurrent
+    identical scenarios share a single model call. If the model has not
+    answered within LLM_HEDGE_AFTER seconds the local recommendation is
+    returned, while the model call finishes in the background and fills
+    the cache for the next request.
     
     Args:
         scenario: Description of the race scenario and current strategy
@@ -27,9 +79,31 @@ async def get_strategy_recommendation(scenario: str) -> dict:
     """
     
     # Check if Gemini API key is available
-    if not genai_client:
-        return get_mock_recommendation(scenario)
+    if not get_genai_client():
+        return get_local_recommendation(scenario)
+    
+    key = normalize_scenario(scenario)
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     
+    recommendation = await hedge(
+        lambda: recommendation_flight.do(key, lambda: _fetch_recommendation(key, scenario)),
+        lambda: get_local_recommendation(scenario),
+        LLM_HEDGE_AFTER
+    )
+    # Callers get their own copy so cached entries are never mutated
+    return dict(recommendation)
+
+async def _fetch_recommendation(key: str, scenario: str) -> dict:
+    """Call the model and cache the result if it parsed cleanly"""
+    recommendation, cacheable = await _request_recommendation(scenario)
+    if cacheable:
+        recommendation_cache.set(key, recommendation)
+    return recommendation
+
+async def _request_recommendation(scenario: str) -> Tuple[dict, bool]:
+    """Call the model, returning the recommendation and whether it is safe to cache"""
     try:
         # Create the prompt for the AI
         prompt = f"""You are an expert Formula 1 race strategist. Given the following race scenario, provide a concise and actionable strategy recommendation.
@@ -50,11 +124,10 @@ IMPORTANT:
 - No explanations before or after
 - No code blocks
 - Ensure valid JSON syntax"""
-        print("Gemini prompt:\n", prompt)
+        logger.debug("Gemini prompt", extra={"prompt": prompt})
         # Call Gemini API
-        response = await genai_client.generate_content_async(prompt)
-        response_text = response.text.strip()
-        print("Gemini raw response:\n", response_text)
+        response_text = (await llm_client.generate(prompt)).strip()
+        logger.debug("Gemini raw response", extra={"response": response_text})
         # Clean the response text
         response_text_clean = response_text.strip()
         
@@ -68,21 +141,18 @@ IMPORTANT:
         if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
             response_text_clean = response_text_clean[start_idx:end_idx+1]
         
-        print("Cleaned Gemini response:\n", response_text_clean)
-        
+        cacheable = False
         try:
             recommendation_json = json.loads(response_text_clean)
+            cacheable = isinstance(recommendation_json, dict)
             
             # Validate that all required fields are present
-            required_fields = ["pit_stop_timing", "tire_compound_strategy", "driver_approach_adjustments", "potential_time_savings_or_risks"]
-            for field in required_fields:
+            for field in RECOMMENDATION_FIELDS:
                 if field not in recommendation_json:
                     recommendation_json[field] = ""
                     
         except json.JSONDecodeError as e:
-            print("JSON decode error:", e)
-            print("Raw response was:", response_text)
-            print("Cleaned response was:", response_text_clean)
+            logger.warning("Could not parse Gemini response as JSON: %s", e, extra={"response": response_text})
             
             # If JSON parsing fails, try to extract the recommendation text and structure it
             if response_text_clean and len(response_text_clean) > 10:
@@ -103,23 +173,147 @@ IMPORTANT:
                 }
         # Final safety check - ensure we NEVER return a string
         if not isinstance(recommendation_json, dict):
-            print(f"CRITICAL: recommendation_json is not a dict, got {type(recommendation_json)}: {recommendation_json}")
-            return get_mock_recommendation(scenario)
+            logger.error("Gemini response is not a JSON object", extra={"response_type": type(recommendation_json).__name__})
+            return get_local_recommendation(scenario), False
         
-        print(f"Successfully parsed recommendation: {recommendation_json}")
-        return recommendation_json
+        return recommendation_json, cacheable
         
     except Exception as e:
-        print(f"Gemini API error: {e}")
-        return get_mock_recommendation(scenario)
+        logger.warning("Gemini API error: %s", e)
+        return get_local_recommendation(scenario), False
     
     # Final absolute safety check - this should never happen
     if not isinstance(recommendation_json, dict):
-        print(f"ABSOLUTE CRITICAL ERROR: recommendation_json is not a dict: {type(recommendation_json)}")
-        print(f"This should never happen! Value: {recommendation_json}")
-        return get_mock_recommendation(scenario)
+        logger.error("Recommendation is not a dict", extra={"response_type": type(recommendation_json).__name__})
+        return get_local_recommendation(scenario), False
+    
+    return recommendation_json, False
+
+async def get_strategy_recommendations(scenarios: List[str]) -> List[dict]:
+    """
+    Get strategy recommendations for many scenarios at once.
+    
+    Cached scenarios are answered immediately, and scenarios already being
+    fetched by get_strategy_recommendation wait for that call. The remaining
+    distinct scenarios are sent to Gemini in a single batched prompt. Both
+    are hedged like the single path: after LLM_HEDGE_AFTER seconds, or for
+    scenarios the model does not answer, the local recommendation is used
+    while the model call finishes in the background and fills the cache.
+    
+    Args:
+        scenarios: Race scenario descriptions
+    
+    Returns:
+        One recommendation per scenario, in request order
+    """
+    if not get_genai_client():
+        return [get_local_recommendation(scenario) for scenario in scenarios]
+    
+    keys = [normalize_scenario(scenario) for scenario in scenarios]
+    results: Dict[str, dict] = {}
+    misses: Dict[str, str] = {}
+    for key, scenario in zip(keys, scenarios):
+        if key in results or key in misses:
+            continue
+        cached = recommendation_cache.get(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            misses[key] = scenario
+    
+    if misses:
+        in_flight = {key: scenario for key, scenario in misses.items() if key in recommendation_flight}
+        batch = {key: scenario for key, scenario in misses.items() if key not in in_flight}
+        
+        async def join_in_flight() -> Dict[str, dict]:
+            recommendations = await asyncio.gather(*(get_strategy_recommendation(s) for s in in_flight.values()))
+            return dict(zip(in_flight, recommendations))
+        
+        async def request_batch() -> Dict[str, dict]:
+            if not batch:
+                return {}
+            return await hedge(lambda: _request_batch(batch), dict, LLM_HEDGE_AFTER)
+        
+        for answered in await asyncio.gather(join_in_flight(), request_batch()):
+            results.update(answered)
+    
+    return [
+        dict(results[key]) if key in results else get_local_recommendation(scenario)
+        for key, scenario in zip(keys, scenarios)
+    ]
+
+async def _request_batch(misses: Dict[str, str]) -> Dict[str, dict]:
+    """Ask the model about several scenarios in one call and cache what parses"""
+    ids = {f"s{i}": key for i, key in enumerate(misses)}
+    prompt = build_batch_prompt({item_id: misses[key] for item_id, key in ids.items()})
+    try:
+        response_text = await llm_client.generate(prompt)
+    except Exception as e:
+        logger.warning("Gemini batch error: %s", e, extra={"batch_size": len(misses)})
+        return {}
+    
+    recommendations = {}
+    for item_id, recommendation in parse_batch_response(response_text).items():
+        if item_id in ids:
+            recommendation_cache.set(ids[item_id], recommendation)
+            recommendations[ids[item_id]] = recommendation
+    return recommendations
+
+def build_batch_prompt(scenarios: Dict[str, str]) -> str:
+    """Build one prompt asking for a recommendation per scenario id"""
+    listing = "\n".join(f"- id: {item_id}\n  scenario: {scenario}" for item_id, scenario in scenarios.items())
+    return f"""You are an expert Formula 1 race strategist. For each of the following race scenarios, provide a concise and actionable strategy recommendation.
+
+Race Scenarios:
+{listing}
+
+Respond ONLY with a valid JSON array containing one object per scenario, with these exact fields:
+[
+  {{
+    "id": "The scenario id",
+    "pit_stop_timing": "Your recommendation for pit stop timing",
+    "tire_compound_strategy": "Your recommendation for tire compound selection",
+    "driver_approach_adjustments": "Your recommendation for driver style changes",
+    "potential_time_savings_or_risks": "Potential time savings or risks of this strategy"
+  }}
+]
+
+IMPORTANT: 
+- Return ONLY the JSON array
+- No markdown formatting
+- No explanations before or after
+- No code blocks
+- Ensure valid JSON syntax"""
+
+def parse_batch_response(response_text: str) -> Dict[str, dict]:
+    """Parse a batched model response into recommendations keyed by scenario id"""
+    text = re.sub(r'^```[a-zA-Z]*\n|```$', '', response_text.strip(), flags=re.MULTILINE).strip()
+    start_idx = text.find('[')
+    end_idx = text.rfind(']')
+    if start_idx == -1 or end_idx <= start_idx:
+        return {}
     
-    return recommendation_json
+    try:
+        items = json.loads(text[start_idx:end_idx+1])
+    except json.JSONDecodeError as e:
+        logger.warning("Could not parse batched Gemini response as JSON: %s", e)
+        return {}
+    
+    recommendations = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or "id" not in item:
+            continue
+        recommendations[str(item["id"])] = {field: item.get(field, "") for field in RECOMMENDATION_FIELDS}
+    return recommendations
+
+def get_local_recommendation(scenario: str) -> dict:
+    """
+    Get a recommendation without calling the model.
+    
+    Scenarios that describe a concrete strategy are answered by the
+    simulation-based recommender; anything else gets a canned recommendation.
+    """
+    return recommend_strategy(scenario) or get_mock_recommendation(scenario)
 
 def get_mock_recommendation(scenario: str) -> dict:
     """
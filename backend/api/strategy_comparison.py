@@ -1,9 +1,16 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 import statistics
-from .multi_car_simulation import MultiCarSimulator
-from .weather_system import WeatherSimulator
+from .multi_car_simulation import get_multi_car_simulator
+from .weather_system import CONDITION_CODES, WeatherSimulator, default_weather, forecast_weather
+from .weather_markov import get_markov_model
 from .tracks import track_db
+from .track_profile import get_track_profile
+from .cancellation import CancellationToken
+from .parallel import ResultBuffer, RunStatus, draw_seeds, raise_for_failed_runs, run_monte_carlo
+
+SLICK_COMPOUNDS = {"Soft", "Medium", "Hard"}
 
 @dataclass
 class StrategyComparison:
@@ -18,6 +25,7 @@ class StrategyComparison:
     tire_wear_analysis: Dict[str, Any]
     weather_impact: Dict[str, Any]
     risk_score: float
+    time_variance: float = 0.0
 
 @dataclass
 class ComparisonResult:
@@ -28,21 +36,42 @@ class ComparisonResult:
     risk_analysis: Dict[str, Any]
 
 class StrategyComparator:
+    """
+    Compares strategies on one track.
+
+    Holds only read-only track setup and the shared stateless simulator, so
+    one comparator can serve concurrent comparisons (see
+    get_strategy_comparator). rng arguments default to the global random module.
+    """
+
     def __init__(self, track_id: str = "silverstone"):
         self.track = track_db.get_track(track_id)
-        self.simulator = MultiCarSimulator(track_id)
+        self.profile = get_track_profile(track_id)
+        self.simulator = get_multi_car_simulator(track_id)
         self.weather_simulator = WeatherSimulator()
+        # Forecasts evolve from the requested condition; unknown ones start dry
+        self.base_weather = {condition: default_weather(condition) for condition in CONDITION_CODES}
+        self.weather_model = get_markov_model(track_id)
         
     def compare_strategies(self, strategies: List[Dict[str, Any]], 
                           weather: str = "dry", 
-                          num_simulations: int = 5) -> ComparisonResult:
-        """Compare multiple strategies with multiple simulations"""
+                          num_simulations: int = 5,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          cancel_token: Optional[CancellationToken] = None,
+                          rng: Any = None) -> ComparisonResult:
+        """Compare multiple strategies with multiple simulations.
+        
+        progress, if given, is called with (strategies done, total) after each strategy.
+        cancel_token, if given, is checked between simulations and laps.
+        """
         
         comparison_results = []
         
         for strategy in strategies:
-            strategy_result = self._evaluate_strategy(strategy, weather, num_simulations)
+            strategy_result = self.evaluate_strategy(strategy, weather, num_simulations, cancel_token, rng)
             comparison_results.append(strategy_result)
+            if progress:
+                progress(len(comparison_results), len(strategies))
         
         # Find winner
         winner = min(comparison_results, key=lambda x: x.total_time)
@@ -64,51 +93,44 @@ class StrategyComparator:
             risk_analysis=risk_analysis
         )
     
-    def _evaluate_strategy(self, strategy: Dict[str, Any], weather: str, num_simulations: int) -> StrategyComparison:
-        """Evaluate a single strategy with multiple simulations"""
+    def _simulate_once(self, strategy: Dict[str, Any], weather: str,
+                       cancel_token: Any = None, rng: Any = None) -> List[Dict[str, Any]]:
+        """Run one single-car race with the strategy under a fresh per-lap forecast"""
+        weather_forecast, _ = forecast_weather(
+            self._base_weather(weather), self.profile.total_laps, self.profile.track_id, rng
+        )
         
-        simulation_results = []
+        # Create car config with this strategy
+        car_config = {
+            "car_id": "TEST",
+            "driver_name": "Test Driver",
+            "strategy": strategy
+        }
         
-        for _ in range(num_simulations):
-            # Generate weather forecast for this simulation
-            weather_forecast = self.weather_simulator.generate_weather_forecast(
-                self.track.total_laps, self.track.name.lower().replace(" ", "_")
-            )
-            
-            # Create car config with this strategy
-            car_config = {
-                "car_id": "TEST",
-                "driver_name": "Test Driver",
-                "strategy": strategy
-            }
-            
-            # Run simulation
-            race_results = self.simulator.simulate_race([car_config], weather)
-            
-            # Extract key metrics
-            total_time = race_results[-1]["cars"][0]["total_time"]
-            lap_times = [lap["cars"][0]["lap_time"] for lap in race_results]
-            
-            simulation_results.append({
-                "total_time": total_time,
-                "lap_times": lap_times,
-                "final_position": race_results[-1]["cars"][0]["position"]
-            })
+        return self.simulator.simulate_race([car_config], weather, weather_forecast, cancel_token=cancel_token, rng=rng)
+    
+    def _base_weather(self, weather: str) -> Any:
+        return self.base_weather.get(weather, self.base_weather["dry"])
+    
+    def evaluate_strategy(self, strategy: Dict[str, Any], weather: str, num_simulations: int,
+                           cancel_token: Optional[CancellationToken] = None,
+                           rng: Any = None) -> StrategyComparison:
+        """Evaluate a single strategy with multiple simulations"""
+        
+        total_times, avg_lap, best_lap = self._simulate_runs(strategy, weather, num_simulations, cancel_token, rng)
         
         # Calculate average metrics
-        avg_total_time = statistics.mean([r["total_time"] for r in simulation_results])
-        all_lap_times = [lap for sim in simulation_results for lap in sim["lap_times"]]
-        avg_lap = statistics.mean(all_lap_times)
-        best_lap = min(all_lap_times)
+        avg_total_time = statistics.mean(total_times)
         
         # Analyze tire wear
         tire_wear_analysis = self._analyze_tire_wear(strategy, weather)
         
         # Analyze weather impact
-        weather_impact = self._analyze_weather_impact(strategy, weather)
+        weather_impact = self._analyze_weather_impact(strategy, weather, rng)
         
         # Calculate risk score
-        risk_score = self._calculate_risk_score(strategy, simulation_results)
+        risk_score = self._calculate_risk_score(strategy, total_times)
+        time_variance = statistics.variance(total_times) if len(total_times) > 1 else 0.0
         
         return StrategyComparison(
             strategy_name=strategy.get("name", "Strategy"),
@@ -121,9 +143,27 @@ class StrategyComparator:
             average_lap=avg_lap,
             tire_wear_analysis=tire_wear_analysis,
             weather_impact=weather_impact,
-            risk_score=risk_score
+            risk_score=risk_score,
+            time_variance=time_variance
         )
     
+    def _simulate_runs(self, strategy: Dict[str, Any], weather: str, num_simulations: int,
+                       cancel_token: Optional[CancellationToken] = None,
+                       rng: Any = None) -> Tuple[List[float], float, float]:
+        """
+        Run the simulations; returns total times, average lap and best lap.
+        
+        Each run gets its own seed drawn from rng, so a seeded comparison
+        gives the same result in this process and on worker processes.
+        """
+        
+        def summarize(buffer: ResultBuffer, statuses: List[RunStatus]) -> Tuple[List[float], float, float]:
+            raise_for_failed_runs(statuses)
+            return buffer.total_time.tolist(), float(buffer.lap_time.mean()), float(buffer.lap_time.min())
+        
+        task = StrategyRuns(self.profile.track_id, strategy, weather, self.profile.total_laps)
+        return run_monte_carlo(task, draw_seeds(num_simulations, rng), summarize, cancel_token)
+    
     def _analyze_tire_wear(self, strategy: Dict[str, Any], weather: str) -> Dict[str, Any]:
         """Analyze tire wear characteristics of a strategy"""
         
@@ -134,9 +174,9 @@ class StrategyComparator:
         stint_lengths = []
         for i in range(len(pit_stops) + 1):
             if i == 0:
-                stint_lengths.append(pit_stops[0] if pit_stops else self.track.total_laps)
+                stint_lengths.append(pit_stops[0] if pit_stops else self.profile.total_laps)
             elif i == len(pit_stops):
-                stint_lengths.append(self.track.total_laps - pit_stops[-1])
+                stint_lengths.append(self.profile.total_laps - pit_stops[-1])
             else:
                 stint_lengths.append(pit_stops[i] - pit_stops[i-1])
         
@@ -144,7 +184,7 @@ class StrategyComparator:
         tire_analysis = {}
         for i, tire in enumerate(tires):
             if i < len(stint_lengths):
-                degradation = self.track.tire_degradation.get(tire, 1.0)
+                degradation = self.profile.degradation_for(tire)
                 wear_risk = "high" if degradation > 1.2 else "medium" if degradation > 1.0 else "low"
                 
                 tire_analysis[tire] = {
@@ -193,12 +233,12 @@ class StrategyComparator:
         else:
             return "low"
     
-    def _analyze_weather_impact(self, strategy: Dict[str, Any], weather: str) -> Dict[str, Any]:
+    def _analyze_weather_impact(self, strategy: Dict[str, Any], weather: str, rng: Any = None) -> Dict[str, Any]:
         """Analyze how weather affects the strategy"""
         
         # Get weather forecast
-        weather_forecast = self.weather_simulator.generate_weather_forecast(
-            self.track.total_laps, self.track.name.lower().replace(" ", "_")
+        weather_forecast, _ = forecast_weather(
+            self._base_weather(weather), self.profile.total_laps, self.profile.track_id, rng
         )
         
         # Count weather events during pit windows
@@ -226,18 +266,26 @@ class StrategyComparator:
         
         return {
             "weather_events_during_pits": weather_events_during_pits,
+            "rain_probability_before_pits": [
+                round(self.weather_model.probability_of_rain_before(lap), 3) for lap in pit_stops
+            ],
             "tire_suitability": weather_suitability,
             "weather_risk": "high" if weather_events_during_pits > 1 else "medium" if weather_events_during_pits > 0 else "low"
         }
     
-    def _calculate_risk_score(self, strategy: Dict[str, Any], simulation_results: List[Dict[str, Any]]) -> float:
+    def _calculate_risk_score(self, strategy: Dict[str, Any], total_times: List[float]) -> float:
         """Calculate overall risk score for a strategy"""
-        risk_score = 0.0
-        
         # Time consistency risk
-        total_times = [r["total_time"] for r in simulation_results]
         time_variance = statistics.variance(total_times) if len(total_times) > 1 else 0
-        risk_score += min(time_variance / 1000, 0.3)  # Cap at 30%
+        risk_score = min(time_variance / 1000, 0.3)  # Cap at 30%
+        
+        risk_score += self.calculate_structural_risk(strategy)
+        
+        return min(risk_score, 1.0)  # Cap at 100%
+    
+    def calculate_structural_risk(self, strategy: Dict[str, Any]) -> float:
+        """Calculate the part of the risk score that does not depend on simulation results"""
+        risk_score = 0.0
         
         # Tire wear risk
         tire_analysis = self._analyze_tire_wear(strategy, "dry")
@@ -257,7 +305,12 @@ class StrategyComparator:
         elif strategy["driver_style"] == "conservative":
             risk_score += 0.05
         
-        return min(risk_score, 1.0)  # Cap at 100%
+        # Rain risk: caught out on slicks before the first chance to react in the pits
+        if strategy["tires"] and strategy["tires"][0] in SLICK_COMPOUNDS:
+            first_pit = pit_stops[0] if pit_stops else self.profile.total_laps
+            risk_score += 0.2 * self.weather_model.probability_of_rain_before(first_pit)
+        
+        return risk_score
     
     def _analyze_key_differences(self, strategies: List[StrategyComparison]) -> List[Dict[str, Any]]:
         """Analyze key differences between strategies"""
@@ -345,6 +398,30 @@ class StrategyComparator:
         
         return risk_factors
 
+def get_strategy_comparator(track_id: str = "silverstone") -> StrategyComparator:
+    """Get the shared comparator for a track id or alias; safe to use from many threads"""
+    return _build_strategy_comparator(get_track_profile(track_id).track_id)
+
+@lru_cache(maxsize=None)
+def _build_strategy_comparator(track_id: str) -> StrategyComparator:
+    return StrategyComparator(track_id)
+
+@dataclass
+class StrategyRuns:
+    """Monte Carlo task for run_monte_carlo: one single-car race with the strategy per run"""
+    track_id: str
+    strategy: Dict[str, Any]
+    weather: str
+    num_laps: int
+
+    def chunk(self, indices: List[int]) -> "StrategyRuns":
+        # Every run needs the whole (small) task
+        return self
+
+    def run(self, buffer: ResultBuffer, index: int, rng: Any, cancel_token: Any):
+        race_results = get_strategy_comparator(self.track_id)._simulate_once(self.strategy, self.weather, cancel_token, rng)
+        buffer.record(index, [lap["cars"][0] for lap in race_results])
+
 def create_sample_strategies() -> List[Dict[str, Any]]:
     """Create sample strategies for comparison testing"""
     return [
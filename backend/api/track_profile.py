@@ -0,0 +1,63 @@
+from typing import Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from .tracks import track_db, DEFAULT_TRACK_ID
+from .weather_system import TIRE_COMPOUNDS, COMPOUND_INDEX, UNKNOWN_COMPOUND, WEATHER_CONDITIONS
+
+# Sector pace multipliers on top of the track weather multiplier, by condition
+CONDITION_PACE_FACTORS = {"dry": None, "intermediate": 1.05, "wet": 1.1}
+
+@dataclass(frozen=True)
+class TrackProfile:
+    """Immutable per-track physics quantities, derived once from TrackData"""
+    track_id: str  # canonical track_db id
+    name: str
+    total_laps: int
+    lap_record: float
+    sector_base_times: Tuple[float, ...]
+    sector_wear_factors: Tuple[float, ...]
+    sector_fuel_factors: Tuple[float, ...]
+    base_lap_time: float  # sum of sector base times
+    lap_wear_factor: float  # sum of sector tire wear factors
+    lap_fuel_factor: float  # sum of sector fuel consumption factors
+    degradation: Tuple[float, ...]  # by compound index, last entry for unknown compounds
+    weather_sensitivity: float
+    weather_multiplier: float  # 1 + 0.1 * weather_sensitivity
+    condition_pace: Tuple[float, ...]  # sector multiplier by condition code
+    overtaking_difficulty: float
+    overtaking_factor: float  # 1 - overtaking_difficulty
+
+    def degradation_for(self, compound: str) -> float:
+        """Tire degradation multiplier of a compound on this track"""
+        return self.degradation[COMPOUND_INDEX.get(compound, UNKNOWN_COMPOUND)]
+
+def get_track_profile(track_id: str = DEFAULT_TRACK_ID) -> TrackProfile:
+    """Get the cached profile for a track id or alias (unknown ids use the default track)"""
+    return _build_track_profile(track_db.resolve_track_id(track_id) or DEFAULT_TRACK_ID)
+
+@lru_cache(maxsize=None)
+def _build_track_profile(track_id: str) -> TrackProfile:
+    track = track_db.get_track(track_id)
+    weather_multiplier = 1.0 + (0.1 * track.weather_sensitivity)
+
+    return TrackProfile(
+        track_id=track_id,
+        name=track.name,
+        total_laps=track.total_laps,
+        lap_record=track.lap_record,
+        sector_base_times=tuple(s.base_time for s in track.sectors),
+        sector_wear_factors=tuple(s.tire_wear_factor for s in track.sectors),
+        sector_fuel_factors=tuple(s.fuel_consumption_factor for s in track.sectors),
+        base_lap_time=sum(s.base_time for s in track.sectors),
+        lap_wear_factor=sum(s.tire_wear_factor for s in track.sectors),
+        lap_fuel_factor=sum(s.fuel_consumption_factor for s in track.sectors),
+        degradation=tuple(track.tire_degradation.get(c, 1.0) for c in TIRE_COMPOUNDS) + (1.0,),
+        weather_sensitivity=track.weather_sensitivity,
+        weather_multiplier=weather_multiplier,
+        condition_pace=tuple(
+            1.0 if CONDITION_PACE_FACTORS[c] is None else weather_multiplier * CONDITION_PACE_FACTORS[c]
+            for c in WEATHER_CONDITIONS
+        ),
+        overtaking_difficulty=track.overtaking_difficulty,
+        overtaking_factor=1 - track.overtaking_difficulty
+    )
@@ -1,6 +1,25 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
+from collections import OrderedDict
+import hashlib
 import json
+import os
+import sys
+import threading
+import time
+
+# Track catalog: one compact JSON record per line, plus a derived id/alias index
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(__file__), "data")
+CATALOG_FILE = "tracks.jsonl"
+INDEX_FILE = "tracks.index.json"
+INDEX_VERSION = 3
+DEFAULT_TRACK_ID = "silverstone"
+# How a loaded index is checked against its catalog: "stat" hashes the catalog
+# only when its size or mtime changed since indexing; "off" trusts the index,
+# for deploy bundles whose index is rebuilt at build time
+TRACK_INDEX_CHECK = os.getenv("TRACK_INDEX_CHECK", "stat")
+# Catalog changes this close to indexing may share its mtime, so they are hashed
+MTIME_RESOLUTION_NS = 2_000_000_000
 
 @dataclass
 class TrackSector:
@@ -22,122 +41,213 @@ class TrackData:
     weather_sensitivity: float  # how much weather affects this track
     overtaking_difficulty: float  # 0-1 scale, higher = harder to overtake
 
+# Fields kept in the index so track listings never touch the catalog records
+LISTING_FIELDS = ("name", "country", "circuit_length", "total_laps", "lap_record")
+
+def normalize_track_key(key: str) -> str:
+    """Normalize a track id, alias or name for index lookups"""
+    return "_".join(key.strip().lower().replace("-", " ").split())
+
+def track_from_record(record: Dict[str, Any]) -> TrackData:
+    """Build TrackData from a catalog record"""
+    return TrackData(
+        name=record["name"],
+        country=record["country"],
+        circuit_length=record["circuit_length"],
+        total_laps=record["total_laps"],
+        lap_record=record["lap_record"],
+        sectors=[TrackSector(*sector) for sector in record["sectors"]],
+        tire_degradation=record["tire_degradation"],
+        weather_sensitivity=record["weather_sensitivity"],
+        overtaking_difficulty=record["overtaking_difficulty"]
+    )
+
+def track_to_record(track_id: str, track: TrackData, aliases: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Convert TrackData to a compact catalog record"""
+    return {
+        "id": track_id,
+        "aliases": aliases or [],
+        "name": track.name,
+        "country": track.country,
+        "circuit_length": track.circuit_length,
+        "total_laps": track.total_laps,
+        "lap_record": track.lap_record,
+        "sectors": [
+            [s.name, s.length, s.base_time, s.tire_wear_factor, s.fuel_consumption_factor]
+            for s in track.sectors
+        ],
+        "tire_degradation": track.tire_degradation,
+        "weather_sensitivity": track.weather_sensitivity,
+        "overtaking_difficulty": track.overtaking_difficulty
+    }
+
+def build_track_index(catalog_path: str) -> Dict[str, Any]:
+    """Scan a catalog file and index record offsets, aliases and listing fields"""
+    tracks: Dict[str, Any] = {}
+    aliases: Dict[str, str] = {}
+    offset = 0
+    digest = hashlib.sha256()
+    stat = os.stat(catalog_path)
+    indexed_at = time.time_ns()
+
+    with open(catalog_path, "rb") as f:
+        for line in f:
+            digest.update(line)
+            if line.strip():
+                record = json.loads(line)
+                track_id = record["id"]
+                entry = {"offset": offset, "length": len(line)}
+                entry.update({field: record[field] for field in LISTING_FIELDS})
+                tracks[track_id] = entry
+                for key in [track_id, record["name"], *record.get("aliases", [])]:
+                    aliases.setdefault(normalize_track_key(key), track_id)
+            offset += len(line)
+
+    return {
+        "version": INDEX_VERSION,
+        "catalog_sha256": digest.hexdigest(),
+        "catalog_size": stat.st_size,
+        "catalog_mtime_ns": stat.st_mtime_ns,
+        "indexed_at_ns": indexed_at,
+        "tracks": tracks,
+        "aliases": aliases
+    }
+
+def catalog_digest(catalog_path: str) -> str:
+    """SHA-256 of a catalog file, which its index records to detect edits"""
+    with open(catalog_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def index_is_current(index: Dict[str, Any], catalog_path: str) -> bool:
+    """
+    Check an index against its catalog without reading the catalog when possible.
+
+    Unchanged size and mtime are trusted unless the catalog was written within
+    MTIME_RESOLUTION_NS of indexing, where an edit could keep the mtime.
+    Anything else (checkouts and deploy bundles reset mtimes) falls back to
+    comparing the content hash.
+    """
+    if index.get("version") != INDEX_VERSION:
+        return False
+    if TRACK_INDEX_CHECK == "off":
+        return True
+    stat = os.stat(catalog_path)
+    if (stat.st_size == index.get("catalog_size") and stat.st_mtime_ns == index.get("catalog_mtime_ns")
+            and stat.st_mtime_ns + MTIME_RESOLUTION_NS <= index.get("indexed_at_ns", 0)):
+        return True
+    return index.get("catalog_sha256") == catalog_digest(catalog_path)
+
+def write_track_catalog(tracks: Dict[str, TrackData], directory: str,
+                        aliases: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """Write tracks to a catalog file in directory and rebuild its index"""
+    aliases = aliases or {}
+    os.makedirs(directory, exist_ok=True)
+    catalog_path = os.path.join(directory, CATALOG_FILE)
+
+    with open(catalog_path, "w", encoding="utf-8") as f:
+        for track_id, track in tracks.items():
+            record = track_to_record(track_id, track, aliases.get(track_id))
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    return write_track_index(directory)
+
+def write_track_index(directory: str) -> Dict[str, Any]:
+    """Rebuild and save the index of a catalog directory"""
+    index = build_track_index(os.path.join(directory, CATALOG_FILE))
+    with open(os.path.join(directory, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    return index
+
 class TrackDatabase:
-    def __init__(self):
-        self.tracks = self._initialize_tracks()
-    
-    def _initialize_tracks(self) -> Dict[str, TrackData]:
-        """Initialize with real F1 track data"""
-        tracks = {}
-        
-        # Monaco - High downforce, low degradation
-        tracks["monaco"] = TrackData(
-            name="Circuit de Monaco",
-            country="Monaco",
-            circuit_length=3.337,
-            total_laps=78,
-            lap_record=71.381,  # Max Verstappen 2021
-            sectors=[
-                TrackSector("Sector 1", 0.35, 25.0, 0.8, 0.9),  # Low speed, low wear
-                TrackSector("Sector 2", 0.40, 28.5, 1.2, 1.1),  # Medium speed, medium wear
-                TrackSector("Sector 3", 0.25, 17.9, 0.9, 0.8)   # High speed, low wear
-            ],
-            tire_degradation={"Soft": 0.7, "Medium": 0.8, "Hard": 0.9, "Intermediate": 1.0, "Wet": 1.1},
-            weather_sensitivity=0.3,  # Low sensitivity due to street circuit
-            overtaking_difficulty=0.9  # Very difficult to overtake
-        )
-        
-        # Silverstone - Medium downforce, medium degradation
-        tracks["silverstone"] = TrackData(
-            name="Silverstone Circuit",
-            country="Great Britain",
-            circuit_length=5.891,
-            total_laps=52,
-            lap_record=78.871,  # Max Verstappen 2020
-            sectors=[
-                TrackSector("Sector 1", 0.33, 26.0, 1.1, 1.0),  # High speed corners
-                TrackSector("Sector 2", 0.34, 27.5, 1.3, 1.2),  # Medium speed, high wear
-                TrackSector("Sector 3", 0.33, 25.4, 1.0, 0.9)   # High speed, medium wear
-            ],
-            tire_degradation={"Soft": 1.0, "Medium": 1.1, "Hard": 1.2, "Intermediate": 1.0, "Wet": 1.2},
-            weather_sensitivity=0.7,  # Medium sensitivity
-            overtaking_difficulty=0.4  # Moderate overtaking opportunities
-        )
-        
-        # Spa - High speed, high degradation
-        tracks["spa"] = TrackData(
-            name="Circuit de Spa-Francorchamps",
-            country="Belgium",
-            circuit_length=7.004,
-            total_laps=44,
-            lap_record=103.588,  # Valtteri Bottas 2018
-            sectors=[
-                TrackSector("Sector 1", 0.40, 41.0, 1.4, 1.3),  # High speed, high wear
-                TrackSector("Sector 2", 0.35, 36.0, 1.2, 1.1),  # Medium speed, medium wear
-                TrackSector("Sector 3", 0.25, 26.6, 1.0, 0.9)   # Low speed, low wear
-            ],
-            tire_degradation={"Soft": 1.3, "Medium": 1.4, "Hard": 1.5, "Intermediate": 1.1, "Wet": 1.3},
-            weather_sensitivity=0.8,  # High sensitivity due to elevation changes
-            overtaking_difficulty=0.3  # Good overtaking opportunities
-        )
-        
-        # Monza - Low downforce, low degradation
-        tracks["monza"] = TrackData(
-            name="Autodromo Nazionale di Monza",
-            country="Italy",
-            circuit_length=5.793,
-            total_laps=53,
-            lap_record=80.872,  # Kimi Räikkönen 2018
-            sectors=[
-                TrackSector("Sector 1", 0.30, 24.0, 0.7, 0.8),  # High speed, low wear
-                TrackSector("Sector 2", 0.40, 32.0, 0.8, 0.9),  # Medium speed, low wear
-                TrackSector("Sector 3", 0.30, 24.9, 0.6, 0.7)   # High speed, very low wear
-            ],
-            tire_degradation={"Soft": 0.6, "Medium": 0.7, "Hard": 0.8, "Intermediate": 1.0, "Wet": 1.1},
-            weather_sensitivity=0.5,  # Medium sensitivity
-            overtaking_difficulty=0.2  # Easy overtaking
-        )
-        
-        # Suzuka - Technical, medium degradation
-        tracks["suzuka"] = TrackData(
-            name="Suzuka International Racing Course",
-            country="Japan",
-            circuit_length=5.807,
-            total_laps=53,
-            lap_record=81.581,  # Lewis Hamilton 2019
-            sectors=[
-                TrackSector("Sector 1", 0.35, 28.5, 1.1, 1.0),  # Technical section
-                TrackSector("Sector 2", 0.30, 24.5, 1.2, 1.1),  # High speed section
-                TrackSector("Sector 3", 0.35, 28.6, 1.0, 0.9)   # Technical section
-            ],
-            tire_degradation={"Soft": 1.1, "Medium": 1.2, "Hard": 1.3, "Intermediate": 1.0, "Wet": 1.2},
-            weather_sensitivity=0.6,  # Medium sensitivity
-            overtaking_difficulty=0.5  # Moderate overtaking
-        )
-        
-        return tracks
-    
+    """Track catalog loaded lazily from disk.
+
+    Construction does no I/O. The small id/alias index is read on first access,
+    and individual track records are parsed on demand and kept in an LRU cache,
+    so import time and memory do not grow with the catalog size.
+    """
+
+    def __init__(self, catalog_dir: Optional[str] = None, cache_size: Optional[int] = None):
+        self.catalog_dir = catalog_dir or os.getenv("TRACK_CATALOG_DIR", DEFAULT_CATALOG_DIR)
+        self.cache_size = cache_size or int(os.getenv("TRACK_CACHE_SIZE", "32"))
+        self._index: Optional[Dict[str, Any]] = None
+        self._cache: "OrderedDict[str, TrackData]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def catalog_path(self) -> str:
+        return os.path.join(self.catalog_dir, CATALOG_FILE)
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Load the index, rebuilding it in memory if missing or stale"""
+        if self._index is not None:
+            return self._index
+
+        with self._lock:
+            if self._index is None:
+                index = None
+                index_path = os.path.join(self.catalog_dir, INDEX_FILE)
+                if os.path.exists(index_path):
+                    with open(index_path, encoding="utf-8") as f:
+                        index = json.load(f)
+                    if not index_is_current(index, self.catalog_path):
+                        index = None
+                self._index = index or build_track_index(self.catalog_path)
+
+        return self._index
+
+    def resolve_track_id(self, track_id: str) -> Optional[str]:
+        """Get the canonical id for a track id, alias or name, or None if unknown"""
+        return self._load_index()["aliases"].get(normalize_track_key(track_id))
+
+    def has_track(self, track_id: str) -> bool:
+        """Check whether a track id or alias exists in the catalog"""
+        return self.resolve_track_id(track_id) is not None
+
+    def track_ids(self) -> List[str]:
+        """Get all canonical track ids without loading any track"""
+        return list(self._load_index()["tracks"])
+
+    def _read_track(self, track_id: str) -> TrackData:
+        """Read and parse a single catalog record"""
+        entry = self._load_index()["tracks"][track_id]
+        with open(self.catalog_path, "rb") as f:
+            f.seek(entry["offset"])
+            return track_from_record(json.loads(f.read(entry["length"])))
+
     def get_track(self, track_id: str) -> TrackData:
         """Get track data by ID"""
-        return self.tracks.get(track_id, self.tracks["silverstone"])
-    
+        canonical_id = self.resolve_track_id(track_id) or DEFAULT_TRACK_ID
+
+        with self._lock:
+            track = self._cache.get(canonical_id)
+            if track is not None:
+                self._cache.move_to_end(canonical_id)
+                return track
+
+        track = self._read_track(canonical_id)
+        with self._lock:
+            self._cache[canonical_id] = track
+            self._cache.move_to_end(canonical_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return track
+
     def get_all_tracks(self) -> Dict[str, TrackData]:
-        """Get all available tracks"""
-        return self.tracks
-    
+        """Get all available tracks (loads every record; prefer track_ids/get_track_list)"""
+        return {track_id: self.get_track(track_id) for track_id in self.track_ids()}
+
     def get_track_list(self) -> List[Dict[str, Any]]:
         """Get list of tracks for frontend selection"""
         return [
-            {
-                "id": track_id,
-                "name": track.name,
-                "country": track.country,
-                "circuit_length": track.circuit_length,
-                "total_laps": track.total_laps,
-                "lap_record": track.lap_record
-            }
-            for track_id, track in self.tracks.items()
+            {"id": track_id, **{field: entry[field] for field in LISTING_FIELDS}}
+            for track_id, entry in self._load_index()["tracks"].items()
         ]
 
 # Global instance
-track_db = TrackDatabase() 
\ No newline at end of file
+track_db = TrackDatabase()
+
+if __name__ == "__main__":
+    # Rebuild the on-disk index: python -m api.tracks [catalog_dir]
+    directory = sys.argv[1] if len(sys.argv) > 1 else track_db.catalog_dir
+    index = write_track_index(directory)
+    print(f"Indexed {len(index['tracks'])} tracks, {len(index['aliases'])} keys")
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Sequence
+import os
+import tempfile
+import threading
+import numpy as np
+from .tracks import track_db
+from .weather_system import WeatherSimulator, WeatherEnsemble, WeatherCondition
+
+# Bump when the weather model or file layout changes so stale files are ignored
+LIBRARY_VERSION = 1
+DEFAULT_NUM_SCENARIOS = 1000
+DEFAULT_SEED = 2024
+
+# Field order of the first axis in the on-disk array
+LIBRARY_FIELDS = (
+    "temperature", "humidity", "wind_speed", "rain_probability",
+    "track_temperature", "grip_level", "condition"
+)
+
+class WeatherScenarioLibrary:
+    """Precomputed weather scenarios per track, stored as memory-mapped .npy files.
+
+    Each file holds a float64 array of shape (fields, scenarios, laps). Files are
+    written once and opened read-only with mmap, so worker processes on the same
+    host share the pages and sample identical scenarios by index.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 num_scenarios: int = DEFAULT_NUM_SCENARIOS,
+                 seed: int = DEFAULT_SEED):
+        self.directory = directory or os.getenv(
+            "WEATHER_LIBRARY_DIR", os.path.join(tempfile.gettempdir(), "f1-weather-library")
+        )
+        self.num_scenarios = num_scenarios
+        self.seed = seed
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _resolve_track_id(self, track_id: str) -> str:
+        """Map unknown track ids to the same default track as track_db"""
+        return track_db.resolve_track_id(track_id) or "silverstone"
+
+    def path(self, track_id: str) -> str:
+        """File path of a track's scenario library"""
+        track_id = self._resolve_track_id(track_id)
+        filename = f"{track_id}-v{LIBRARY_VERSION}-s{self.seed}-n{self.num_scenarios}.npy"
+        return os.path.join(self.directory, filename)
+
+    def build(self, track_id: str) -> str:
+        """Generate and write the scenario library for a track"""
+        track_id = self._resolve_track_id(track_id)
+        track = track_db.get_track(track_id)
+        ensemble = WeatherSimulator().generate_weather_ensemble(
+            self.num_scenarios, track.total_laps, track_id, seed=self.seed
+        )
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(track_id)
+        # Write to a private temp file and rename, so concurrent builders never expose a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".npy.tmp")
+        os.close(fd)
+        try:
+            data = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float64,
+                shape=(len(LIBRARY_FIELDS), self.num_scenarios, track.total_laps)
+            )
+            for i, field in enumerate(LIBRARY_FIELDS):
+                data[i] = getattr(ensemble, field)
+            data.flush()
+            del data
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return path
+
+    def load(self, track_id: str) -> np.ndarray:
+        """Open a track's library read-only, building it on first use"""
+        track_id = self._resolve_track_id(track_id)
+        data = self._arrays.get(track_id)
+        if data is not None:
+            return data
+
+        with self._lock:
+            if track_id not in self._arrays:
+                path = self.path(track_id)
+                data = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+                expected_shape = (len(LIBRARY_FIELDS), self.num_scenarios, track_db.get_track(track_id).total_laps)
+                if data is None or data.shape != expected_shape:
+                    data = np.load(self.build(track_id), mmap_mode="r")
+                self._arrays[track_id] = data
+
+        return self._arrays[track_id]
+
+    def build_all(self) -> List[str]:
+        """Build libraries for every track in track_db"""
+        return [self.build(track_id) for track_id in track_db.track_ids()]
+
+    def sample(self, track_id: str, indices: Sequence[int]) -> WeatherEnsemble:
+        """Get the scenarios at the given indices (wrapping around the library size)"""
+        data = self.load(track_id)
+        indices = np.asarray(indices, dtype=np.int64) % self.num_scenarios
+        fields = {field: data[i, indices] for i, field in enumerate(LIBRARY_FIELDS)}
+        fields["condition"] = fields["condition"].astype(np.int8)
+        return WeatherEnsemble(**fields)
+
+    def scenario(self, track_id: str, index: int) -> List[WeatherCondition]:
+        """Get a single scenario as a per-lap forecast"""
+        return self.sample(track_id, [index]).scenario(0)
+
+    def sample_indices(self, count: int, seed: int) -> np.ndarray:
+        """Reproducible scenario indices, identical across workers for the same seed"""
+        return np.random.default_rng(seed).integers(0, self.num_scenarios, size=count)
+
+# Global instance
+weather_library = WeatherScenarioLibrary()
@@ -0,0 +1,108 @@
+from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from .track_profile import get_track_profile
+from .weather_system import (
+    TRACK_WEATHER_PATTERNS, DEFAULT_WEATHER_PATTERN, WEATHER_CONDITIONS, CONDITION_CODES
+)
+
+DRY = CONDITION_CODES["dry"]
+INTERMEDIATE = CONDITION_CODES["intermediate"]
+WET = CONDITION_CODES["wet"]
+
+# Share of new rain that starts as a light shower rather than a downpour
+LIGHT_RAIN_SHARE = 0.6
+
+# Per-lap transitions out of the rain states, shared by all tracks
+INTERMEDIATE_TO_DRY = 0.10
+INTERMEDIATE_TO_WET = 0.08
+WET_TO_INTERMEDIATE = 0.12
+
+@dataclass(frozen=True)
+class MarkovWeatherModel:
+    """Lap-by-lap dry/intermediate/wet Markov chain for one track.
+
+    State distributions and rain probabilities are precomputed for every lap up
+    to the horizon, so queries are array lookups. All queries assume a dry start.
+    """
+    track_id: str
+    transition: np.ndarray  # (3, 3), rows sum to 1, indexed by CONDITION_CODES
+    horizon: int
+    state_distributions: np.ndarray  # (horizon, 3), P(state at lap n + 1)
+    rain_by_lap: np.ndarray  # (horizon + 1,), P(any non-dry lap within laps 1..n)
+
+    def state_distribution(self, lap: int) -> np.ndarray:
+        """Probability of each condition at the given lap"""
+        return self.state_distributions[min(max(lap, 1), self.horizon) - 1]
+
+    def probability_of_rain_before(self, lap: int) -> float:
+        """Probability that any lap before the given lap is intermediate or wet"""
+        return float(self.rain_by_lap[min(max(lap - 1, 0), self.horizon)])
+
+    def expected_rain_laps(self, start_lap: int = 1, end_lap: Optional[int] = None) -> float:
+        """Expected number of non-dry laps in [start_lap, end_lap]"""
+        end_lap = min(end_lap or self.horizon, self.horizon)
+        window = self.state_distributions[max(start_lap, 1) - 1:end_lap]
+        return float(window[:, INTERMEDIATE].sum() + window[:, WET].sum())
+
+    def sample(self, num_scenarios: int, total_laps: Optional[int] = None,
+               seed: Optional[int] = None, initial_condition: str = "dry") -> np.ndarray:
+        """Sample condition code sequences, shape (num_scenarios, total_laps)"""
+        total_laps = total_laps or self.horizon
+        rng = np.random.default_rng(seed)
+        cumulative = np.cumsum(self.transition, axis=1)
+        draws = rng.random((num_scenarios, total_laps))
+        states = np.empty((num_scenarios, total_laps), dtype=np.int8)
+        states[:, 0] = CONDITION_CODES[initial_condition]
+
+        # Vectorised across scenarios; one step per lap
+        for lap in range(1, total_laps):
+            thresholds = cumulative[states[:, lap - 1]]
+            states[:, lap] = (draws[:, lap, None] > thresholds[:, :-1]).sum(axis=1)
+
+        return states
+
+def build_transition_matrix(track_id: str, total_laps: int) -> np.ndarray:
+    """Transition matrix calibrated so the chance of rain during a race matches the track pattern"""
+    pattern = TRACK_WEATHER_PATTERNS.get(track_id, DEFAULT_WEATHER_PATTERN)
+    # Per-lap hazard h with 1 - (1 - h) ** total_laps == race rain probability
+    hazard = 1.0 - (1.0 - pattern["rain_probability"]) ** (1.0 / total_laps)
+
+    transition = np.zeros((len(WEATHER_CONDITIONS), len(WEATHER_CONDITIONS)))
+    transition[DRY, INTERMEDIATE] = hazard * LIGHT_RAIN_SHARE
+    transition[DRY, WET] = hazard * (1.0 - LIGHT_RAIN_SHARE)
+    transition[INTERMEDIATE, DRY] = INTERMEDIATE_TO_DRY
+    transition[INTERMEDIATE, WET] = INTERMEDIATE_TO_WET
+    transition[WET, INTERMEDIATE] = WET_TO_INTERMEDIATE
+    transition[np.diag_indices_from(transition)] = 1.0 - transition.sum(axis=1)
+    return transition
+
+def get_markov_model(track_id: str = "silverstone") -> MarkovWeatherModel:
+    """Get the cached Markov weather model for a track id or alias"""
+    return _build_markov_model(get_track_profile(track_id).track_id)
+
+@lru_cache(maxsize=None)
+def _build_markov_model(track_id: str) -> MarkovWeatherModel:
+    horizon = get_track_profile(track_id).total_laps
+    transition = build_transition_matrix(track_id, horizon)
+
+    distributions = np.empty((horizon, len(WEATHER_CONDITIONS)))
+    distributions[0] = np.eye(len(WEATHER_CONDITIONS))[DRY]
+    for lap in range(1, horizon):
+        distributions[lap] = distributions[lap - 1] @ transition
+
+    # Staying dry is a single-state run, so P(dry through lap n) = T[dry, dry] ** (n - 1)
+    laps = np.arange(horizon + 1)
+    rain_by_lap = np.where(laps == 0, 0.0, 1.0 - transition[DRY, DRY] ** np.maximum(laps - 1, 0))
+
+    for array in (transition, distributions, rain_by_lap):
+        array.setflags(write=False)
+
+    return MarkovWeatherModel(
+        track_id=track_id,
+        transition=transition,
+        horizon=horizon,
+        state_distributions=distributions,
+        rain_by_lap=rain_by_lap
+    )
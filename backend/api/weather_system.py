@@ -1,7 +1,85 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import random
 import math
+import numpy as np
+
+# Track-specific weather patterns
+TRACK_WEATHER_PATTERNS = {
+    "monaco": {"rain_probability": 0.3, "temperature_variation": 5.0},
+    "silverstone": {"rain_probability": 0.4, "temperature_variation": 8.0},
+    "spa": {"rain_probability": 0.5, "temperature_variation": 10.0},
+    "monza": {"rain_probability": 0.2, "temperature_variation": 6.0},
+    "suzuka": {"rain_probability": 0.4, "temperature_variation": 7.0}
+}
+DEFAULT_WEATHER_PATTERN = {"rain_probability": 0.3, "temperature_variation": 5.0}
+
+# Condition codes used by array-based weather data
+WEATHER_CONDITIONS = ("dry", "intermediate", "wet")
+CONDITION_CODES = {name: code for code, name in enumerate(WEATHER_CONDITIONS)}
+
+# Compound order used by per-compound arrays
+TIRE_COMPOUNDS = ("Soft", "Medium", "Hard", "Intermediate", "Wet")
+COMPOUND_INDEX = {name: index for index, name in enumerate(TIRE_COMPOUNDS)}
+# Extra table row for compounds outside TIRE_COMPOUNDS
+UNKNOWN_COMPOUND = len(TIRE_COMPOUNDS)
+
+BASE_TIRE_PERFORMANCE = {
+    "Soft": 1.0,
+    "Medium": 0.95,
+    "Hard": 0.9,
+    "Intermediate": 0.85,
+    "Wet": 0.8
+}
+
+# Weather-specific adjustments
+WEATHER_TIRE_ADJUSTMENTS = {
+    "dry": {
+        "Soft": 1.0, "Medium": 0.95, "Hard": 0.9, "Intermediate": 0.7, "Wet": 0.5
+    },
+    "intermediate": {
+        "Soft": 0.6, "Medium": 0.7, "Hard": 0.8, "Intermediate": 1.0, "Wet": 0.9
+    },
+    "wet": {
+        "Soft": 0.4, "Medium": 0.5, "Hard": 0.6, "Intermediate": 0.8, "Wet": 1.0
+    }
+}
+
+# Track temperature bands: cold below 15C, hot above 40C
+COLD_BAND, NORMAL_BAND, HOT_BAND = 0, 1, 2
+TEMPERATURE_FACTORS = (0.95, 1.0, 0.9)  # Cold track slightly reduces grip, hot track reduces tire life
+
+def temperature_band(track_temperature: float) -> int:
+    """Get the temperature band index of a track temperature"""
+    if track_temperature > 40:
+        return HOT_BAND
+    elif track_temperature < 15:
+        return COLD_BAND
+    return NORMAL_BAND
+
+def _build_tire_performance_table() -> np.ndarray:
+    """Compound x condition x temperature band performance, before track grip"""
+    table = np.empty((len(TIRE_COMPOUNDS) + 1, len(WEATHER_CONDITIONS), len(TEMPERATURE_FACTORS)))
+    for compound in range(len(TIRE_COMPOUNDS) + 1):
+        name = TIRE_COMPOUNDS[compound] if compound < UNKNOWN_COMPOUND else None
+        for condition, condition_name in enumerate(WEATHER_CONDITIONS):
+            base = BASE_TIRE_PERFORMANCE.get(name, 0.9)
+            weather_adj = WEATHER_TIRE_ADJUSTMENTS[condition_name].get(name, 0.8)
+            for band, temp_factor in enumerate(TEMPERATURE_FACTORS):
+                table[compound, condition, band] = base * weather_adj * temp_factor
+    table.setflags(write=False)
+    return table
+
+def _as_codes(values: Any, codes: Dict[str, int], default: Optional[int]) -> np.ndarray:
+    """Convert names (or existing integer codes) to an integer code array"""
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return array
+    lookup = np.vectorize(lambda name: codes[name] if default is None else codes.get(name, default), otypes=[np.intp])
+    return lookup(array)
+
+TIRE_PERFORMANCE_TABLE = _build_tire_performance_table()
+_TIRE_PERFORMANCE_LOOKUP = TIRE_PERFORMANCE_TABLE.tolist()
 
 @dataclass
 class WeatherCondition:
@@ -20,109 +98,224 @@ class WeatherEvent:
     description: str
     impact: Dict[str, Any]
 
+@dataclass
+class WeatherEnsemble:
+    """M weather scenarios x total_laps, one array per field"""
+    temperature: np.ndarray
+    humidity: np.ndarray
+    wind_speed: np.ndarray
+    rain_probability: np.ndarray
+    track_temperature: np.ndarray
+    grip_level: np.ndarray
+    condition: np.ndarray  # int8 codes into WEATHER_CONDITIONS
+
+    @property
+    def num_scenarios(self) -> int:
+        return self.condition.shape[0]
+
+    @property
+    def total_laps(self) -> int:
+        return self.condition.shape[1]
+
+    def scenario(self, index: int) -> List[WeatherCondition]:
+        """Materialize one scenario as a per-lap forecast"""
+        return [
+            WeatherCondition(
+                condition=WEATHER_CONDITIONS[self.condition[index, lap]],
+                temperature=float(self.temperature[index, lap]),
+                humidity=float(self.humidity[index, lap]),
+                wind_speed=float(self.wind_speed[index, lap]),
+                rain_probability=float(self.rain_probability[index, lap]),
+                track_temperature=float(self.track_temperature[index, lap]),
+                grip_level=float(self.grip_level[index, lap])
+            )
+            for lap in range(self.total_laps)
+        ]
+
+    def percentiles(self, field: str, q: List[float]) -> np.ndarray:
+        """Per-lap percentile bands of a field across scenarios, shape (len(q), total_laps)"""
+        return np.percentile(getattr(self, field), q, axis=0)
+
+    def condition_probability(self, condition: str) -> np.ndarray:
+        """Per-lap fraction of scenarios in the given condition"""
+        return (self.condition == CONDITION_CODES[condition]).mean(axis=0)
+
+# (grip level, rain probability) a forecast starting in each condition holds
+# under the forecast rules, instead of drying out on the first lap
+CONDITION_BASELINES = {
+    "dry": (1.0, 0.1),
+    "intermediate": (0.85, 0.3),
+    "wet": (0.7, 0.7)
+}
+
+def default_weather(initial_weather: str = "dry") -> WeatherCondition:
+    """Starting conditions forecasts evolve from"""
+    grip_level, rain_probability = CONDITION_BASELINES.get(initial_weather, CONDITION_BASELINES["dry"])
+    return WeatherCondition(
+        condition=initial_weather,
+        temperature=25.0,
+        humidity=60.0,
+        wind_speed=10.0,
+        rain_probability=rain_probability,
+        track_temperature=35.0,
+        grip_level=grip_level
+    )
+
+def _add_event(events: List[WeatherEvent], lap: int, event_type: str, description: str, impact: Dict[str, Any]):
+    events.append(WeatherEvent(lap=lap, event_type=event_type, description=description, impact=impact))
+
+def forecast_weather(base: WeatherCondition, total_laps: int, track_id: str = "silverstone",
+                     rng: Any = None) -> Tuple[List[WeatherCondition], List[WeatherEvent]]:
+    """
+    Generate a lap-by-lap forecast evolving from base conditions.
+
+    Pure apart from drawing from rng (the global random module by default):
+    returns the forecast and the weather events it contains without keeping
+    either, so concurrent callers never share state.
+    """
+    rng = rng or random
+    forecast = []
+    events: List[WeatherEvent] = []
+    
+    pattern = TRACK_WEATHER_PATTERNS.get(track_id, DEFAULT_WEATHER_PATTERN)
+    
+    for lap in range(1, total_laps + 1):
+        # Base weather condition
+        weather = WeatherCondition(
+            condition=base.condition,
+            temperature=base.temperature,
+            humidity=base.humidity,
+            wind_speed=base.wind_speed,
+            rain_probability=base.rain_probability,
+            track_temperature=base.track_temperature,
+            grip_level=base.grip_level
+        )
+        
+        # Temperature variation throughout the day
+        time_factor = math.sin((lap / total_laps) * math.pi) * 0.5 + 0.5
+        temperature_change = (rng.random() - 0.5) * pattern["temperature_variation"]
+        weather.temperature += temperature_change
+        weather.track_temperature = weather.temperature + 10.0 + rng.uniform(-2, 2)
+        
+        # Humidity changes
+        weather.humidity += (rng.random() - 0.5) * 10
+        weather.humidity = max(30, min(90, weather.humidity))
+        
+        # Wind speed variation
+        weather.wind_speed += (rng.random() - 0.5) * 5
+        weather.wind_speed = max(0, min(30, weather.wind_speed))
+        
+        # Rain probability based on humidity and temperature
+        if weather.humidity > 80 and weather.temperature < 20:
+            weather.rain_probability = min(0.8, weather.rain_probability + 0.1)
+        elif weather.humidity < 50 and weather.temperature > 25:
+            weather.rain_probability = max(0.05, weather.rain_probability - 0.05)
+        
+        # Simulate rain events
+        if weather.rain_probability > 0.6 and rng.random() < 0.1:
+            weather.condition = "wet"
+            weather.grip_level = 0.7
+            _add_event(events, lap, "rain_start", "Rain started", {
+                "grip_reduction": 0.3,
+                "tire_compound_impact": "wet_tires_recommended"
+            })
+        elif weather.condition == "wet" and weather.rain_probability < 0.3:
+            weather.condition = "intermediate"
+            weather.grip_level = 0.85
+            _add_event(events, lap, "rain_stop", "Rain stopped, track drying", {
+                "grip_improvement": 0.15,
+                "tire_compound_impact": "intermediate_tires_recommended"
+            })
+        
+        # Track drying process
+        if weather.condition in ["wet", "intermediate"] and weather.rain_probability < 0.2:
+            drying_rate = 0.02  # Track dries slowly
+            weather.grip_level = min(1.0, weather.grip_level + drying_rate)
+            if weather.grip_level > 0.95:
+                weather.condition = "dry"
+                weather.grip_level = 1.0
+                _add_event(events, lap, "track_dry", "Track fully dried", {
+                    "grip_restoration": 1.0,
+                    "tire_compound_impact": "dry_tires_optimal"
+                })
+        
+        forecast.append(weather)
+    
+    return forecast, events
+
 class WeatherSimulator:
     def __init__(self, initial_weather: str = "dry"):
-        self.current_weather = WeatherCondition(
-            condition=initial_weather,
-            temperature=25.0,
-            humidity=60.0,
-            wind_speed=10.0,
-            rain_probability=0.1,
-            track_temperature=35.0,
-            grip_level=1.0
-        )
+        self.current_weather = default_weather(initial_weather)
+        # Forecast and events of the latest generate_weather_forecast call only
         self.weather_events: List[WeatherEvent] = []
         self.forecast: List[WeatherCondition] = []
         
-    def generate_weather_forecast(self, total_laps: int, track_id: str = "silverstone") -> List[WeatherCondition]:
-        """Generate weather forecast for the entire race"""
-        forecast = []
-        
-        # Track-specific weather patterns
-        track_weather_patterns = {
-            "monaco": {"rain_probability": 0.3, "temperature_variation": 5.0},
-            "silverstone": {"rain_probability": 0.4, "temperature_variation": 8.0},
-            "spa": {"rain_probability": 0.5, "temperature_variation": 10.0},
-            "monza": {"rain_probability": 0.2, "temperature_variation": 6.0},
-            "suzuka": {"rain_probability": 0.4, "temperature_variation": 7.0}
-        }
+    def generate_weather_forecast(self, total_laps: int, track_id: str = "silverstone",
+                                  rng: Any = None) -> List[WeatherCondition]:
+        """Generate weather forecast for the entire race.
         
-        pattern = track_weather_patterns.get(track_id, {"rain_probability": 0.3, "temperature_variation": 5.0})
-        
-        for lap in range(1, total_laps + 1):
-            # Base weather condition
-            weather = WeatherCondition(
-                condition=self.current_weather.condition,
-                temperature=self.current_weather.temperature,
-                humidity=self.current_weather.humidity,
-                wind_speed=self.current_weather.wind_speed,
-                rain_probability=self.current_weather.rain_probability,
-                track_temperature=self.current_weather.track_temperature,
-                grip_level=self.current_weather.grip_level
-            )
-            
-            # Temperature variation throughout the day
-            time_factor = math.sin((lap / total_laps) * math.pi) * 0.5 + 0.5
-            temperature_change = (random.random() - 0.5) * pattern["temperature_variation"]
-            weather.temperature += temperature_change
-            weather.track_temperature = weather.temperature + 10.0 + random.uniform(-2, 2)
-            
-            # Humidity changes
-            weather.humidity += (random.random() - 0.5) * 10
-            weather.humidity = max(30, min(90, weather.humidity))
-            
-            # Wind speed variation
-            weather.wind_speed += (random.random() - 0.5) * 5
-            weather.wind_speed = max(0, min(30, weather.wind_speed))
-            
-            # Rain probability based on humidity and temperature
-            if weather.humidity > 80 and weather.temperature < 20:
-                weather.rain_probability = min(0.8, weather.rain_probability + 0.1)
-            elif weather.humidity < 50 and weather.temperature > 25:
-                weather.rain_probability = max(0.05, weather.rain_probability - 0.05)
-            
-            # Simulate rain events
-            if weather.rain_probability > 0.6 and random.random() < 0.1:
-                weather.condition = "wet"
-                weather.grip_level = 0.7
-                self._add_weather_event(lap, "rain_start", "Rain started", {
-                    "grip_reduction": 0.3,
-                    "tire_compound_impact": "wet_tires_recommended"
-                })
-            elif weather.condition == "wet" and weather.rain_probability < 0.3:
-                weather.condition = "intermediate"
-                weather.grip_level = 0.85
-                self._add_weather_event(lap, "rain_stop", "Rain stopped, track drying", {
-                    "grip_improvement": 0.15,
-                    "tire_compound_impact": "intermediate_tires_recommended"
-                })
-            
-            # Track drying process
-            if weather.condition in ["wet", "intermediate"] and weather.rain_probability < 0.2:
-                drying_rate = 0.02  # Track dries slowly
-                weather.grip_level = min(1.0, weather.grip_level + drying_rate)
-                if weather.grip_level > 0.95:
-                    weather.condition = "dry"
-                    weather.grip_level = 1.0
-                    self._add_weather_event(lap, "track_dry", "Track fully dried", {
-                        "grip_restoration": 1.0,
-                        "tire_compound_impact": "dry_tires_optimal"
-                    })
-            
-            forecast.append(weather)
-        
-        self.forecast = forecast
-        return forecast
+        The forecast and its events replace those of the previous call, for
+        get_weather_summary; code sharing a simulator between threads should
+        call forecast_weather instead.
+        """
+        self.forecast, self.weather_events = forecast_weather(self.current_weather, total_laps, track_id, rng)
+        return self.forecast
     
-    def _add_weather_event(self, lap: int, event_type: str, description: str, impact: Dict[str, Any]):
-        """Add a weather event to the log"""
-        event = WeatherEvent(
-            lap=lap,
-            event_type=event_type,
-            description=description,
-            impact=impact
+    def generate_weather_ensemble(self, num_scenarios: int, total_laps: int,
+                                  track_id: str = "silverstone",
+                                  seed: Optional[int] = None) -> WeatherEnsemble:
+        """Generate num_scenarios forecasts at once as arrays.
+        
+        Follows the same per-lap rules as generate_weather_forecast, evaluated
+        for every scenario and lap in one pass.
+        """
+        rng = np.random.default_rng(seed)
+        pattern = TRACK_WEATHER_PATTERNS.get(track_id, DEFAULT_WEATHER_PATTERN)
+        base = self.current_weather
+        shape = (num_scenarios, total_laps)
+        
+        # Temperature variation
+        temperature = base.temperature + (rng.random(shape) - 0.5) * pattern["temperature_variation"]
+        track_temperature = temperature + 10.0 + rng.uniform(-2, 2, shape)
+        
+        # Humidity and wind changes
+        humidity = np.clip(base.humidity + (rng.random(shape) - 0.5) * 10, 30, 90)
+        wind_speed = np.clip(base.wind_speed + (rng.random(shape) - 0.5) * 5, 0, 30)
+        
+        # Rain probability based on humidity and temperature
+        rain_probability = np.full(shape, base.rain_probability)
+        rising = (humidity > 80) & (temperature < 20)
+        falling = ~rising & (humidity < 50) & (temperature > 25)
+        rain_probability[rising] = min(0.8, base.rain_probability + 0.1)
+        rain_probability[falling] = max(0.05, base.rain_probability - 0.05)
+        
+        condition = np.full(shape, CONDITION_CODES[base.condition], dtype=np.int8)
+        grip_level = np.full(shape, base.grip_level)
+        
+        # Rain events
+        rain_start = (rain_probability > 0.6) & (rng.random(shape) < 0.1)
+        rain_stop = ~rain_start & (condition == CONDITION_CODES["wet"]) & (rain_probability < 0.3)
+        condition[rain_start] = CONDITION_CODES["wet"]
+        grip_level[rain_start] = 0.7
+        condition[rain_stop] = CONDITION_CODES["intermediate"]
+        grip_level[rain_stop] = 0.85
+        
+        # Track drying process
+        drying = (condition != CONDITION_CODES["dry"]) & (rain_probability < 0.2)
+        grip_level[drying] = np.minimum(1.0, grip_level[drying] + 0.02)
+        dried = drying & (grip_level > 0.95)
+        condition[dried] = CONDITION_CODES["dry"]
+        grip_level[dried] = 1.0
+        
+        return WeatherEnsemble(
+            temperature=temperature,
+            humidity=humidity,
+            wind_speed=wind_speed,
+            rain_probability=rain_probability,
+            track_temperature=track_temperature,
+            grip_level=grip_level,
+            condition=condition
         )
-        self.weather_events.append(event)
     
     def get_weather_at_lap(self, lap: int) -> WeatherCondition:
         """Get weather conditions for a specific lap"""
@@ -136,46 +329,86 @@ class WeatherSimulator:
     
     def calculate_tire_performance_impact(self, weather: WeatherCondition, tire_compound: str) -> Dict[str, float]:
         """Calculate how weather affects tire performance"""
-        base_performance = {
-            "Soft": 1.0,
-            "Medium": 0.95,
-            "Hard": 0.9,
-            "Intermediate": 0.85,
-            "Wet": 0.8
-        }
+        band = temperature_band(weather.track_temperature)
+        compound = COMPOUND_INDEX.get(tire_compound, UNKNOWN_COMPOUND)
         
-        # Weather-specific adjustments
-        weather_adjustments = {
-            "dry": {
-                "Soft": 1.0, "Medium": 0.95, "Hard": 0.9, "Intermediate": 0.7, "Wet": 0.5
-            },
-            "intermediate": {
-                "Soft": 0.6, "Medium": 0.7, "Hard": 0.8, "Intermediate": 1.0, "Wet": 0.9
-            },
-            "wet": {
-                "Soft": 0.4, "Medium": 0.5, "Hard": 0.6, "Intermediate": 0.8, "Wet": 1.0
-            }
+        # Compound x condition x temperature band lookup, scaled by track grip
+        final_performance = _TIRE_PERFORMANCE_LOOKUP[compound][CONDITION_CODES[weather.condition]][band] * weather.grip_level
+        
+        return {
+            "performance_multiplier": final_performance,
+            "wear_rate_multiplier": 1.0 / final_performance if final_performance > 0 else 2.0,
+            "grip_level": weather.grip_level,
+            "temperature_factor": TEMPERATURE_FACTORS[band]
         }
+    
+    def calculate_tire_performance_impact_batch(self, conditions: Any, track_temperatures: Any,
+                                                grip_levels: Any, tire_compounds: Any) -> Dict[str, np.ndarray]:
+        """Vectorised calculate_tire_performance_impact over broadcastable arrays.
         
-        # Temperature impact
-        temp_factor = 1.0
-        if weather.track_temperature > 40:
-            temp_factor = 0.9  # Hot track reduces tire life
-        elif weather.track_temperature < 15:
-            temp_factor = 0.95  # Cold track slightly reduces grip
+        conditions and tire_compounds may be names or integer codes (CONDITION_CODES,
+        COMPOUND_INDEX); all inputs broadcast against each other.
+        """
+        conditions = _as_codes(conditions, CONDITION_CODES, None)
+        compounds = _as_codes(tire_compounds, COMPOUND_INDEX, UNKNOWN_COMPOUND)
+        track_temperatures = np.asarray(track_temperatures, dtype=float)
+        grip_levels = np.asarray(grip_levels, dtype=float)
         
-        # Calculate final performance
-        base = base_performance.get(tire_compound, 0.9)
-        weather_adj = weather_adjustments[weather.condition].get(tire_compound, 0.8)
-        final_performance = base * weather_adj * temp_factor * weather.grip_level
+        bands = np.where(track_temperatures > 40, HOT_BAND, np.where(track_temperatures < 15, COLD_BAND, NORMAL_BAND))
+        final_performance = TIRE_PERFORMANCE_TABLE[compounds, conditions, bands] * grip_levels
+        
+        with np.errstate(divide="ignore"):
+            wear_rate = np.where(final_performance > 0, 1.0 / final_performance, 2.0)
         
         return {
             "performance_multiplier": final_performance,
-            "wear_rate_multiplier": 1.0 / final_performance if final_performance > 0 else 2.0,
-            "grip_level": weather.grip_level,
-            "temperature_factor": temp_factor
+            "wear_rate_multiplier": wear_rate,
+            "grip_level": np.broadcast_to(grip_levels, final_performance.shape),
+            "temperature_factor": np.asarray(TEMPERATURE_FACTORS)[bands]
         }
     
+    def build_lap_multipliers(self, forecast: List[Any], total_laps: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Precompute per-lap grip and wear multipliers for every compound.
+        
+        Returns two (total_laps x compound) arrays relative to a dry, mild track, so
+        a lap loop only needs a lookup. Grip combines the forecast grip level with how
+        well the compound suits the conditions (capped at its dry performance); wear
+        follows the inverse of the tire performance impact. Forecasts shorter than the
+        race repeat their last lap.
+        """
+        forecast = [self._as_weather_condition(weather) for weather in forecast]
+        total_laps = total_laps or len(forecast)
+        laps = [forecast[min(lap, len(forecast) - 1)] for lap in range(total_laps)]
+        
+        conditions = np.array([CONDITION_CODES[weather.condition] for weather in laps])[:, None]
+        track_temperatures = np.array([weather.track_temperature for weather in laps])[:, None]
+        grip_levels = np.array([weather.grip_level for weather in laps])[:, None]
+        compounds = np.arange(len(TIRE_COMPOUNDS))[None, :]
+        
+        impact = self.calculate_tire_performance_impact_batch(conditions, track_temperatures, grip_levels, compounds)
+        reference_performance = TIRE_PERFORMANCE_TABLE[compounds, CONDITION_CODES["dry"], NORMAL_BAND]
+        suitability = impact["performance_multiplier"] / (
+            reference_performance * impact["temperature_factor"] * np.maximum(grip_levels, 1e-6)
+        )
+        grip = grip_levels * np.minimum(1.0, suitability)
+        wear = np.minimum(2.0, impact["wear_rate_multiplier"] * reference_performance)
+        
+        return grip, wear
+    
+    def _as_weather_condition(self, weather: Any) -> WeatherCondition:
+        """Accept forecast entries as WeatherCondition objects or API-style dicts"""
+        if isinstance(weather, WeatherCondition):
+            return weather
+        return WeatherCondition(
+            condition=weather.get("condition", "dry"),
+            temperature=weather.get("temperature", 25.0),
+            humidity=weather.get("humidity", 60.0),
+            wind_speed=weather.get("wind_speed", 10.0),
+            rain_probability=weather.get("rain_probability", 0.1),
+            track_temperature=weather.get("track_temperature", 35.0),
+            grip_level=weather.get("grip_level", 1.0)
+        )
+    
     def get_wet_dry_line_strategy(self, weather: WeatherCondition) -> Dict[str, Any]:
         """Provide strategy recommendations for wet/dry line racing"""
         if weather.condition == "dry":
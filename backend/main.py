@@ -1,22 +1,54 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from mangum import Mangum
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import asyncio
+import json
+import logging
 import os
 # from dotenv import load_dotenv
 
+# Imported first so the import timings below cover the rest of startup
+from api.startup import startup_report
+
+with startup_report.measure("fastapi"):
+    from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+    from fastapi.responses import JSONResponse, Response, StreamingResponse
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel, ValidationError
+
+with startup_report.measure("mangum"):
+    from mangum import Mangum
+
 # --- Add slowapi for rate limiting ---
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+with startup_report.measure("slowapi"):
+    from slowapi import Limiter, _rate_limit_exceeded_handler
+    from slowapi.util import get_remote_address
+    from slowapi.errors import RateLimitExceeded
+
+with startup_report.measure("api.core"):
+    from api.executor import simulation_executor, ExecutorSaturated
+    from api.cancellation import CancellationToken, SimulationCancelled
+    from api.logging_config import configure_logging
+    from api.cache import TTLCache, SingleFlight
+    from api.serialization import fast_response, simulation_response, RESPONSE_FORMATS
+    from api.static_data import static_data
+
+with startup_report.measure("api.simulation"):
+    from api.simulation import (
+        simulate_race, simulate_multi_car_race, group_batch_by_track, simulate_track_batch, compare_strategies, generate_weather_forecast,
+        get_available_tracks, get_track_details, get_sample_car_configs, get_sample_strategies
+    )
+    from api.tracks import track_db
+    from api.jobs import get_job_manager, JOB_HANDLERS
+    from api.race_feed import RaceSession
 
-from api.simulation import simulate_race
-from api.strategy import get_strategy_recommendation
+with startup_report.measure("api.strategy"):
+    from api.strategy import get_strategy_recommendation, get_strategy_recommendations
 
 # Load environment variables
 # load_dotenv()
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="F1 Race Simulator API",
     description="AI-powered Formula 1 race strategy simulation and recommendations",
@@ -38,6 +70,24 @@ limiter = Limiter(key_func=custom_key_func)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    # Shed load quickly instead of letting simulation latency grow without bound
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Simulation capacity exhausted, please retry shortly"},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
+app.add_exception_handler(ExecutorSaturated, executor_saturated_handler)
+
+async def simulation_cancelled_handler(request: Request, exc: SimulationCancelled):
+    if exc.reason == "timeout":
+        return JSONResponse(status_code=504, content={"detail": "Simulation timed out"})
+    # The client is usually gone by now; 499 marks the request as abandoned in the logs
+    return JSONResponse(status_code=499, content={"detail": "Simulation cancelled"})
+
+app.add_exception_handler(SimulationCancelled, simulation_cancelled_handler)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -57,9 +107,59 @@ class SimulationRequest(BaseModel):
     strategy: StrategyInput
     weather: str = "dry"
 
+class BatchSimulationItem(BaseModel):
+    strategy: StrategyInput
+    weather: str = "dry"
+    track_id: str = "silverstone"
+    seed: Optional[int] = None
+
+class BatchSimulationRequest(BaseModel):
+    items: List[BatchSimulationItem]
+    stream: bool = False
+
+class CarConfig(BaseModel):
+    car_id: str
+    driver_name: str
+    strategy: StrategyInput
+
+class MultiCarSimulationRequest(BaseModel):
+    car_configs: Optional[List[CarConfig]] = None
+    weather: str = "dry"
+    track_id: str = "silverstone"
+
+class ComparisonStrategy(StrategyInput):
+    name: Optional[str] = None
+
+class RaceFeedStart(MultiCarSimulationRequest):
+    lap_interval: float = 0.0
+
+class RaceStrategyUpdate(BaseModel):
+    pit_stops: List[int]
+    tires: List[str]
+    driver_style: Optional[str] = None
+
+class StrategyComparisonRequest(BaseModel):
+    strategies: List[ComparisonStrategy]
+    weather: str = "dry"
+    track_id: str = "silverstone"
+    num_simulations: int = 5
+
+class FrontierRequest(BaseModel):
+    strategies: Optional[List[StrategyInput]] = None
+    weather: str = "dry"
+    track_id: str = "silverstone"
+    num_simulations: int = 5
+
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
 class StrategyRecommendationRequest(BaseModel):
     scenario: str
 
+class BatchRecommendationRequest(BaseModel):
+    scenarios: List[str]
+
 class SimulationResult(BaseModel):
     lap: int
     lap_time: float
@@ -77,6 +177,102 @@ class RecommendationResponse(BaseModel):
     status: str
     recommendation: Dict[str, Any]
 
+class BatchRecommendationResponse(BaseModel):
+    status: str
+    recommendations: List[Dict[str, Any]]
+
+# Largest number of scenarios accepted by the batch recommendation endpoint
+MAX_BATCH_SCENARIOS = 20
+# Largest number of races accepted by the batch simulation endpoint
+MAX_BATCH_SIMULATIONS = 50
+# Limits on strategy comparison requests
+MAX_COMPARISON_STRATEGIES = 10
+MAX_COMPARISON_SIMULATIONS = 20
+# Largest field accepted by multi-car simulations; cost grows with cars x laps
+MAX_MULTI_CAR_CARS = 20
+# Longest weather forecast served; forecasts run to completion once started
+MAX_FORECAST_LAPS = 100
+# Slowest pace the live race feed can be asked to run at, in seconds per lap
+MAX_LAP_INTERVAL = 5.0
+# Background jobs have no request timeout, so they accept larger workloads
+MAX_JOB_BATCH_SIMULATIONS = 1000
+MAX_JOB_STRATEGIES = 50
+MAX_JOB_SIMULATIONS = 200
+
+# Longest a request-bound simulation may run before it is cancelled, in seconds
+SIMULATION_TIMEOUT = float(os.getenv("SIMULATION_TIMEOUT", "30"))
+# How often request-bound simulations check whether their client is still connected
+DISCONNECT_POLL_INTERVAL = 0.25
+
+# Results of identical simulation requests are reused for a few minutes
+simulation_cache = TTLCache(
+    maxsize=int(os.getenv("SIMULATION_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SIMULATION_CACHE_TTL", "300"))
+)
+
+# Concurrent identical simulations share one run, per kind; see /debug/simulation-stats
+simulation_flights: Dict[str, SingleFlight] = {}
+
+def simulation_key(kind: str, params: Dict[str, Any]) -> str:
+    """Canonical key for a simulation: its kind plus sorted, compact JSON params"""
+    return kind + ":" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+async def watch_disconnect(request: Request):
+    """Return once the client has disconnected"""
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+async def run_simulation_shared(request: Request, kind: str, params: Dict[str, Any], fn, *args,
+                                cancellable: bool = True, cached: bool = False) -> Tuple[Any, bool]:
+    """
+    Run a simulation on the executor for one request, sharing identical runs.
+    
+    params must identify the run (strategy, weather, track, seed...). A
+    request whose key is already running attaches to that run instead of
+    starting another. The run is cancelled once every attached client has
+    disconnected, or after SIMULATION_TIMEOUT; cancellable runs need fn to
+    accept cancel_token. With cached, finished results are also reused from
+    simulation_cache. Returns (result, shared), where shared means this
+    request attached to a run already in flight.
+    """
+    key = simulation_key(kind, params)
+    if cached:
+        hit = simulation_cache.get(key)
+        if hit is not None:
+            return hit, False
+    
+    async def compute():
+        if cancellable:
+            result = await simulation_executor.run(fn, *args, cancel_token=CancellationToken(SIMULATION_TIMEOUT))
+        else:
+            result = await simulation_executor.run(fn, *args)
+        if cached:
+            simulation_cache.set(key, result)
+        return result
+    
+    flight = simulation_flights.setdefault(kind, SingleFlight(cancel_abandoned=True))
+    joined, shared = flight.join(key, compute)
+    waiter = asyncio.ensure_future(joined)
+    watcher = asyncio.ensure_future(watch_disconnect(request))
+    try:
+        await asyncio.wait({waiter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if waiter.done():
+            return waiter.result(), shared
+        raise SimulationCancelled("client disconnected")
+    finally:
+        waiter.cancel()
+        watcher.cancel()
+
+def mark_shared(response: Response, shared: bool) -> Response:
+    response.headers["X-Simulation-Shared"] = "true" if shared else "false"
+    return response
+
+def resolve_track_or_404(track_id: str) -> str:
+    resolved = track_db.resolve_track_id(track_id)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail=f"Unknown track: {track_id}")
+    return resolved
+
 @app.get("/")
 @limiter.limit("3/day")
 async def root(request: Request):
@@ -89,7 +285,8 @@ async def health_check(request: Request):
 
 @app.post("/simulate-race", response_model=SimulationResponse)
 @limiter.limit("100/day")  # Higher limit - let the plan system control actual limits
-async def simulate_race_endpoint(request: Request, body: SimulationRequest):
+async def simulate_race_endpoint(request: Request, body: SimulationRequest,
+                                 response_format: str = Query("json", alias="format")):
     """
     Simulate a Formula 1 race with given strategy parameters.
     
@@ -97,9 +294,17 @@ async def simulate_race_endpoint(request: Request, body: SimulationRequest):
     - **tires**: List of tire compounds to use
     - **driver_style**: Driver approach (aggressive, balanced, conservative)
     - **weather**: Weather conditions (dry, wet, intermediate)
+    - **format**: json (default), columnar (one list per lap field) or binary
     """
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(RESPONSE_FORMATS)}")
+    
     try:
-        simulation_results = simulate_race(body.strategy, body.weather)
+        # CPU-bound, so run it off the event loop
+        strategy = body.strategy.model_dump()
+        simulation_results, shared = await run_simulation_shared(
+            request, "race", {"strategy": strategy, "weather": body.weather}, simulate_race, strategy, body.weather
+        )
         
         # Calculate total race time
         total_time = sum(lap["lap_time"] for lap in simulation_results)
@@ -107,15 +312,88 @@ async def simulate_race_endpoint(request: Request, body: SimulationRequest):
         # Generate strategy analysis
         strategy_analysis = f"Simulated {len(simulation_results)} laps with {len(body.strategy.pit_stops)} pit stops using {' → '.join(body.strategy.tires)} compounds."
         
-        return SimulationResponse(
-            status="success",
-            simulation=simulation_results,
-            total_time=total_time,
-            strategy_analysis=strategy_analysis
-        )
+        # Simulator output is trusted, so skip per-lap model validation
+        return mark_shared(simulation_response(
+            {
+                "status": "success",
+                "simulation": simulation_results,
+                "total_time": total_time,
+                "strategy_analysis": strategy_analysis
+            },
+            "simulation", response_format, request.headers.get("accept-encoding")
+        ), shared)
+    except (ExecutorSaturated, SimulationCancelled):
+        raise
     except Exception as e:
+        logger.exception("Simulation failed")
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
+@app.post("/simulate-race/batch")
+@limiter.limit("100/day")
+async def simulate_race_batch_endpoint(request: Request, body: BatchSimulationRequest):
+    """
+    Simulate many races in one request.
+    
+    Items are grouped by track so each group shares one simulator, and each
+    group runs as one executor job. Results come back in request order, or
+    with **stream** set (or an application/x-ndjson Accept header) as one
+    NDJSON line per item in completion order, tagged with its index.
+    
+    - **items**: (strategy, weather, track_id, seed) simulations to run
+    """
+    if not body.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(body.items) > MAX_BATCH_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIMULATIONS} items per request")
+    
+    items = [item.model_dump() for item in body.items]
+    batches = [
+        (track_id, [(i, items[i]) for i in indices])
+        for track_id, indices in group_batch_by_track(items).items()
+    ]
+    
+    if body.stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(stream_batch_results(batches), media_type="application/x-ndjson")
+    
+    group_results = await asyncio.gather(*[
+        run_simulation_shared(
+            request, "batch", {"track_id": track_id, "items": indexed_items},
+            simulate_track_batch, track_id, indexed_items
+        )
+        for track_id, indexed_items in batches
+    ])
+    results: List[Dict[str, Any]] = [{} for _ in items]
+    for result in (r for group, _ in group_results for r in group):
+        results[result["index"]] = result
+    return fast_response({"status": "success", "results": results}, request.headers.get("accept-encoding"))
+
+async def run_track_batch_or_error(track_id: str, indexed_items: List[Any]) -> List[Dict[str, Any]]:
+    """Run one track group, turning saturation and timeouts into per-item errors for streaming"""
+    # Cancelling this task (see stream_batch_results) cancels the token
+    token = CancellationToken(SIMULATION_TIMEOUT)
+    try:
+        return await simulation_executor.run(simulate_track_batch, track_id, indexed_items, cancel_token=token)
+    except ExecutorSaturated:
+        return [{"index": i, "status": "error", "detail": "Simulation capacity exhausted"} for i, _ in indexed_items]
+    except SimulationCancelled:
+        return [{"index": i, "status": "error", "detail": "Simulation timed out"} for i, _ in indexed_items]
+
+async def stream_batch_results(batches: List[Any]):
+    """
+    Yield one NDJSON line per batch item as each track group finishes.
+    
+    A client disconnect closes the generator; groups still running are then
+    cancelled, which cancels their tokens and frees their executor slots.
+    """
+    tasks = [asyncio.ensure_future(run_track_batch_or_error(track_id, indexed_items)) for track_id, indexed_items in batches]
+    try:
+        for next_job in asyncio.as_completed(tasks):
+            for result in await next_job:
+                yield json.dumps(result) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
 @app.post("/strategy-recommendation", response_model=RecommendationResponse)
 @limiter.limit("100/day")  # Higher limit - let the plan system control actual limits
 async def strategy_recommendation_endpoint(request: Request, body: StrategyRecommendationRequest):
@@ -125,45 +403,370 @@ async def strategy_recommendation_endpoint(request: Request, body: StrategyRecom
     - **scenario**: Description of the race scenario and current strategy
     """
     try:
-        print(f"Calling get_strategy_recommendation with scenario: {body.scenario}")
         recommendation = await get_strategy_recommendation(body.scenario)
-        print(f"Received recommendation type: {type(recommendation)}")
-        print(f"Received recommendation value: {recommendation}")
         
         # Ensure recommendation is a dictionary
         if not isinstance(recommendation, dict):
-            print(f"CRITICAL: recommendation is not a dict, got {type(recommendation)}: {recommendation}")
+            logger.error("Recommendation is not a dict", extra={"response_type": type(recommendation).__name__})
             # Convert string to dict if needed
             if isinstance(recommendation, str):
-                print("Converting string to dict structure")
                 recommendation = {
                     "pit_stop_timing": recommendation,
                     "tire_compound_strategy": "",
                     "driver_approach_adjustments": "",
                     "potential_time_savings_or_risks": ""
                 }
-                print(f"Converted to: {recommendation}")
             else:
-                print(f"Unknown type, falling back to mock")
-                from api.strategy import get_mock_recommendation
-                recommendation = get_mock_recommendation(body.scenario)
-        
-        print(f"Final recommendation before Pydantic: {recommendation}")
-        print(f"Final recommendation type: {type(recommendation)}")
+                from api.strategy import get_local_recommendation
+                recommendation = get_local_recommendation(body.scenario)
         
-        response = RecommendationResponse(
+        return RecommendationResponse(
             status="success",
             recommendation=recommendation
         )
-        print(f"Pydantic response created successfully: {response}")
-        return response
     except Exception as e:
-        print(f"Error in strategy recommendation: {e}")
+        logger.exception("Error in strategy recommendation")
         raise HTTPException(status_code=500, detail=f"Failed to get recommendation: {str(e)}")
 
+@app.post("/strategy-recommendation/batch", response_model=BatchRecommendationResponse)
+@limiter.limit("100/day")
+async def strategy_recommendation_batch_endpoint(request: Request, body: BatchRecommendationRequest):
+    """
+    Get strategy recommendations for several scenarios in one request.
+    
+    - **scenarios**: Race scenario descriptions, answered in the same order
+    """
+    if not body.scenarios:
+        raise HTTPException(status_code=400, detail="At least one scenario is required")
+    if len(body.scenarios) > MAX_BATCH_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SCENARIOS} scenarios per request")
+    
+    try:
+        recommendations = await get_strategy_recommendations(body.scenarios)
+        return BatchRecommendationResponse(status="success", recommendations=recommendations)
+    except Exception as e:
+        logger.exception("Error in batch strategy recommendation")
+        raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
+
+@app.post("/simulate-multi-car")
+@limiter.limit("100/day")
+async def simulate_multi_car_endpoint(request: Request, body: MultiCarSimulationRequest):
+    """
+    Simulate a multi-car race with overtaking and traffic.
+    
+    - **car_configs**: Cars with their strategies (defaults to the sample grid)
+    - **weather**: Weather conditions (dry, wet, intermediate)
+    - **track_id**: Track identifier
+    """
+    if body.car_configs and len(body.car_configs) > MAX_MULTI_CAR_CARS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_MULTI_CAR_CARS} cars per race")
+    track_id = resolve_track_or_404(body.track_id)
+    car_configs = [c.model_dump() for c in body.car_configs] if body.car_configs else get_sample_car_configs()
+    params = {"car_configs": car_configs, "weather": body.weather, "track_id": track_id}
+    
+    try:
+        simulation, shared = await run_simulation_shared(
+            request, "multi_car", params, simulate_multi_car_race, car_configs, body.weather, track_id, cached=True
+        )
+        return mark_shared(
+            fast_response({"status": "success", "simulation": simulation}, request.headers.get("accept-encoding")), shared
+        )
+    except (ExecutorSaturated, SimulationCancelled):
+        raise
+    except Exception as e:
+        logger.exception("Multi-car simulation failed")
+        raise HTTPException(status_code=500, detail=f"Multi-car simulation failed: {str(e)}")
+
+@app.post("/compare-strategies")
+@limiter.limit("100/day")
+async def compare_strategies_endpoint(request: Request, body: StrategyComparisonRequest):
+    """
+    Compare strategies over repeated simulations.
+    
+    - **strategies**: At least two strategies to compare
+    - **weather**: Weather conditions (dry, wet, intermediate)
+    - **track_id**: Track identifier
+    - **num_simulations**: Simulations per strategy
+    """
+    if not 2 <= len(body.strategies) <= MAX_COMPARISON_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Between 2 and {MAX_COMPARISON_STRATEGIES} strategies are required for comparison")
+    if not 1 <= body.num_simulations <= MAX_COMPARISON_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"num_simulations must be between 1 and {MAX_COMPARISON_SIMULATIONS}")
+    
+    track_id = resolve_track_or_404(body.track_id)
+    strategies = [
+        {**s.model_dump(exclude={"name"}), "name": s.name or f"Strategy {i + 1}"}
+        for i, s in enumerate(body.strategies)
+    ]
+    params = {"strategies": strategies, "weather": body.weather, "track_id": track_id, "num_simulations": body.num_simulations}
+    
+    try:
+        comparison, shared = await run_simulation_shared(
+            request, "comparison", params, compare_strategies, strategies, body.weather, track_id, body.num_simulations,
+            cached=True
+        )
+        return mark_shared(
+            fast_response({"status": "success", "comparison": comparison}, request.headers.get("accept-encoding")), shared
+        )
+    except (ExecutorSaturated, SimulationCancelled):
+        raise
+    except Exception as e:
+        logger.exception("Strategy comparison failed")
+        raise HTTPException(status_code=500, detail=f"Strategy comparison failed: {str(e)}")
+
+@app.get("/weather-forecast")
+@limiter.limit("100/day")
+async def weather_forecast_endpoint(request: Request, response: Response, track_id: str = "silverstone",
+                                    total_laps: int = 0, scenario: Optional[int] = None):
+    """
+    Get a lap-by-lap weather forecast.
+    
+    - **track_id**: Track identifier
+    - **total_laps**: Number of laps (defaults to the race distance)
+    - **scenario**: Index of a precomputed scenario; omit for a fresh random forecast
+    """
+    track_id = resolve_track_or_404(track_id)
+    if not 0 <= total_laps <= MAX_FORECAST_LAPS:
+        raise HTTPException(status_code=400, detail=f"total_laps must be between 1 and {MAX_FORECAST_LAPS}")
+    # Library scenarios cover the race distance only
+    if scenario is not None and total_laps not in (0, track_db.get_track(track_id).total_laps):
+        raise HTTPException(status_code=400, detail="Precomputed scenarios cover the full race distance only")
+    params = {"track_id": track_id, "total_laps": total_laps, "scenario": scenario}
+    # Precomputed scenarios are deterministic, so they can be cached; random ones are only shared while in flight
+    forecast, shared = await run_simulation_shared(
+        request, "weather_forecast", params, generate_weather_forecast, track_id, total_laps, scenario,
+        cancellable=False, cached=scenario is not None
+    )
+    mark_shared(response, shared)
+    return {"status": "success", "track_id": track_id, "forecast": forecast}
+
+def tracks_payload() -> Dict[str, Any]:
+    return {"status": "success", "tracks": get_available_tracks()}
+
+def samples_payload() -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "car_configs": get_sample_car_configs(),
+        "strategies": get_sample_strategies()
+    }
+
+def static_data_response(request: Request, key: str, build):
+    return static_data.response(
+        key, build, request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+    )
+
+@app.get("/tracks")
+@limiter.limit("100/day")
+async def tracks_endpoint(request: Request):
+    """List the available tracks"""
+    return static_data_response(request, "tracks", tracks_payload)
+
+@app.get("/tracks/{track_id}")
+@limiter.limit("100/day")
+async def track_details_endpoint(request: Request, track_id: str):
+    """Get sector, tire and weather details for a track"""
+    track_id = resolve_track_or_404(track_id)
+    return static_data_response(
+        request, f"track:{track_id}", lambda: {"status": "success", "track": get_track_details(track_id)}
+    )
+
+@app.get("/samples")
+@limiter.limit("100/day")
+async def samples_endpoint(request: Request):
+    """Get sample car configurations and strategies"""
+    return static_data_response(request, "samples", samples_payload)
+
+@app.get("/debug/simulation-stats")
+@limiter.limit("100/day")
+async def simulation_stats_endpoint(request: Request):
+    """Runs started and duplicate requests collapsed onto them, per simulation kind"""
+    return {
+        "status": "success",
+        "flights": {kind: flight.stats() for kind, flight in simulation_flights.items()},
+        "cache": simulation_cache.stats(),
+        "executor": simulation_executor.stats()
+    }
+
+@app.get("/debug/startup")
+@limiter.limit("100/day")
+async def startup_report_endpoint(request: Request):
+    """Import cost per module group measured during this worker's cold start"""
+    return {"status": "success", "report": startup_report.summary()}
+
+def validate_job_params(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate job params with the matching request model and the larger job limits"""
+    model = {"compare": StrategyComparisonRequest, "batch": BatchSimulationRequest, "frontier": FrontierRequest}[kind]
+    try:
+        body = model.model_validate(params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    
+    if kind == "batch":
+        if not 1 <= len(body.items) <= MAX_JOB_BATCH_SIMULATIONS:
+            raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_JOB_BATCH_SIMULATIONS} items are required")
+        return {"items": [item.model_dump() for item in body.items]}
+    
+    if not 1 <= body.num_simulations <= MAX_JOB_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"num_simulations must be between 1 and {MAX_JOB_SIMULATIONS}")
+    track_id = resolve_track_or_404(body.track_id)
+    if kind == "compare":
+        if not 2 <= len(body.strategies) <= MAX_JOB_STRATEGIES:
+            raise HTTPException(status_code=400, detail=f"Between 2 and {MAX_JOB_STRATEGIES} strategies are required for comparison")
+        strategies = [
+            {**s.model_dump(exclude={"name"}), "name": s.name or f"Strategy {i + 1}"}
+            for i, s in enumerate(body.strategies)
+        ]
+    else:
+        if body.strategies is not None and not 1 <= len(body.strategies) <= MAX_JOB_STRATEGIES:
+            raise HTTPException(status_code=400, detail=f"Between 1 and {MAX_JOB_STRATEGIES} strategies are allowed")
+        strategies = [s.model_dump() for s in body.strategies] if body.strategies is not None else None
+    return {"strategies": strategies, "weather": body.weather, "track_id": track_id, "num_simulations": body.num_simulations}
+
+# Job endpoints are sync so FastAPI runs them in its threadpool; the
+# SQLite and DynamoDB stores make blocking calls. Polling and cancelling are
+# cheap reads and writes, so they are limited per minute rather than per day:
+# a client polling every second must be able to reach its own result.
+@app.post("/jobs", status_code=202)
+@limiter.limit("100/day")
+def submit_job_endpoint(request: Request, body: JobRequest):
+    """
+    Submit a long-running simulation as a background job.
+    
+    Poll the URL in the Location header for progress and the result.
+    
+    - **kind**: compare, batch or frontier
+    - **params**: The body of /compare-strategies, /simulate-race/batch or a frontier request
+    """
+    if body.kind not in JOB_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(JOB_HANDLERS)}")
+    params = validate_job_params(body.kind, body.params)
+    job = get_job_manager().submit(body.kind, params)
+    location = f"/jobs/{job.job_id}"
+    return JSONResponse(
+        status_code=202,
+        content={"status": "accepted", "job": job.to_dict(include_result=False), "location": location},
+        headers={"Location": location}
+    )
+
+@app.get("/jobs/{job_id}")
+@limiter.limit("120/minute")
+def get_job_endpoint(request: Request, job_id: str):
+    """Get a job's status and progress, plus its result once it has succeeded"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return fast_response({"status": "success", "job": job.to_dict()}, request.headers.get("accept-encoding"))
+
+@app.delete("/jobs/{job_id}")
+@limiter.limit("120/minute")
+def cancel_job_endpoint(request: Request, job_id: str):
+    """Cancel a job; running jobs stop at their next progress update"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return {"status": "success", "job": job.to_dict(include_result=False)}
+
+async def receive_race_messages(websocket: WebSocket, inbox: "asyncio.Queue[Optional[Dict[str, Any]]]"):
+    """Forward client messages to the race loop; None signals a disconnect"""
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                message = None
+            inbox.put_nowait(message if isinstance(message, dict) else {"type": "invalid"})
+    except WebSocketDisconnect:
+        inbox.put_nowait(None)
+
+@app.websocket("/ws/race")
+async def race_feed_endpoint(websocket: WebSocket):
+    """
+    Live multi-car race, simulated and pushed one lap at a time.
+    
+    The client opens with {"type": "start"} plus the /simulate-multi-car
+    fields and an optional lap_interval (seconds between laps). The server
+    replies with a "started" snapshot, then one compact "lap" delta per lap
+    and "finished" standings at the end. Between laps the client may send
+    "update_strategy" (car_id and the remaining pit_stops/tires), "pause",
+    "resume" or "stop"; strategy changes apply from the next lap.
+    """
+    await websocket.accept()
+    try:
+        message = await websocket.receive_json()
+        if message.get("type") != "start":
+            raise ValueError("First message must be a start message")
+        start = RaceFeedStart.model_validate(message)
+        # Laps run on the event loop, so the field size bounds how long each one blocks it
+        if start.car_configs and len(start.car_configs) > MAX_MULTI_CAR_CARS:
+            raise ValueError(f"At most {MAX_MULTI_CAR_CARS} cars per race")
+        track_id = track_db.resolve_track_id(start.track_id)
+        if track_id is None:
+            raise ValueError(f"Unknown track: {start.track_id}")
+    except (ValueError, AttributeError) as e:
+        # ValidationError is a ValueError
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+    except WebSocketDisconnect:
+        return
+    
+    car_configs = [c.model_dump() for c in start.car_configs] if start.car_configs else get_sample_car_configs()
+    lap_interval = min(max(start.lap_interval, 0.0), MAX_LAP_INTERVAL)
+    session = RaceSession(track_id)
+    inbox: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    receiver = asyncio.ensure_future(receive_race_messages(websocket, inbox))
+    paused = stopped = False
+    
+    try:
+        await websocket.send_json(session.start(car_configs, start.weather))
+        while not stopped:
+            # Apply everything the client sent since the last lap; block while paused
+            while not inbox.empty() or (paused and not stopped):
+                message = await inbox.get()
+                if message is None:
+                    return
+                kind = message.get("type")
+                if kind == "update_strategy":
+                    try:
+                        update = RaceStrategyUpdate.model_validate(message.get("strategy"))
+                        await websocket.send_json(session.update_strategy(message.get("car_id"), update.model_dump()))
+                    except ValueError as e:
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                elif kind in ("pause", "resume"):
+                    paused = kind == "pause"
+                    await websocket.send_json({"type": kind + "d", "lap": session.current_lap})
+                elif kind == "stop":
+                    stopped = True
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"Unknown message type: {kind}"})
+            if stopped:
+                break
+            
+            # One lap of at most MAX_MULTI_CAR_CARS cars takes well under a millisecond, so it runs on the event loop
+            delta = session.next_lap()
+            if delta is None:
+                break
+            await websocket.send_json(delta)
+            await asyncio.sleep(lap_interval)
+        
+        await websocket.send_json(session.standings())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
 # AWS Lambda handler
 handler = Mangum(app)
 
+# The track list and samples come from the index and code, so they are cheap
+# to build now; track details stay lazy so startup does not load every track
+with startup_report.measure("static_data"):
+    static_data.preload({"tracks": tracks_payload, "samples": samples_payload})
+
+startup_report.mark_ready()
+logger.info("Startup complete", extra={"startup": startup_report.summary()})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+import time
+import httpx
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import main
+
+STRATEGIES = [
+    {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"},
+    {"name": "Two stop", "pit_stops": [15, 35], "tires": ["Soft", "Medium", "Hard"], "driver_style": "aggressive"}
+]
+
+@pytest.fixture
+def client():
+    main.simulation_cache.clear()
+    return TestClient(main.app)
+
+class TestSimulationEndpoints:
+    def test_compare_strategies_is_cached(self, client):
+        first = client.post("/compare-strategies", json={"strategies": STRATEGIES})
+        second = client.post("/compare-strategies", json={"strategies": STRATEGIES})
+
+        assert first.status_code == 200
+        comparison = first.json()["comparison"]
+        assert [s["name"] for s in comparison["strategies"]] == ["Strategy 1", "Two stop"]
+        assert second.json() == first.json()
+        assert main.simulation_cache.stats()["hits"] == 1
+
+    def test_compare_strategies_validation(self, client):
+        assert client.post("/compare-strategies", json={"strategies": STRATEGIES[:1]}).status_code == 400
+        body = {"strategies": STRATEGIES, "num_simulations": 1000}
+        assert client.post("/compare-strategies", json=body).status_code == 400
+
+    def test_multi_car_defaults_to_sample_grid(self, client):
+        response = client.post("/simulate-multi-car", json={"track_id": "monza"})
+
+        assert response.status_code == 200
+        simulation = response.json()["simulation"]
+        assert len(simulation) == 53
+        assert len(simulation[0]["cars"]) == len(main.get_sample_car_configs())
+
+    def test_multi_car_limits_field_size(self, client):
+        car = {"car_id": "C", "driver_name": "Driver", "strategy": STRATEGIES[0]}
+        cars = [{**car, "car_id": f"C{i}"} for i in range(main.MAX_MULTI_CAR_CARS + 1)]
+
+        assert client.post("/simulate-multi-car", json={"car_configs": cars}).status_code == 400
+
+    def test_weather_forecast(self, client):
+        response = client.get("/weather-forecast", params={"track_id": "spa", "scenario": 3})
+
+        assert response.status_code == 200
+        assert len(response.json()["forecast"]) == 44
+        assert client.get("/weather-forecast", params={"track_id": "spa", "scenario": 3}).json() == response.json()
+
+    def test_weather_forecast_limits(self, client):
+        for total_laps in (-1, main.MAX_FORECAST_LAPS + 1):
+            assert client.get("/weather-forecast", params={"total_laps": total_laps}).status_code == 400
+        assert client.get("/weather-forecast", params={"track_id": "spa", "total_laps": 10, "scenario": 3}).status_code == 400
+        assert len(client.get("/weather-forecast", params={"total_laps": 10}).json()["forecast"]) == 10
+
+class TestTrackEndpoints:
+    def test_tracks(self, client):
+        assert len(client.get("/tracks").json()["tracks"]) == 5
+        assert client.get("/tracks/british").json()["track"]["id"] == "silverstone"
+        assert client.get("/tracks/nowhere").status_code == 404
+        assert client.post("/simulate-multi-car", json={"track_id": "nowhere"}).status_code == 404
+
+    def test_conditional_requests(self, client):
+        for path in ("/tracks", "/tracks/silverstone", "/samples"):
+            response = client.get(path, headers={"Accept-Encoding": "identity"})
+            etag = response.headers["etag"]
+            assert etag.startswith('"')
+            assert "max-age=" in response.headers["cache-control"]
+
+            revalidated = client.get(path, headers={"If-None-Match": etag})
+            assert revalidated.status_code == 304
+            assert revalidated.content == b""
+            assert client.get(path, headers={"If-None-Match": "W/" + etag}).status_code == 304
+            assert client.get(path, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+    def test_aliases_share_etag(self, client):
+        etag = client.get("/tracks/silverstone").headers["etag"]
+        assert client.get("/tracks/british").headers["etag"] == etag
+        assert client.get("/tracks/monza").headers["etag"] != etag
+
+    def test_gzip_body_has_its_own_etag(self, client):
+        plain = client.get("/samples", headers={"Accept-Encoding": "identity"})
+        compressed = client.get("/samples", headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.headers["etag"] != plain.headers["etag"]
+        assert compressed.json() == plain.json()
+        assert client.get("/samples", headers={"If-None-Match": compressed.headers["etag"]}).status_code == 304
+
+class TestBatchSimulation:
+    def items(self):
+        return [
+            {"strategy": STRATEGIES[0], "track_id": "spa", "seed": 1},
+            {"strategy": STRATEGIES[1], "track_id": "silverstone", "seed": 2},
+            {"strategy": STRATEGIES[0], "track_id": "belgian", "seed": 1, "weather": "wet"},
+            {"strategy": STRATEGIES[0], "track_id": "spa", "seed": 1}
+        ]
+
+    def test_results_in_request_order_and_reproducible(self, client):
+        response = client.post("/simulate-race/batch", json={"items": self.items()})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["index"] for r in results] == [0, 1, 2, 3]
+        assert [r["track_id"] for r in results] == ["spa", "silverstone", "spa", "spa"]
+        assert len(results[0]["simulation"]) == 44
+        # Same seed, same race, regardless of what else is in the batch
+        assert results[0]["simulation"] == results[3]["simulation"]
+        assert results[2]["total_time"] > results[0]["total_time"]
+
+    def test_unknown_track_is_a_per_item_error(self, client):
+        items = [{"strategy": STRATEGIES[0], "track_id": "atlantis"}, {"strategy": STRATEGIES[0], "track_id": "spa"}]
+        results = client.post("/simulate-race/batch", json={"items": items}).json()["results"]
+
+        assert results[0] == {"index": 0, "status": "error", "detail": "Unknown track"}
+        assert results[1]["status"] == "success"
+
+    def test_streaming(self, client):
+        response = client.post("/simulate-race/batch", json={"items": self.items(), "stream": True})
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(r["index"] for r in lines) == [0, 1, 2, 3]
+        assert all(r["status"] == "success" for r in lines)
+
+class TestSharedSimulations:
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        main.simulation_cache.clear()
+        main.simulation_flights.clear()
+
+    def async_client(self):
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://testserver")
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_races_share_one_run(self):
+        calls = []
+
+        def slow_race(strategy, weather, cancel_token=None):
+            calls.append(strategy)
+            time.sleep(0.1)
+            return [{"lap": 1, "lap_time": 90.0, "tire_wear": 1.0, "position": 1, "fuel_load": 1.0}]
+
+        body = {"strategy": STRATEGIES[0], "weather": "dry"}
+        with patch.object(main, "simulate_race", slow_race):
+            async with self.async_client() as client:
+                responses = await asyncio.gather(*[client.post("/simulate-race", json=body) for _ in range(4)])
+                other = await client.post("/simulate-race", json={**body, "weather": "wet"})
+                stats = (await client.get("/debug/simulation-stats")).json()
+
+        assert len(calls) == 2
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert sorted(r.headers["x-simulation-shared"] for r in responses) == ["false", "true", "true", "true"]
+        assert other.headers["x-simulation-shared"] == "false"
+        assert stats["flights"]["race"]["calls"] == 2
+        assert stats["flights"]["race"]["shared"] == 3
+
+    @pytest.mark.asyncio
+    async def test_shared_forecasts(self):
+        async with self.async_client() as client:
+            responses = await asyncio.gather(*[
+                client.get("/weather-forecast", params={"track_id": "spa"}) for _ in range(3)
+            ])
+
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert main.simulation_flights["weather_forecast"].calls + main.simulation_flights["weather_forecast"].shared == 3
+
+    @pytest.mark.asyncio
+    async def test_run_continues_while_any_client_waits(self):
+        started = threading.Event()
+
+        def slow_race(strategy, weather, cancel_token=None):
+            started.set()
+            for _ in range(20):
+                cancel_token.raise_if_cancelled()
+                time.sleep(0.01)
+            return [{"lap": 1, "lap_time": 90.0, "tire_wear": 1.0, "position": 1, "fuel_load": 1.0}]
+
+        body = {"strategy": STRATEGIES[0]}
+        with patch.object(main, "simulate_race", slow_race):
+            async with self.async_client() as client:
+                first = asyncio.ensure_future(client.post("/simulate-race", json=body))
+                second = asyncio.ensure_future(client.post("/simulate-race", json=body))
+                await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+                first.cancel()
+                response = await second
+
+        assert response.status_code == 200
+        assert main.simulation_flights["race"].stats()["abandoned"] == 0
+
+class TestStartup:
+    def test_llm_sdk_is_not_imported_at_startup(self):
+        import subprocess
+        import sys
+        code = "import sys, main; print('google.generativeai' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+
+        assert output.strip().splitlines()[-1] == "False"
+
+    def test_startup_report(self, client):
+        report = client.get("/debug/startup").json()["report"]
+
+        assert report["startup_seconds"] > 0
+        assert {"fastapi", "api.simulation", "api.strategy"} <= {m["module"] for m in report["modules"]}
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from api.cache import TTLCache, SingleFlight
+from api import strategy
+
+class TestTTLCache:
+    def test_entries_expire(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("key", fetch) for _ in range(5)])
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.stats() == {"calls": 1, "shared": 4, "abandoned": 0, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_exceptions_reach_every_waiter(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_call_is_cancelled_after_last_waiter(self):
+        flight = SingleFlight(cancel_abandoned=True)
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flight.do("key", slow)) for _ in range(2)]
+        await asyncio.sleep(0)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+        assert "key" in flight
+
+        waiters[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert flight.stats()["abandoned"] == 1
+        assert "key" not in flight
+
+    @pytest.mark.asyncio
+    async def test_call_outlives_waiters_by_default(self):
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            finished.set()
+
+        waiter = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.wait_for(finished.wait(), 1)
+
+class TestRecommendationCache:
+    def setup_method(self):
+        strategy.recommendation_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_identical_scenarios_share_one_model_call(self):
+        payload = {
+            "pit_stop_timing": "Pit on lap 20",
+            "tire_compound_strategy": "Medium to Hard",
+            "driver_approach_adjustments": "Stay balanced",
+            "potential_time_savings_or_risks": "About 2 seconds"
+        }
+
+        async def generate(prompt):
+            await asyncio.sleep(0.01)
+            return MagicMock(text=json.dumps(payload))
+
+        client = MagicMock()
+        client.generate_content_async = AsyncMock(side_effect=generate)
+
+        with patch.object(strategy, "genai_client", client):
+            results = await asyncio.gather(
+                strategy.get_strategy_recommendation("Pit at lap 20, Medium → Hard"),
+                strategy.get_strategy_recommendation("pit at lap 20,  medium → hard")
+            )
+            repeat = await strategy.get_strategy_recommendation("Pit at lap 20, Medium → Hard")
+
+        assert results == [payload, payload]
+        assert repeat == payload
+        assert client.generate_content_async.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_fallbacks_are_not_cached(self):
+        client = MagicMock()
+        client.generate_content_async = AsyncMock(side_effect=RuntimeError("unavailable"))
+
+        with patch.object(strategy, "genai_client", client):
+            await strategy.get_strategy_recommendation("wet weather")
+            await strategy.get_strategy_recommendation("wet weather")
+
+        assert client.generate_content_async.await_count == 2
+        assert len(strategy.recommendation_cache) == 0
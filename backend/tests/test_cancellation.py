@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import main
+from api.cancellation import CancellationToken, SimulationCancelled
+from api.executor import SimulationExecutor
+from api.jobs import JobManager, MemoryJobStore, JobCancelled, JOB_HANDLERS, JOB_CANCELLED
+from api.multi_car_simulation import MultiCarSimulator, create_sample_car_configs
+from api.simulation import simulate_race, compare_strategies
+
+STRATEGY = {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}
+
+class CountingToken(CancellationToken):
+    """Cancels itself after a fixed number of checks"""
+
+    def __init__(self, checks_allowed):
+        super().__init__()
+        self.checks_allowed = checks_allowed
+        self.checks = 0
+
+    def raise_if_cancelled(self):
+        self.checks += 1
+        if self.checks > self.checks_allowed:
+            self.cancel()
+        super().raise_if_cancelled()
+
+class TestCancellationToken:
+    def test_cancel_keeps_first_reason(self):
+        token = CancellationToken()
+        assert not token.cancelled
+        token.cancel("client disconnected")
+        token.cancel("timeout")
+
+        with pytest.raises(SimulationCancelled) as exc:
+            token.raise_if_cancelled()
+        assert exc.value.reason == "client disconnected"
+
+    def test_deadline(self):
+        now = [0.0]
+        token = CancellationToken(timeout=5, clock=lambda: now[0])
+        assert not token.cancelled
+        now[0] = 5.0
+        assert token.cancelled
+        assert token.reason == "timeout"
+
+    def test_job_cancelled_is_a_simulation_cancellation(self):
+        assert issubclass(JobCancelled, SimulationCancelled)
+
+class TestCancellableSimulations:
+    def test_simulate_race_stops_between_laps(self):
+        token = CountingToken(10)
+        with pytest.raises(SimulationCancelled):
+            simulate_race(STRATEGY, cancel_token=token)
+        assert token.checks == 11
+
+    def test_multi_car_race_stops_between_laps(self):
+        token = CountingToken(3)
+        simulator = MultiCarSimulator("silverstone")
+        with pytest.raises(SimulationCancelled):
+            simulator.simulate_race(create_sample_car_configs(), cancel_token=token)
+        assert token.checks == 4
+
+    def test_comparison_stops_mid_strategy(self):
+        # Each simulation checks once before it starts and once per lap
+        token = CountingToken(5)
+        with pytest.raises(SimulationCancelled):
+            compare_strategies([STRATEGY, STRATEGY], num_simulations=20, cancel_token=token)
+        assert token.checks == 6
+
+    def test_uncancelled_token_changes_nothing(self):
+        assert len(simulate_race(STRATEGY, cancel_token=CancellationToken())) == len(simulate_race(STRATEGY))
+
+class TestExecutorCancellation:
+    @pytest.mark.asyncio
+    async def test_abandoned_run_frees_worker(self):
+        executor = SimulationExecutor("thread", max_workers=1, max_queue=0)
+        started = threading.Event()
+
+        def spin(cancel_token):
+            started.set()
+            while True:
+                cancel_token.raise_if_cancelled()
+
+        token = CancellationToken()
+        task = asyncio.ensure_future(executor.run(spin, cancel_token=token))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert token.reason == "abandoned"
+        # The worker exits at its next check and takes new work
+        for _ in range(100):
+            if executor.in_flight() == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.in_flight() == 0
+        assert await executor.run(lambda: "free") == "free"
+        executor.shutdown()
+
+class TestJobCancellation:
+    def test_cancel_reaches_running_job_between_laps(self):
+        manager = JobManager(MemoryJobStore(), workers=1)
+        started = threading.Event()
+        checks = []
+
+        def handler(params, report, token):
+            started.set()
+            while True:
+                checks.append(1)
+                token.raise_if_cancelled()
+
+        with patch.dict(JOB_HANDLERS, {"test": handler}):
+            job = manager.submit("test", {})
+            assert started.wait(5)
+            manager.cancel(job.job_id)
+            manager.queue.join()
+
+        assert manager.get(job.job_id).status == JOB_CANCELLED
+        assert checks
+
+class TestRequestCancellation:
+    def test_timeout_returns_504(self):
+        main.simulation_cache.clear()
+        client = TestClient(main.app)
+        with patch.object(main, "SIMULATION_TIMEOUT", 0.0):
+            response = client.post("/simulate-race", json={"strategy": STRATEGY})
+            comparison = client.post("/compare-strategies", json={"strategies": [STRATEGY, STRATEGY]})
+
+        assert response.status_code == 504
+        assert comparison.status_code == 504
+        assert client.post("/simulate-race", json={"strategy": STRATEGY}).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_closing_batch_stream_cancels_groups(self):
+        tokens = []
+        started = threading.Event()
+
+        class RecordingToken(CancellationToken):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tokens.append(self)
+
+        def spin(track_id, indexed_items, cancel_token=None):
+            started.set()
+            for _ in range(500):
+                cancel_token.raise_if_cancelled()
+                threading.Event().wait(0.01)
+            return []
+
+        batches = [("silverstone", [(0, {})]), ("monza", [(1, {})])]
+        with patch.object(main, "simulate_track_batch", spin), patch.object(main, "CancellationToken", RecordingToken):
+            stream = main.stream_batch_results(batches)
+            first = asyncio.ensure_future(stream.__anext__())
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            # What a client disconnect does to the response body
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            await stream.aclose()
+
+            for _ in range(100):
+                if main.simulation_executor.in_flight() == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert len(tokens) == 2
+        assert all(token.reason == "abandoned" for token in tokens)
+        assert main.simulation_executor.in_flight() == 0
@@ -0,0 +1,57 @@
+import asyncio
+import math
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from api.executor import SimulationExecutor, ExecutorSaturated
+
+class TestSimulationExecutor:
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        executor = SimulationExecutor("thread", max_workers=2, max_queue=0)
+        loop_thread = threading.get_ident()
+
+        thread = await executor.run(threading.get_ident)
+
+        assert thread != loop_thread
+        assert executor.stats()["completed"] == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_queue_depth(self):
+        executor = SimulationExecutor("thread", max_workers=1, max_queue=1, retry_after=2)
+        release = threading.Event()
+
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturated) as exc:
+            await executor.run(release.wait, 5)
+
+        assert exc.value.retry_after == 2
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert executor.in_flight() == 0
+        assert executor.rejected == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self):
+        executor = SimulationExecutor("process", max_workers=1)
+
+        assert await executor.run(math.factorial, 10) == 3628800
+        assert executor._pool._mp_context.get_start_method() != "fork"
+        executor.shutdown()
+
+class TestSimulateRaceEndpoint:
+    def test_saturated_executor_returns_503(self):
+        import main
+        client = TestClient(main.app)
+        body = {"strategy": {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}}
+
+        assert client.post("/simulate-race", json=body).status_code == 200
+        with patch.object(main.simulation_executor, "max_queue", -main.simulation_executor.max_workers):
+            response = client.post("/simulate-race", json=body)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,253 @@
+import os
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import main
+from api.jobs import (
+    Job, JobManager, JobStore, MemoryJobStore, SQLiteJobStore, LocalJobQueue, JOB_HANDLERS, create_job_manager,
+    JOB_QUEUED, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED
+)
+
+STRATEGIES = [
+    {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"},
+    {"pit_stops": [15, 35], "tires": ["Soft", "Medium", "Hard"], "driver_style": "aggressive"}
+]
+
+class RecordingQueue:
+    """Holds job ids so tests decide when each job runs"""
+
+    def __init__(self):
+        self.job_ids = []
+
+    def enqueue(self, job_id):
+        self.job_ids.append(job_id)
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    return MemoryJobStore()
+
+class TestJobStores:
+    def test_put_get_update(self, store):
+        store.put(Job(job_id="a", kind="compare", params={"x": 1}, expires_at=10))
+
+        updated = store.update("a", progress=0.5, result={"ok": True})
+
+        assert updated.progress == 0.5
+        job = store.get("a")
+        assert job.params == {"x": 1}
+        assert job.result == {"ok": True}
+        assert store.get("missing") is None
+        assert store.update("missing", progress=1.0) is None
+
+    def test_purge_expired(self, store):
+        store.put(Job(job_id="old", kind="compare", params={}, expires_at=10))
+        store.put(Job(job_id="new", kind="compare", params={}, expires_at=30))
+
+        assert store.purge_expired(20) == 1
+        assert store.get("old") is None
+        assert store.get("new") is not None
+
+class TestJobManager:
+    @pytest.fixture
+    def manager(self, store, clock):
+        return JobManager(store, RecordingQueue(), ttl=60, clock=clock)
+
+    def test_submit_and_run(self, manager):
+        seen = []
+
+        def handler(params, report, token):
+            for i in range(4):
+                report((i + 1) / 4)
+                seen.append(manager.get(job.job_id).progress)
+            return {"total": params["n"]}
+
+        with patch.dict(JOB_HANDLERS, {"test": handler}):
+            job = manager.submit("test", {"n": 3})
+            assert manager.get(job.job_id).status == JOB_QUEUED
+            manager.run_job(job.job_id)
+
+        finished = manager.get(job.job_id)
+        assert seen == [0.25, 0.5, 0.75, 1.0]
+        assert finished.status == JOB_SUCCEEDED
+        assert finished.result == {"total": 3}
+
+    def test_failure_is_recorded(self, manager):
+
+        def handler(params, report, token):
+            raise RuntimeError("boom")
+
+        with patch.dict(JOB_HANDLERS, {"test": handler}):
+            job = manager.submit("test", {})
+            manager.run_job(job.job_id)
+
+        assert manager.get(job.job_id).status == JOB_FAILED
+        assert manager.get(job.job_id).error == "boom"
+
+    def test_cancel_queued_job_never_runs(self, manager):
+        calls = []
+
+        with patch.dict(JOB_HANDLERS, {"test": lambda params, report, token: calls.append(1)}):
+            job = manager.submit("test", {})
+            assert manager.cancel(job.job_id).status == JOB_CANCELLED
+            manager.run_job(job.job_id)
+
+        assert calls == []
+        assert manager.get(job.job_id).status == JOB_CANCELLED
+
+    def test_cancel_running_job_stops_at_next_progress(self, manager):
+        steps = []
+
+        def handler(params, report, token):
+            for i in range(10):
+                if i == 2:
+                    manager.cancel(job.job_id)
+                steps.append(i)
+                report((i + 1) / 10)
+
+        with patch.dict(JOB_HANDLERS, {"test": handler}):
+            job = manager.submit("test", {})
+            manager.run_job(job.job_id)
+
+        assert steps == [0, 1, 2]
+        assert manager.get(job.job_id).status == JOB_CANCELLED
+
+    def test_results_expire(self, manager, clock):
+
+        with patch.dict(JOB_HANDLERS, {"test": lambda params, report, token: 1}):
+            job = manager.submit("test", {})
+            clock.now += 30
+            manager.run_job(job.job_id)
+
+        # The ttl restarts when the job finishes
+        clock.now += 59
+        assert manager.get(job.job_id).result == 1
+        clock.now += 2
+        assert manager.get(job.job_id) is None
+
+    def test_unknown_kind(self, manager):
+        with pytest.raises(ValueError):
+            manager.submit("nope", {})
+
+    def test_compare_job_reports_per_strategy(self, manager):
+        job = manager.submit("compare", {"strategies": STRATEGIES, "num_simulations": 2})
+        progress = []
+        original_update = manager.store.update
+
+        def tracking_update(job_id, **fields):
+            if "progress" in fields:
+                progress.append(fields["progress"])
+            return original_update(job_id, **fields)
+
+        with patch.object(manager.store, "update", side_effect=tracking_update):
+            manager.run_job(job.job_id)
+
+        finished = manager.get(job.job_id)
+        assert finished.status == JOB_SUCCEEDED
+        assert progress[:2] == [0.5, 1.0]
+        assert len(finished.result["strategies"]) == 2
+
+    def test_frontier_job_reports_per_candidate(self, manager):
+        job = manager.submit("frontier", {"strategies": STRATEGIES, "num_simulations": 2})
+        progress = []
+        original_update = manager.store.update
+
+        def tracking_update(job_id, **fields):
+            if "progress" in fields:
+                progress.append(fields["progress"])
+            return original_update(job_id, **fields)
+
+        with patch.object(manager.store, "update", side_effect=tracking_update):
+            manager.run_job(job.job_id)
+
+        assert manager.get(job.job_id).status == JOB_SUCCEEDED
+        assert progress[:2] == [0.5, 1.0]
+
+    def test_frontier_job_sees_stored_cancel(self, manager):
+        job = manager.submit("frontier", {"strategies": STRATEGIES, "num_simulations": 2})
+        original_update = manager.store.update
+
+        def cancel_on_progress(job_id, **fields):
+            if "progress" in fields:
+                # As if another instance had cancelled the job
+                fields["cancel_requested"] = True
+            return original_update(job_id, **fields)
+
+        with patch.object(manager.store, "update", side_effect=cancel_on_progress):
+            manager.run_job(job.job_id)
+
+        assert manager.get(job.job_id).status == JOB_CANCELLED
+
+class TestCreateJobManager:
+    def test_store_is_abstract(self):
+        with pytest.raises(TypeError):
+            JobStore()
+
+    def test_sqs_needs_a_shared_store(self):
+        for store_kind in ("memory", "sqlite"):
+            with patch.dict(os.environ, {"JOB_QUEUE": "sqs", "JOB_STORE": store_kind}):
+                with pytest.raises(ValueError):
+                    create_job_manager()
+
+class TestLocalJobQueue:
+    def test_workers_drain_queue(self):
+        manager = JobManager(MemoryJobStore(), workers=2)
+
+        with patch.dict(JOB_HANDLERS, {"test": lambda params, report, token: params["n"] * 2}):
+            jobs = [manager.submit("test", {"n": n}) for n in range(5)]
+            manager.queue.join()
+
+        assert isinstance(manager.queue, LocalJobQueue)
+        assert [manager.get(job.job_id).result for job in jobs] == [0, 2, 4, 6, 8]
+
+class TestJobEndpoints:
+    @pytest.fixture
+    def client(self):
+        manager = JobManager(MemoryJobStore(), RecordingQueue())
+        with patch("main.get_job_manager", return_value=manager):
+            yield TestClient(main.app), manager
+
+    def test_submit_poll_and_cancel(self, client):
+        client, manager = client
+        response = client.post("/jobs", json={"kind": "compare", "params": {"strategies": STRATEGIES, "num_simulations": 2}})
+
+        assert response.status_code == 202
+        location = response.headers["location"]
+        assert response.json()["job"]["status"] == JOB_QUEUED
+        assert client.get(location).json()["job"]["status"] == JOB_QUEUED
+
+        manager.run_job(manager.queue.job_ids[0])
+        job = client.get(location).json()["job"]
+        assert job["status"] == JOB_SUCCEEDED
+        assert job["progress"] == 1.0
+        assert job["result"]["winner"]["name"]
+
+        assert client.delete(location).json()["job"]["status"] == JOB_SUCCEEDED
+
+    def test_accepts_larger_batches_than_sync_endpoint(self, client):
+        client, manager = client
+        items = [{"strategy": STRATEGIES[0], "seed": i} for i in range(main.MAX_BATCH_SIMULATIONS + 1)]
+
+        assert client.post("/simulate-race/batch", json={"items": items}).status_code == 400
+        response = client.post("/jobs", json={"kind": "batch", "params": {"items": items}})
+        assert response.status_code == 202
+
+        manager.run_job(manager.queue.job_ids[0])
+        results = client.get(response.headers["location"]).json()["job"]["result"]["results"]
+        assert [r["index"] for r in results] == list(range(len(items)))
+
+    def test_validation(self, client):
+        client, _ = client
+        assert client.post("/jobs", json={"kind": "nope", "params": {}}).status_code == 400
+        assert client.post("/jobs", json={"kind": "compare", "params": {"strategies": "x"}}).status_code == 422
+        assert client.post("/jobs", json={"kind": "compare", "params": {"strategies": STRATEGIES, "track_id": "nowhere"}}).status_code == 404
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.delete("/jobs/missing").status_code == 404
+
+    def test_polling_is_not_held_to_the_daily_limit(self, client):
+        client, manager = client
+        main.limiter.reset()
+        location = client.post("/jobs", json={"kind": "compare", "params": {"strategies": STRATEGIES}}).headers["location"]
+
+        assert all(client.get(location).status_code == 200 for _ in range(110))
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from api.llm_client import LLMClient, CircuitBreaker, CircuitOpenError, hedge
+from api import strategy
+
+class StubUpstream:
+    """Stand-in for the model API with configurable latency and failures"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False, text: str = "ok"):
+        self.delay = delay
+        self.fail = fail
+        self.text = text
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, prompt: str) -> str:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("upstream error")
+            return self.text
+        finally:
+            self.active -= 1
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_recovers(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        clock.now = 10
+        assert breaker.allow()
+        # Only one trial call while half-open
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 5
+        assert breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow()
+
+class TestLLMClient:
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        upstream = StubUpstream(delay=0.02)
+        client = LLMClient(upstream, max_concurrency=2, timeout=1)
+
+        results = await asyncio.gather(*[client.generate("p") for _ in range(6)])
+
+        assert results == ["ok"] * 6
+        assert upstream.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        client = LLMClient(StubUpstream(delay=1), timeout=0.05)
+
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            await client.generate("p")
+        assert time.perf_counter() - start < 0.5
+        assert client.timeouts == 1
+
+    @pytest.mark.asyncio
+    async def test_queueing_does_not_count_against_deadline(self):
+        upstream = StubUpstream(delay=0.1)
+        client = LLMClient(upstream, max_concurrency=1, timeout=0.3,
+                           breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+
+        # Each call takes a third of its deadline, but the last one queues behind the others for longer
+        results = await asyncio.gather(*[client.generate("p") for _ in range(5)])
+
+        assert results == ["ok"] * 5
+        assert client.timeouts == 0
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_upstream(self):
+        upstream = StubUpstream(fail=True)
+        client = LLMClient(upstream, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await client.generate("p")
+        with pytest.raises(CircuitOpenError):
+            await client.generate("p")
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_hedge_returns_fallback_after_budget(self):
+        upstream = StubUpstream(delay=0.2)
+
+        start = time.perf_counter()
+        result = await hedge(lambda: upstream("p"), lambda: "local", 0.02)
+
+        assert result == "local"
+        assert time.perf_counter() - start < 0.15
+        assert await hedge(lambda: StubUpstream()("p"), lambda: "local", 0.5) == "ok"
+
+class TestRecommendationFallback:
+    def setup_method(self):
+        strategy.recommendation_cache.clear()
+        strategy.llm_client.breaker.record_success()
+
+    @pytest.mark.asyncio
+    async def test_slow_model_answers_locally_then_fills_cache(self):
+        payload = {
+            "pit_stop_timing": "Pit on lap 22",
+            "tire_compound_strategy": "Medium to Hard",
+            "driver_approach_adjustments": "Stay balanced",
+            "potential_time_savings_or_risks": "About 1 second"
+        }
+        upstream = StubUpstream(delay=0.1, text=json.dumps(payload))
+
+        with patch.object(strategy, "genai_client", MagicMock()), \
+             patch.object(strategy.llm_client, "transport", upstream), \
+             patch.object(strategy, "LLM_HEDGE_AFTER", 0.01):
+            first = await strategy.get_strategy_recommendation("slow scenario")
+            await asyncio.sleep(0.2)
+            second = await strategy.get_strategy_recommendation("slow scenario")
+
+        assert first != payload
+        assert set(first) == set(payload)
+        assert second == payload
+        assert upstream.calls == 1
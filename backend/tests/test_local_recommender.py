@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import patch
+from api.local_recommender import parse_scenario, recommend_strategy
+from api.simulation import RaceSimulator
+from api.strategy import get_local_recommendation
+
+SCENARIO = "Pit stops at laps 15, 35, using Medium → Hard → Soft, driver style: balanced"
+
+class TestParseScenario:
+    def test_frontend_scenario(self):
+        parsed = parse_scenario(SCENARIO)
+
+        assert parsed.pit_stops == [15, 35]
+        assert parsed.tires == ["Medium", "Hard", "Soft"]
+        assert parsed.driver_style == "balanced"
+        assert parsed.weather == "dry"
+        assert parsed.track_id == "silverstone"
+
+    def test_weather_and_track(self):
+        parsed = parse_scenario("Monaco, wet weather, pit on lap 30 with Intermediate → Wet, aggressive")
+
+        assert parsed.weather == "wet"
+        assert parsed.tires == ["Intermediate", "Wet"]
+        assert parsed.pit_stops == [30]
+        assert parsed.track_id == "monaco"
+
+    def test_trailing_compound_is_not_weather(self):
+        parsed = parse_scenario("Pit at lap 20, Intermediate → Wet")
+
+        assert parsed.weather == "dry"
+        assert parsed.tires == ["Intermediate", "Wet"]
+
+    def test_track_aliases(self):
+        assert parse_scenario("Spa-Francorchamps in the rain, pit on lap 20, Medium → Hard").track_id == "spa"
+        assert parse_scenario("Japanese GP, pit on lap 25, Soft → Hard").track_id == "suzuka"
+
+    def test_unparseable_scenarios(self):
+        assert parse_scenario("aggressive driver with soft tires") is None
+        assert parse_scenario("Test scenario") is None
+
+class TestRecommendStrategy:
+    def test_suggestion_is_faster_and_concrete(self):
+        # The search uses the closed-form race time only, never a lap-by-lap simulation
+        with patch.object(RaceSimulator, "calculate_lap_time", side_effect=AssertionError("simulated a lap")):
+            recommendation = recommend_strategy(SCENARIO)
+
+        suggested = recommendation["suggested_strategy"]
+        simulator = RaceSimulator("silverstone")
+        current = simulator.expected_race_time([15, 35], ["Medium", "Hard", "Soft"], "balanced")
+        improved = simulator.expected_race_time(suggested["pit_stops"], suggested["tires"], suggested["driver_style"])
+
+        assert recommendation["predicted_time_delta"] == pytest.approx(improved - current, abs=1e-3)
+        assert improved <= current
+        assert len(suggested["pit_stops"]) == 2
+        assert sorted(suggested["tires"]) == ["Hard", "Medium", "Soft"]
+        assert str(suggested["pit_stops"][0]) in recommendation["pit_stop_timing"]
+
+    def test_local_fallback_uses_canned_text_when_unparsed(self):
+        assert "suggested_strategy" in get_local_recommendation(SCENARIO)
+        assert "suggested_strategy" not in get_local_recommendation("aggressive driver with soft tires")
@@ -0,0 +1,57 @@
+import io
+import json
+import logging
+import threading
+from logging.handlers import QueueHandler
+from unittest.mock import patch
+import pytest
+from api.logging_config import configure_logging, stop_logging, JsonFormatter, SamplingFilter
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    configure_logging(level="INFO", sample_rate=1.0, stream=stream)
+    yield stream
+    configure_logging()
+
+class TestStructuredLogging:
+    def test_records_are_json_lines(self, log_stream):
+        stream = log_stream
+        logger = logging.getLogger("tests.logging")
+        logger.info("simulated %s laps", 52, extra={"track_id": "spa"})
+        logger.debug("below the level")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        stop_logging()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [l["message"] for l in lines] == ["simulated 52 laps", "failed"]
+        assert lines[0]["track_id"] == "spa"
+        assert lines[0]["level"] == "INFO"
+        assert "ValueError: boom" in lines[1]["exception"]
+
+    def test_sampling_keeps_warnings(self):
+        sampler = SamplingFilter(rate=0.0)
+        info = logging.LogRecord("x", logging.INFO, "", 0, "info", None, None)
+        warning = logging.LogRecord("x", logging.WARNING, "", 0, "warning", None, None)
+
+        assert not sampler.filter(info)
+        assert sampler.filter(warning)
+
+    def test_formatting_happens_on_listener_thread(self, log_stream):
+        threads = []
+        original = JsonFormatter.format
+
+        def recording_format(self, record):
+            threads.append(threading.current_thread())
+            return original(self, record)
+
+        # Enqueueing is all the request thread pays for; formatting happens on the listener
+        assert any(isinstance(h, QueueHandler) for h in logging.getLogger().handlers)
+        with patch.object(JsonFormatter, "format", recording_format):
+            logging.getLogger("tests.logging.thread").info("probe")
+            stop_logging()
+
+        assert threads and threading.current_thread() not in threads
@@ -0,0 +1,114 @@
+import random
+import numpy as np
+import pytest
+from unittest.mock import patch
+from api import parallel
+from api.cancellation import CancellationToken, SimulationCancelled
+from api.parallel import ResultBuffer, RUN_OK, RUN_FAILED, draw_seeds, raise_for_failed_runs, run_monte_carlo
+from api.simulation import BatchRuns, simulate_track_batch
+from api.strategy_comparison import StrategyRuns, get_strategy_comparator
+
+STRATEGY = {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}
+
+def copy_results(buffer, statuses):
+    return {name: array.copy() for name, array in buffer.arrays.items()}, statuses
+
+class TestResultBuffer:
+    def test_record(self):
+        buffer = ResultBuffer(2, 3)
+        buffer.record(1, [
+            {"lap_time": 90.0, "tire_wear": 1.0, "position": 2},
+            {"lap_time": 91.0, "tire_wear": 2.0, "position": 1},
+            {"lap_time": 92.0, "tire_wear": 3.0, "position": 1}
+        ])
+
+        assert buffer.lap_time[1].tolist() == [90.0, 91.0, 92.0]
+        assert buffer.position[1].tolist() == [2, 1, 1]
+        assert buffer.total_time[1] == 273.0
+        assert buffer.total_time[0] == 0.0
+        buffer.close()
+
+    def test_attached_views_share_memory(self):
+        owner = ResultBuffer(4, 10, shared=True)
+        try:
+            view = ResultBuffer.attach(owner.spec)
+            view.lap_time[3, 9] = 88.5
+            view.cancel()
+            view.close()
+
+            assert owner.lap_time[3, 9] == 88.5
+            assert owner.cancelled
+            with pytest.raises(SimulationCancelled):
+                owner.raise_if_cancelled()
+        finally:
+            owner.close()
+            owner.unlink()
+
+    def test_local_buffer_has_no_spec(self):
+        with pytest.raises(ValueError):
+            ResultBuffer(1, 1).spec
+
+class TestRunMonteCarlo:
+    def task(self):
+        return StrategyRuns("silverstone", STRATEGY, "dry", 52)
+
+    def test_processes_match_in_process_runs(self):
+        seeds = draw_seeds(12, random.Random(4))
+        local, local_statuses = run_monte_carlo(self.task(), seeds, copy_results, workers=0)
+        shared, shared_statuses = run_monte_carlo(self.task(), seeds, copy_results, workers=2)
+
+        assert shared_statuses == local_statuses == [(i, RUN_OK, None) for i in range(12)]
+        for name in local:
+            assert np.array_equal(shared[name], local[name])
+        assert local["lap_time"].shape == (12, 52)
+
+    def test_failed_runs_are_reported(self):
+        task = StrategyRuns("silverstone", {**STRATEGY, "tires": []}, "dry", 52)
+        _, statuses = run_monte_carlo(task, [1, 2], copy_results, workers=2)
+
+        assert [status for _, status, _ in statuses] == [RUN_FAILED, RUN_FAILED]
+        with pytest.raises(RuntimeError):
+            raise_for_failed_runs(statuses)
+
+    def test_cancelled_token_stops_workers(self):
+        token = CancellationToken()
+        token.cancel("client disconnected")
+        with pytest.raises(SimulationCancelled) as exc:
+            run_monte_carlo(self.task(), draw_seeds(40), copy_results, token, workers=2)
+        assert exc.value.reason == "client disconnected"
+
+class TestParallelIntegration:
+    @pytest.fixture(autouse=True)
+    def enable_processes(self):
+        with patch.object(parallel, "MONTE_CARLO_WORKERS", 2), patch.object(parallel, "MONTE_CARLO_MIN_RUNS", 4):
+            yield
+
+    def test_batch_matches_sequential(self):
+        items = [
+            (0, {"strategy": STRATEGY, "seed": 1}),
+            (3, {"strategy": {**STRATEGY, "tires": []}, "seed": 2}),
+            (5, {"strategy": STRATEGY, "weather": "wet", "seed": 3}),
+            (7, {"strategy": STRATEGY, "seed": 1})
+        ]
+        shared = simulate_track_batch("silverstone", items)
+        with patch.object(parallel, "MONTE_CARLO_WORKERS", 0):
+            sequential = simulate_track_batch("silverstone", items)
+
+        assert shared == sequential
+        assert [r["status"] for r in shared] == ["success", "error", "success", "success"]
+
+    def test_comparison_evaluates_in_processes(self):
+        comparator = get_strategy_comparator("silverstone")
+        shared = comparator.evaluate_strategy(STRATEGY, "dry", 8, rng=random.Random(9))
+        again = comparator.evaluate_strategy(STRATEGY, "dry", 8, rng=random.Random(9))
+
+        with patch.object(parallel, "MONTE_CARLO_WORKERS", 0):
+            sequential = comparator.evaluate_strategy(STRATEGY, "dry", 8, rng=random.Random(9))
+
+        assert shared == again == sequential
+        assert shared.best_lap <= shared.average_lap
+
+    def test_batch_chunks_carry_only_their_items(self):
+        task = BatchRuns("silverstone", {i: {"strategy": STRATEGY, "seed": i} for i in range(10)}, 52)
+
+        assert list(task.chunk([3, 4]).items) == [3, 4]
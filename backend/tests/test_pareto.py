@@ -0,0 +1,75 @@
+import statistics
+import pytest
+from unittest.mock import patch
+from api.pareto import (
+    StrategyFrontierEngine, dominates, non_dominated, generate_candidate_strategies
+)
+from api.multi_car_simulation import MultiCarSimulator
+from api.simulation import compute_strategy_frontier
+from api.strategy_comparison import StrategyComparison
+
+class TestDominance:
+    def test_dominates(self):
+        assert dominates((1.0, 1.0), (2.0, 1.0))
+        assert not dominates((1.0, 1.0), (1.0, 1.0))
+        assert not dominates((1.0, 2.0), (2.0, 1.0))
+
+    def test_non_dominated(self):
+        points = [(3.0, 1.0, 0.0), (1.0, 3.0, 0.0), (2.0, 2.0, 0.0), (3.0, 3.0, 0.0), (1.0, 3.0, 1.0)]
+        assert non_dominated(points) == [1, 2, 0]
+
+class TestStrategyFrontierEngine:
+    def setup_method(self):
+        self.engine = StrategyFrontierEngine("silverstone")
+
+    def test_expected_time_matches_simulation(self):
+        strategy = {"pit_stops": [15, 35], "tires": ["Medium", "Hard", "Soft"], "driver_style": "balanced"}
+        simulator = MultiCarSimulator("silverstone")
+        car = {"car_id": "TEST", "driver_name": "Test", "strategy": strategy}
+        totals = [simulator.simulate_race([car])[-1]["cars"][0]["total_time"] for _ in range(20)]
+
+        assert statistics.mean(totals) == pytest.approx(self.engine.estimate_expected_time(strategy), abs=2.0)
+
+    def test_prune_keeps_fast_strategy(self):
+        fast = {"pit_stops": [17, 35], "tires": ["Soft", "Soft", "Hard"], "driver_style": "balanced"}
+        slow = {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "aggressive"}
+        bounds = [self.engine.estimate_bounds(i, s, "dry", 5, 4.0) for i, s in enumerate([fast, slow])]
+
+        survivors = self.engine.prune_dominated(bounds)
+        assert [b.index for b in survivors] == [0]
+
+    def test_compute_frontier(self):
+        candidates = generate_candidate_strategies("silverstone", max_stops=1, pit_lap_step=6)
+        frontier = self.engine.compute_frontier(candidates, num_simulations=3)
+
+        assert frontier.candidates_considered == len(candidates)
+        assert frontier.candidates_pruned + frontier.candidates_simulated == len(candidates)
+        assert frontier.candidates_pruned > 0
+        assert frontier.total_time == sorted(frontier.total_time)
+        assert len(frontier.names) == len(frontier.strategies) == len(frontier.risk_score)
+
+class TestComputeStrategyFrontier:
+    def test_frontier_structure(self):
+        strategies = [
+            {"name": "Two", "pit_stops": [17, 35], "tires": ["Soft", "Soft", "Hard"], "driver_style": "balanced"},
+            {"name": "Slow", "pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "aggressive"}
+        ]
+        result = compute_strategy_frontier(strategies, num_simulations=2)
+
+        assert result["frontier"]["name"] == ["Two"]
+        assert set(result["frontier"]) == {"name", "total_time", "risk_score", "time_variance"}
+        assert result["stats"] == {"candidates": 2, "pruned": 1, "simulated": 1}
+
+    def test_variance_is_not_an_objective(self):
+        engine = StrategyFrontierEngine("silverstone")
+        strategy = {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}
+
+        def evaluate(strategy, weather, num_simulations, cancel_token=None):
+            fast = strategy["name"] == "Fast"
+            return StrategyComparison(strategy["name"], 5000.0 if fast else 5001.0, [20], ["Medium", "Hard"], "balanced",
+                                      1, 90.0, 91.0, {}, {}, 0.1 if fast else 0.2, 3.0 if fast else 1.0)
+
+        with patch.object(engine.comparator, "evaluate_strategy", evaluate):
+            frontier = engine.compute_frontier([dict(strategy, name="Fast"), dict(strategy, name="Steady")])
+
+        assert frontier.names == ["Fast"]
@@ -0,0 +1,137 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+import main
+from api.multi_car_simulation import MultiCarSimulator, create_sample_car_configs
+from api.race_feed import RaceSession
+
+class TestIncrementalSimulation:
+    def test_steps_match_full_race(self):
+        random.seed(7)
+        full = MultiCarSimulator("silverstone").simulate_race(create_sample_car_configs())
+
+        random.seed(7)
+        simulator = MultiCarSimulator("silverstone")
+        state = simulator.start(create_sample_car_configs())
+        stepped = []
+        while not state.is_finished:
+            stepped.append(simulator.step(state))
+
+        assert stepped == full
+        assert simulator.step(state) is None
+
+    def test_update_strategy_changes_pit_stops(self):
+        simulator = MultiCarSimulator("silverstone")
+        state = simulator.start(create_sample_car_configs())
+        for _ in range(10):
+            simulator.step(state)
+
+        # VER was due to stop on lap 15; move the stop to lap 25 on hards
+        simulator.update_strategy(state, "VER", {"pit_stops": [25], "tires": ["Soft", "Hard"]})
+        pitted = []
+        while not state.is_finished:
+            simulator.step(state)
+            car = state.car("VER")
+            if car.last_pit_lap == state.current_lap:
+                pitted.append(state.current_lap)
+
+        assert pitted == [25]
+        assert car.current_tire == "Hard"
+        assert car.driver_style == "aggressive"
+
+    def test_update_strategy_validation(self):
+        simulator = MultiCarSimulator("silverstone")
+        state = simulator.start(create_sample_car_configs())
+        for _ in range(10):
+            simulator.step(state)
+
+        with pytest.raises(ValueError):
+            simulator.update_strategy(state, "XXX", {"pit_stops": [20], "tires": ["Soft", "Hard"]})
+        with pytest.raises(ValueError):
+            simulator.update_strategy(state, "VER", {"pit_stops": [5], "tires": ["Soft", "Hard"]})
+        with pytest.raises(ValueError):
+            simulator.update_strategy(state, "VER", {"pit_stops": [20], "tires": ["Soft"]})
+        with pytest.raises(ValueError):
+            simulator.update_strategy(state, "VER", {"pit_stops": [20], "tires": ["Medium", "Hard"]})
+
+    def test_interleaved_races_are_independent(self):
+        simulator = MultiCarSimulator("silverstone")
+        first = simulator.start(create_sample_car_configs(), rng=random.Random(1))
+        second = simulator.start(create_sample_car_configs(), rng=random.Random(1))
+        while not first.is_finished:
+            assert simulator.step(first) == simulator.step(second)
+
+class TestRaceSession:
+    def test_deltas(self):
+        session = RaceSession("silverstone")
+        snapshot = session.start(create_sample_car_configs())
+        deltas = []
+        while True:
+            delta = session.next_lap()
+            if delta is None:
+                break
+            deltas.append(delta)
+
+        assert len(deltas) == snapshot["total_laps"]
+        assert "VER" in deltas[14]["pits"]
+        assert deltas[14]["tires"]["VER"] == "Medium"
+        for delta in deltas:
+            assert set(delta["gaps"]) == {"VER", "HAM", "LEC", "NOR"}
+            assert (delta["order"] is None) == (not delta["positions"])
+        standings = session.standings()["results"]
+        assert [r["position"] for r in standings] == [1, 2, 3, 4]
+
+class TestRaceFeedEndpoint:
+    def test_full_race(self):
+        client = TestClient(main.app)
+        with client.websocket_connect("/ws/race") as ws:
+            ws.send_json({"type": "start", "track_id": "monza"})
+            started = ws.receive_json()
+            assert started["type"] == "started"
+            assert started["track_id"] == "monza"
+
+            messages = [ws.receive_json() for _ in range(started["total_laps"] + 1)]
+
+        assert [m["lap"] for m in messages[:-1]] == list(range(1, started["total_laps"] + 1))
+        assert messages[-1]["type"] == "finished"
+
+    def test_rejects_oversized_field(self):
+        car = {"car_id": "C", "driver_name": "Driver", "strategy": {"pit_stops": [20], "tires": ["Medium", "Hard"]}}
+        cars = [{**car, "car_id": f"C{i}"} for i in range(main.MAX_MULTI_CAR_CARS + 1)]
+        client = TestClient(main.app)
+        with client.websocket_connect("/ws/race") as ws:
+            ws.send_json({"type": "start", "car_configs": cars})
+            assert ws.receive_json()["type"] == "error"
+
+    def test_pause_update_and_stop(self):
+        client = TestClient(main.app)
+        with client.websocket_connect("/ws/race") as ws:
+            ws.send_json({"type": "pause"})
+            assert ws.receive_json()["type"] == "error"
+
+        with client.websocket_connect("/ws/race") as ws:
+            ws.send_json({"type": "start", "lap_interval": 0.05})
+            ws.receive_json()
+            ws.send_json({"type": "pause"})
+            message = ws.receive_json()
+            while message["type"] == "lap":
+                message = ws.receive_json()
+            assert message["type"] == "paused"
+            lap = message["lap"]
+
+            ws.send_json({"type": "update_strategy", "car_id": "HAM", "strategy": {"pit_stops": [lap + 5], "tires": ["Medium", "Soft"]}})
+            updated = ws.receive_json()
+            assert updated["type"] == "strategy_updated"
+            assert updated["strategy"]["pit_stops"] == [lap + 5]
+
+            ws.send_json({"type": "update_strategy", "car_id": "HAM", "strategy": {"pit_stops": [1], "tires": ["Medium", "Soft"]}})
+            assert ws.receive_json()["type"] == "error"
+
+            ws.send_json({"type": "resume"})
+            assert ws.receive_json() == {"type": "resumed", "lap": lap}
+            assert ws.receive_json()["lap"] == lap + 1
+            ws.send_json({"type": "stop"})
+            message = ws.receive_json()
+            while message["type"] == "lap":
+                message = ws.receive_json()
+            assert message["type"] == "finished"
@@ -0,0 +1,66 @@
+import gzip
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from api.serialization import (
+    encode_json, to_columnar, encode_binary, decode_binary, negotiate_encoding, fast_response
+)
+import main
+
+LAPS = [
+    {"lap": 1, "lap_time": 80.1, "tire_wear": 1.2, "position": 1, "fuel_load": 1.0},
+    {"lap": 2, "lap_time": 80.4, "tire_wear": 2.5, "position": 1, "fuel_load": None}
+]
+
+class TestEncoding:
+    def test_json_matches_standard_library(self):
+        payload = {"simulation": LAPS, "total": np.float64(160.5), "array": np.arange(3)}
+
+        assert json.loads(encode_json(payload)) == {"simulation": LAPS, "total": 160.5, "array": [0, 1, 2]}
+
+    def test_columnar(self):
+        assert to_columnar(LAPS)["lap_time"] == [80.1, 80.4]
+        assert to_columnar([]) == {}
+
+    def test_binary_round_trip(self):
+        columns, meta = decode_binary(encode_binary(to_columnar(LAPS), {"total_time": 160.5}))
+
+        assert meta == {"total_time": 160.5}
+        assert columns["lap_time"].tolist() == [80.1, 80.4]
+        assert np.isnan(columns["fuel_load"][1])
+
+    def test_negotiation(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding(None) is None
+
+    def test_small_bodies_are_not_compressed(self):
+        assert "content-encoding" not in fast_response({"a": 1}, "gzip").headers
+        large = fast_response({"simulation": LAPS * 100}, "gzip")
+        assert large.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(large.body))["simulation"][0] == LAPS[0]
+
+class TestSimulateRaceFormats:
+    def setup_method(self):
+        self.client = TestClient(main.app)
+        self.body = {"strategy": {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}}
+
+    def test_json_shape_is_unchanged(self):
+        data = self.client.post("/simulate-race", json=self.body).json()
+
+        assert set(data) == {"status", "simulation", "total_time", "strategy_analysis"}
+        assert set(data["simulation"][0]) == {"lap", "lap_time", "tire_wear", "position", "fuel_load"}
+        assert data["total_time"] == pytest.approx(sum(l["lap_time"] for l in data["simulation"]))
+
+    def test_columnar_and_binary(self):
+        columnar = self.client.post("/simulate-race?format=columnar", json=self.body).json()
+        assert columnar["format"] == "columnar"
+        assert len(columnar["simulation"]["lap_time"]) == 52
+
+        binary = self.client.post("/simulate-race?format=binary", json=self.body)
+        columns, meta = decode_binary(binary.content)
+        assert columns["lap"].tolist() == list(range(1, 53))
+        assert meta["status"] == "success"
+
+        assert self.client.post("/simulate-race?format=xml", json=self.body).status_code == 400
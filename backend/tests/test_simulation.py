@@ -1,5 +1,13 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
 import pytest
-from api.simulation import simulate_race, RaceSimulator, TireCompound, DriverStyle
+from unittest.mock import patch
+from api.simulation import (
+    simulate_race, simulate_multi_car_race, get_sample_car_configs, RaceSimulator, TireCompound, DriverStyle,
+    get_race_simulator
+)
+from api.multi_car_simulation import get_multi_car_simulator
+from api.strategy_comparison import get_strategy_comparator
 
 class TestTireCompound:
     def test_tire_compound_creation(self):
@@ -249,4 +257,92 @@ class TestSimulateRace:
             assert result["lap_time"] > 0
             assert result["tire_wear"] >= 0
             assert "position" in result
-            assert "fuel_load" in result 
\ No newline at end of file
+            assert "fuel_load" in result 
+
+class TestLapVaryingWeather:
+    def setup_method(self):
+        self.strategy = {
+            "pit_stops": [20],
+            "tires": ["Medium", "Hard"],
+            "driver_style": "balanced"
+        }
+
+    def test_dry_forecast_matches_dry_race(self):
+        forecast = [{"condition": "dry", "grip_level": 1.0, "track_temperature": 30.0}]
+        results = simulate_race(self.strategy, "dry", forecast=forecast)
+
+        assert len(results) == 52
+        assert all(75.0 <= r["lap_time"] <= 95.0 for r in results[:5])
+
+    def test_rain_mid_race_slows_laps(self):
+        forecast = [{"condition": "dry", "grip_level": 1.0, "track_temperature": 30.0}] * 26
+        forecast += [{"condition": "wet", "grip_level": 0.7, "track_temperature": 20.0}] * 26
+        results = simulate_race(self.strategy, "dry", forecast=forecast)
+
+        dry_avg = sum(r["lap_time"] for r in results[20:25]) / 5
+        wet_avg = sum(r["lap_time"] for r in results[26:31]) / 5
+        assert wet_avg > dry_avg * 1.2
+
+    def test_multi_car_accepts_forecast(self):
+        forecast = [{"condition": "wet", "grip_level": 0.7, "track_temperature": 20.0}]
+        dry = simulate_multi_car_race(get_sample_car_configs(), "dry")
+        wet = simulate_multi_car_race(get_sample_car_configs(), "dry", forecast=forecast)
+
+        assert len(wet) == len(dry)
+        assert wet[-1]["cars"][0]["total_time"] > dry[-1]["cars"][0]["total_time"]
+
+    def test_comparison_races_use_their_forecast(self):
+        comparator = get_strategy_comparator("silverstone")
+        calls = []
+
+        def record(car_configs, weather, forecast=None, cancel_token=None, rng=None):
+            calls.append(forecast)
+            return []
+
+        with patch.object(comparator.simulator, "simulate_race", side_effect=record):
+            comparator._simulate_once(self.strategy, "wet", rng=random.Random(1))
+
+        assert len(calls[0]) == 52
+        assert {weather.condition for weather in calls[0]} == {"wet"}
+
+class TestSharedSimulators:
+    strategy = {"pit_stops": [20], "tires": ["Medium", "Hard"], "driver_style": "balanced"}
+
+    def test_one_simulator_per_track(self):
+        assert get_race_simulator("british") is get_race_simulator("silverstone")
+        assert get_multi_car_simulator("british") is get_multi_car_simulator("silverstone")
+        assert get_race_simulator("monza") is not get_race_simulator("silverstone")
+
+    def test_seeded_race_is_reproducible(self):
+        first = simulate_race(self.strategy, rng=random.Random(5))
+        random.random()
+        assert simulate_race(self.strategy, rng=random.Random(5)) == first
+        assert simulate_race(self.strategy, rng=random.Random(6)) != first
+
+    def test_concurrent_races_match_sequential(self):
+        simulator = get_multi_car_simulator("silverstone")
+
+        def run(seed):
+            single = simulate_race(self.strategy, rng=random.Random(seed))
+            multi = simulator.simulate_race(get_sample_car_configs(), rng=random.Random(seed))
+            return single, multi
+
+        sequential = [run(seed) for seed in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            concurrent = list(pool.map(run, range(8)))
+
+        assert concurrent == sequential
+
+class TestExpectedRaceTime:
+    def test_matches_simulated_mean(self):
+        random.seed(11)
+        strategy = {"pit_stops": [15, 35], "tires": ["Medium", "Hard", "Soft"], "driver_style": "balanced"}
+        simulator = RaceSimulator("silverstone")
+
+        runs = [
+            sum(r["lap_time"] for r in simulate_race(strategy, "wet")) + 2 * simulator.pit_stop_time
+            for _ in range(300)
+        ]
+        expected = simulator.expected_race_time(strategy["pit_stops"], strategy["tires"], "balanced", "wet")
+
+        assert sum(runs) / len(runs) == pytest.approx(expected, abs=2.0)
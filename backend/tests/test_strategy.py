@@ -1,6 +1,9 @@
+import asyncio
+import json
 import pytest
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+from api import strategy
 from api.strategy import get_strategy_recommendation, get_mock_recommendation, analyze_strategy_performance
 
 class TestStrategyRecommendation:
@@ -256,4 +259,81 @@ class TestStrategyPerformanceAnalysis:
         aggressive_recs = [rec for rec in analysis["recommendations"] 
                           if "aggressive" in rec.lower()]
         
-        assert len(tire_recs) > 0 or len(pit_recs) > 0 or len(aggressive_recs) > 0 
\ No newline at end of file
+        assert len(tire_recs) > 0 or len(pit_recs) > 0 or len(aggressive_recs) > 0 
+
+class TestBatchRecommendations:
+    def setup_method(self):
+        strategy.recommendation_cache.clear()
+        strategy.llm_client.breaker.record_success()
+
+    @pytest.mark.asyncio
+    async def test_misses_share_one_model_call(self):
+        strategy.recommendation_cache.set(strategy.normalize_scenario("cached"), {"pit_stop_timing": "cached"})
+        answer = [
+            {"id": "s0", "pit_stop_timing": "Pit on lap 18", "tire_compound_strategy": "Soft to Hard"},
+            {"id": "s1", "pit_stop_timing": "Pit on lap 30"}
+        ]
+        client = MagicMock()
+        client.generate_content_async = AsyncMock(return_value=MagicMock(text="```json\n" + json.dumps(answer) + "\n```"))
+
+        with patch.object(strategy, "genai_client", client):
+            results = await strategy.get_strategy_recommendations(["first", "cached", "second", "First", "third"])
+
+        assert client.generate_content_async.await_count == 1
+        prompt = client.generate_content_async.await_args[0][0]
+        assert "cached" not in prompt and prompt.count("scenario:") == 3
+        assert results[0]["pit_stop_timing"] == "Pit on lap 18"
+        assert results[0]["driver_approach_adjustments"] == ""
+        assert results[1] == {"pit_stop_timing": "cached"}
+        assert results[2]["pit_stop_timing"] == "Pit on lap 30"
+        assert results[3] == results[0]
+        # The model skipped the third scenario, so it gets the local recommendation
+        assert set(results[4]) == set(strategy.RECOMMENDATION_FIELDS)
+        assert len(strategy.recommendation_cache) == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_batch_falls_back_to_local(self):
+        release = asyncio.Event()
+
+        async def slow_generate(prompt):
+            await release.wait()
+            return MagicMock(text=json.dumps([{"id": "s0", "pit_stop_timing": "Pit on lap 18"}]))
+
+        client = MagicMock()
+        client.generate_content_async = slow_generate
+        with patch.object(strategy, "genai_client", client), patch.object(strategy, "LLM_HEDGE_AFTER", 0.01):
+            results = await strategy.get_strategy_recommendations(["first"])
+            assert set(results[0]) == set(strategy.RECOMMENDATION_FIELDS)
+            assert results[0]["pit_stop_timing"] != "Pit on lap 18"
+
+            # The model call finishes in the background and fills the cache
+            release.set()
+            for _ in range(100):
+                if len(strategy.recommendation_cache):
+                    break
+                await asyncio.sleep(0.01)
+        assert strategy.recommendation_cache.get("first")["pit_stop_timing"] == "Pit on lap 18"
+
+    @pytest.mark.asyncio
+    async def test_joins_single_calls_in_flight(self):
+        release = asyncio.Event()
+        prompts = []
+
+        async def generate(prompt):
+            prompts.append(prompt)
+            await release.wait()
+            return MagicMock(text=json.dumps({"pit_stop_timing": "Pit on lap 22"}))
+
+        client = MagicMock()
+        client.generate_content_async = generate
+        with patch.object(strategy, "genai_client", client):
+            single = asyncio.ensure_future(strategy.get_strategy_recommendation("first"))
+            await asyncio.sleep(0)
+            batch = asyncio.ensure_future(strategy.get_strategy_recommendations(["First"]))
+            await asyncio.sleep(0)
+            release.set()
+            results = await batch
+            await single
+
+        assert len(prompts) == 1
+        assert results[0]["pit_stop_timing"] == "Pit on lap 22"
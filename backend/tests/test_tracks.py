@@ -0,0 +1,132 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from api import tracks
+from api.tracks import (
+    TrackDatabase, TrackData, TrackSector, track_db, write_track_catalog, write_track_index,
+    CATALOG_FILE, INDEX_FILE
+)
+from api.track_profile import get_track_profile
+
+def make_track(i: int) -> TrackData:
+    return TrackData(
+        name=f"Test Circuit {i}",
+        country="Testland",
+        circuit_length=5.0,
+        total_laps=50 + i % 10,
+        lap_record=80.0 + i,
+        sectors=[TrackSector(f"Sector {s}", 0.33, 26.0, 1.0, 1.0) for s in range(1, 4)],
+        tire_degradation={"Soft": 1.0, "Medium": 1.1, "Hard": 1.2},
+        weather_sensitivity=0.5,
+        overtaking_difficulty=0.5
+    )
+
+class TestBundledCatalog:
+    def test_bundled_tracks(self):
+        assert set(track_db.track_ids()) == {"monaco", "silverstone", "spa", "monza", "suzuka"}
+        assert track_db.get_track("monaco").total_laps == 78
+        assert len(track_db.get_track("spa").sectors) == 3
+
+    def test_aliases_and_names(self):
+        assert track_db.resolve_track_id("Silverstone Circuit") == "silverstone"
+        assert track_db.resolve_track_id("silverstone_circuit") == "silverstone"
+        assert track_db.resolve_track_id("Spa-Francorchamps") == "spa"
+        assert track_db.get_track("italian").name == "Autodromo Nazionale di Monza"
+
+    def test_unknown_track_falls_back(self):
+        assert not track_db.has_track("nowhere")
+        assert track_db.get_track("nowhere") is track_db.get_track("silverstone")
+
+    def test_track_list(self):
+        tracks = track_db.get_track_list()
+        assert len(tracks) == 5
+        assert set(tracks[0]) == {"id", "name", "country", "circuit_length", "total_laps", "lap_record"}
+
+class TestTrackDatabase:
+    def setup_method(self):
+        self.tracks = {f"track_{i}": make_track(i) for i in range(300)}
+        self.tracks["silverstone"] = make_track(999)
+
+    def test_lazy_loading(self, tmp_path):
+        write_track_catalog(self.tracks, str(tmp_path), aliases={"track_7": ["seven"]})
+        db = TrackDatabase(str(tmp_path), cache_size=8)
+
+        assert db._index is None
+        assert db.get_track("seven").name == "Test Circuit 7"
+        assert len(db._cache) == 1
+        assert len(db.get_track_list()) == 301
+        assert len(db._cache) == 1
+
+    def test_lru_eviction(self, tmp_path):
+        write_track_catalog(self.tracks, str(tmp_path))
+        db = TrackDatabase(str(tmp_path), cache_size=4)
+
+        first = db.get_track("track_0")
+        for i in range(1, 10):
+            db.get_track(f"track_{i}")
+
+        assert len(db._cache) == 4
+        assert "track_0" not in db._cache
+        assert db.get_track("track_0") == first
+
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        write_track_catalog(self.tracks, str(tmp_path))
+        with open(os.path.join(tmp_path, CATALOG_FILE), "a") as f:
+            record = json.loads(open(os.path.join(tmp_path, CATALOG_FILE)).readline())
+            record.update(id="extra", name="Extra Circuit")
+            f.write(json.dumps(record) + "\n")
+
+        db = TrackDatabase(str(tmp_path))
+        assert db.get_track("extra").name == "Extra Circuit"
+        assert os.path.exists(os.path.join(tmp_path, INDEX_FILE))
+
+    def test_same_length_edit_is_detected(self, tmp_path):
+        write_track_catalog(self.tracks, str(tmp_path))
+        path = os.path.join(tmp_path, CATALOG_FILE)
+        catalog = open(path).read()
+        assert '"total_laps":50,' in catalog
+        with open(path, "w") as f:
+            f.write(catalog.replace('"total_laps":50,', '"total_laps":59,', 1))
+
+        db = TrackDatabase(str(tmp_path))
+        assert db.get_track("track_0").total_laps == 59
+        assert db.get_track_list()[0]["total_laps"] == 59
+
+    def test_unchanged_catalog_is_not_hashed(self, tmp_path):
+        write_track_catalog(self.tracks, str(tmp_path))
+        path = os.path.join(tmp_path, CATALOG_FILE)
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+        write_track_index(str(tmp_path))
+
+        with patch.object(tracks, "catalog_digest", side_effect=AssertionError("hashed the catalog")):
+            assert TrackDatabase(str(tmp_path)).get_track("track_0").total_laps == 50
+
+        # A touched but unchanged catalog is checked by hash and keeps its index
+        os.utime(path, (1_700_000_000, 1_700_000_000))
+        with patch.object(tracks, "build_track_index", side_effect=AssertionError("rebuilt the index")):
+            assert TrackDatabase(str(tmp_path)).get_track("track_0").total_laps == 50
+
+class TestTrackProfile:
+    def test_profile_is_cached_and_canonical(self):
+        profile = get_track_profile("Silverstone Circuit")
+
+        assert profile.track_id == "silverstone"
+        assert get_track_profile("silverstone") is profile
+        assert get_track_profile("nowhere") is profile
+
+    def test_precomputed_quantities(self):
+        profile = get_track_profile("spa")
+        track = track_db.get_track("spa")
+
+        assert profile.sector_base_times == tuple(s.base_time for s in track.sectors)
+        assert profile.base_lap_time == pytest.approx(sum(s.base_time for s in track.sectors))
+        assert profile.overtaking_factor == pytest.approx(1 - track.overtaking_difficulty)
+        assert profile.degradation_for("Hard") == track.tire_degradation["Hard"]
+        assert profile.degradation_for("Unknown") == 1.0
+        assert profile.condition_pace[0] == 1.0
+        assert profile.condition_pace[2] == pytest.approx((1 + 0.1 * track.weather_sensitivity) * 1.1)
+
+    def test_profile_is_immutable(self):
+        with pytest.raises(Exception):
+            get_track_profile("monza").total_laps = 10
@@ -0,0 +1,186 @@
+import os
+import numpy as np
+import pytest
+import random
+from api.weather_system import (
+    WeatherSimulator, WeatherEnsemble, WeatherCondition, WEATHER_CONDITIONS, TIRE_COMPOUNDS, TIRE_PERFORMANCE_TABLE,
+    default_weather, forecast_weather
+)
+from api.weather_library import WeatherScenarioLibrary, LIBRARY_FIELDS, LIBRARY_VERSION
+from api.weather_markov import get_markov_model
+
+class TestWeatherEnsemble:
+    def setup_method(self):
+        self.simulator = WeatherSimulator()
+
+    def test_ensemble_shapes(self):
+        ensemble = self.simulator.generate_weather_ensemble(200, 52, "spa", seed=1)
+
+        assert isinstance(ensemble, WeatherEnsemble)
+        assert ensemble.num_scenarios == 200
+        assert ensemble.total_laps == 52
+        for field in ("temperature", "humidity", "wind_speed", "rain_probability",
+                      "track_temperature", "grip_level", "condition"):
+            assert getattr(ensemble, field).shape == (200, 52)
+
+    def test_ensemble_ranges(self):
+        ensemble = self.simulator.generate_weather_ensemble(500, 52, "spa", seed=2)
+
+        assert ensemble.humidity.min() >= 30 and ensemble.humidity.max() <= 90
+        assert ensemble.wind_speed.min() >= 0 and ensemble.wind_speed.max() <= 30
+        assert np.all(np.abs(ensemble.temperature - 25.0) <= 5.0)
+        assert np.all(np.abs(ensemble.track_temperature - ensemble.temperature - 10.0) <= 2.0)
+
+    def test_ensemble_is_seeded(self):
+        a = self.simulator.generate_weather_ensemble(50, 20, seed=3)
+        b = self.simulator.generate_weather_ensemble(50, 20, seed=3)
+
+        np.testing.assert_array_equal(a.temperature, b.temperature)
+        np.testing.assert_array_equal(a.condition, b.condition)
+
+    def test_ensemble_matches_forecast_rules(self):
+        # A wet start with low rain probability turns intermediate, as in the per-lap forecast
+        simulator = WeatherSimulator("wet")
+        simulator.current_weather.rain_probability = 0.1
+        forecast = simulator.generate_weather_forecast(5)
+        ensemble = simulator.generate_weather_ensemble(10, 5, seed=4)
+
+        assert all(ensemble.condition.ravel() == WEATHER_CONDITIONS.index(forecast[0].condition))
+        assert ensemble.grip_level[0, 0] == pytest.approx(forecast[0].grip_level)
+
+    def test_scenario_and_bands(self):
+        ensemble = self.simulator.generate_weather_ensemble(100, 10, seed=5)
+        scenario = ensemble.scenario(3)
+
+        assert len(scenario) == 10
+        assert scenario[0].temperature == pytest.approx(ensemble.temperature[3, 0])
+        assert ensemble.percentiles("temperature", [5, 50, 95]).shape == (3, 10)
+        assert ensemble.condition_probability("dry").shape == (10,)
+
+class TestWeatherScenarioLibrary:
+    def test_build_and_load(self, tmp_path):
+        library = WeatherScenarioLibrary(str(tmp_path), num_scenarios=64, seed=7)
+        data = library.load("monza")
+
+        assert isinstance(data, np.memmap)
+        assert data.shape == (len(LIBRARY_FIELDS), 64, 53)
+        assert os.path.exists(library.path("monza"))
+        assert f"v{LIBRARY_VERSION}" in os.path.basename(library.path("monza"))
+
+    def test_identical_across_instances(self, tmp_path):
+        first = WeatherScenarioLibrary(str(tmp_path), num_scenarios=32, seed=7)
+        second = WeatherScenarioLibrary(str(tmp_path), num_scenarios=32, seed=7)
+        indices = first.sample_indices(10, seed=1)
+
+        np.testing.assert_array_equal(first.sample("spa", indices).temperature,
+                                      second.sample("spa", indices).temperature)
+        np.testing.assert_array_equal(indices, second.sample_indices(10, seed=1))
+
+    def test_scenario(self, tmp_path):
+        library = WeatherScenarioLibrary(str(tmp_path), num_scenarios=16, seed=7)
+        scenario = library.scenario("spa", 3)
+
+        assert len(scenario) == 44
+        assert scenario[0].condition in WEATHER_CONDITIONS
+
+    def test_unknown_track_uses_default(self, tmp_path):
+        library = WeatherScenarioLibrary(str(tmp_path), num_scenarios=16, seed=7)
+
+        assert library.path("unknown") == library.path("silverstone")
+
+class TestLapMultipliers:
+    def test_shapes_and_dry_baseline(self):
+        simulator = WeatherSimulator()
+        forecast = simulator.generate_weather_forecast(10)
+        grip, wear = simulator.build_lap_multipliers(forecast, 12)
+
+        assert grip.shape == wear.shape == (12, len(TIRE_COMPOUNDS))
+        assert np.allclose(grip, 1.0)
+
+    def test_wet_conditions_favour_wet_tires(self):
+        simulator = WeatherSimulator()
+        grip, wear = simulator.build_lap_multipliers([{"condition": "wet", "grip_level": 0.7, "track_temperature": 20.0}])
+        soft, wet = TIRE_COMPOUNDS.index("Soft"), TIRE_COMPOUNDS.index("Wet")
+
+        assert grip[0, wet] > grip[0, soft]
+        assert wear[0, wet] < wear[0, soft]
+
+class TestForecastWeather:
+    def test_seeded_forecast_is_reproducible(self):
+        first, first_events = forecast_weather(default_weather(), 52, "spa", random.Random(3))
+        second, second_events = forecast_weather(default_weather(), 52, "spa", random.Random(3))
+
+        assert first == second
+        assert first_events == second_events
+
+    def test_events_do_not_accumulate(self):
+        simulator = WeatherSimulator()
+        simulator.generate_weather_forecast(44, "spa", random.Random(3))
+        events = list(simulator.weather_events)
+        simulator.generate_weather_forecast(44, "spa", random.Random(3))
+
+        assert simulator.weather_events == events
+        assert len(simulator.forecast) == 44
+
+class TestMarkovWeatherModel:
+    def test_transition_matrix(self):
+        model = get_markov_model("spa")
+
+        assert model.transition.shape == (3, 3)
+        np.testing.assert_allclose(model.transition.sum(axis=1), 1.0)
+        assert get_markov_model("spa") is model
+
+    def test_rain_probability_is_monotonic(self):
+        model = get_markov_model("silverstone")
+        probabilities = [model.probability_of_rain_before(lap) for lap in range(1, 53)]
+
+        assert probabilities[0] == 0.0
+        assert all(a <= b for a, b in zip(probabilities, probabilities[1:]))
+        assert probabilities[-1] == pytest.approx(0.4, abs=0.02)
+
+    def test_rainier_tracks_rain_more(self):
+        assert get_markov_model("spa").probability_of_rain_before(30) > get_markov_model("monza").probability_of_rain_before(30)
+
+    def test_sample_matches_analytic_probability(self):
+        model = get_markov_model("spa")
+        states = model.sample(20000, seed=1)
+
+        assert states.shape == (20000, 44)
+        empirical = (states[:, :24] != 0).any(axis=1).mean()
+        assert empirical == pytest.approx(model.probability_of_rain_before(25), abs=0.02)
+        np.testing.assert_allclose((states == 0).mean(axis=0), model.state_distributions[:, 0], atol=0.02)
+
+class TestTirePerformanceTables:
+    def setup_method(self):
+        self.simulator = WeatherSimulator()
+
+    def test_table_shape(self):
+        assert TIRE_PERFORMANCE_TABLE.shape == (len(TIRE_COMPOUNDS) + 1, len(WEATHER_CONDITIONS), 3)
+
+    def test_scalar_lookup(self):
+        weather = WeatherCondition("wet", 18.0, 85.0, 10.0, 0.7, 45.0, 0.7)
+        impact = self.simulator.calculate_tire_performance_impact(weather, "Soft")
+
+        assert impact["performance_multiplier"] == pytest.approx(1.0 * 0.4 * 0.9 * 0.7)
+        assert impact["temperature_factor"] == 0.9
+        assert self.simulator.calculate_tire_performance_impact(weather, "Unknown")["performance_multiplier"] == pytest.approx(0.9 * 0.8 * 0.9 * 0.7)
+
+    def test_batch_matches_scalar(self):
+        conditions = ["dry", "intermediate", "wet", "dry"]
+        temperatures = [10.0, 30.0, 45.0, 41.0]
+        grip_levels = [1.0, 0.85, 0.7, 0.0]
+        compounds = ["Soft", "Intermediate", "Wet", "Hard"]
+        batch = self.simulator.calculate_tire_performance_impact_batch(conditions, temperatures, grip_levels, compounds)
+
+        for i in range(4):
+            weather = WeatherCondition(conditions[i], 20.0, 60.0, 10.0, 0.1, temperatures[i], grip_levels[i])
+            impact = self.simulator.calculate_tire_performance_impact(weather, compounds[i])
+            for key, value in impact.items():
+                assert batch[key][i] == pytest.approx(value)
+
+    def test_batch_broadcasts(self):
+        batch = self.simulator.calculate_tire_performance_impact_batch(
+            np.array([0, 2])[:, None], 30.0, 1.0, np.arange(len(TIRE_COMPOUNDS))[None, :]
+        )
+
+        assert batch["performance_multiplier"].shape == (2, len(TIRE_COMPOUNDS))
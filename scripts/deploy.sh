@@ -90,6 +90,10 @@ build_frontend() {
 deploy_backend() {
     print_status "Deploying backend to AWS..."
     
+    # The bundle trusts its track index (TRACK_INDEX_CHECK=off), so rebuild it from the catalog first
+    print_status "Indexing track catalog..."
+    (cd backend && python3 -m api.tracks)
+    
     cd infra
     
     # Build SAM application